@@ -1,48 +1,397 @@
-from fastapi import FastAPI, APIRouter, HTTPException, Depends, status, UploadFile, File
-from fastapi.responses import FileResponse, StreamingResponse
+import time
+SERVER_IMPORT_STARTED = time.perf_counter()
+
+from fastapi import FastAPI, APIRouter, HTTPException, Depends, status, UploadFile, File, Request, Query, Body
+from fastapi.responses import FileResponse, StreamingResponse, Response
 from fastapi.security import HTTPBearer, HTTPAuthorizationCredentials
 from dotenv import load_dotenv
 from starlette.middleware.cors import CORSMiddleware
-from motor.motor_asyncio import AsyncIOMotorClient
+from motor.motor_asyncio import AsyncIOMotorClient, AsyncIOMotorGridFSBucket
+from gridfs.errors import NoFile
+from pymongo import IndexModel, ReturnDocument, UpdateOne, monitoring
+from pymongo.errors import DuplicateKeyError, OperationFailure
+from bson import Binary
+from prometheus_client import CONTENT_TYPE_LATEST, CollectorRegistry, Counter, Gauge, Histogram, generate_latest, multiprocess
 import os
 import logging
 from pathlib import Path
-from pydantic import BaseModel, Field, ConfigDict, EmailStr
-from typing import List, Optional, Dict, Any
+from pydantic import BaseModel, Field, ConfigDict, EmailStr, TypeAdapter, ValidationError
+from typing import List, Optional, Dict, Any, Literal, Set
 import uuid
 from datetime import datetime, timezone, timedelta
 import jwt
-from passlib.context import CryptContext
-from PyPDF2 import PdfReader
-from docx import Document
-from reportlab.lib.pagesizes import letter
-from reportlab.platypus import SimpleDocTemplate, Paragraph, Spacer, Table, TableStyle
-from reportlab.lib.styles import getSampleStyleSheet, ParagraphStyle
-from reportlab.lib.units import inch
-from reportlab.lib import colors
-from reportlab.lib.enums import TA_CENTER, TA_LEFT
-from openai import AsyncOpenAI
 import io
 import asyncio
+import hashlib
+import functools
+import multiprocessing
+import zipfile
+import base64
+import json
+import html
+import importlib
+import math
+import random
+import contextlib
+import re
+from collections import OrderedDict
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
 
 ROOT_DIR = Path(__file__).parent
 load_dotenv(ROOT_DIR / '.env')
 
+# Cold start
+# Heavy optional libraries are imported on first use so the API starts serving without them;
+# PREWARM_IMPORTS ("all" or a comma list of LAZY_MODULES keys) loads them during startup instead.
+PREWARM_IMPORTS = os.environ.get("PREWARM_IMPORTS", "")
+# Import + startup time above STARTUP_BUDGET_MS is logged as a warning (0 disables the check)
+STARTUP_BUDGET_MS = float(os.environ.get("STARTUP_BUDGET_MS", "0"))
+
+startup_report: Dict[str, Any] = {
+    "module_import_ms": None,
+    "lifespan_ms": None,
+    "first_request_ms": None,
+    "budget_ms": STARTUP_BUDGET_MS or None,
+    "lazy_imports": {},
+}
+
+def elapsed_since_import_ms() -> float:
+    return round((time.perf_counter() - SERVER_IMPORT_STARTED) * 1000, 1)
+
+class LazyModule:
+    """A module imported on first attribute access; the import time lands in startup_report."""
+
+    def __init__(self, name: str):
+        self._name = name
+        self._module = None
+
+    def load(self):
+        if self._module is None:
+            started = time.perf_counter()
+            module = importlib.import_module(self._name)
+            startup_report["lazy_imports"][self._name] = round((time.perf_counter() - started) * 1000, 1)
+            self._module = module
+        return self._module
+
+    def __getattr__(self, attr: str):
+        # Only reached for names the instance itself doesn't define
+        return getattr(self.load(), attr)
+
+platypus = LazyModule("reportlab.platypus")
+rl_styles = LazyModule("reportlab.lib.styles")
+colors = LazyModule("reportlab.lib.colors")
+units = LazyModule("reportlab.lib.units")
+pagesizes = LazyModule("reportlab.lib.pagesizes")
+enums = LazyModule("reportlab.lib.enums")
+openai = LazyModule("openai")
+passlib_context = LazyModule("passlib.context")
+pypdf = LazyModule("PyPDF2")
+docx = LazyModule("docx")
+np = LazyModule("numpy")
+
+LAZY_MODULES = {
+    "reportlab": [platypus, rl_styles, colors, units, pagesizes, enums],
+    "openai": [openai],
+    "passlib": [passlib_context],
+    "pypdf": [pypdf],
+    "docx": [docx],
+    "numpy": [np],
+}
+
+def prewarm_imports(names: str):
+    selected = list(LAZY_MODULES) if names.strip().lower() == "all" else [name.strip() for name in names.split(",") if name.strip()]
+    for name in selected:
+        if name not in LAZY_MODULES:
+            logging.warning(f"PREWARM_IMPORTS: unknown module group {name!r}")
+            continue
+        for module in LAZY_MODULES[name]:
+            module.load()
+
+# Metrics
+# Exposed at GET /metrics. Under a multi-process server set PROMETHEUS_MULTIPROC_DIR so every
+# worker's samples are aggregated; otherwise each process reports its own.
+HTTP_REQUEST_SECONDS = Histogram(
+    "http_request_duration_seconds", "Request latency by route template",
+    ["method", "route", "status"],
+    buckets=(0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30),
+)
+HTTP_REQUESTS_IN_FLIGHT = Gauge("http_requests_in_flight", "Requests currently being handled", multiprocess_mode="livesum")
+MONGO_COMMAND_SECONDS = Histogram(
+    "mongo_command_duration_seconds", "MongoDB command latency",
+    ["command"],
+    buckets=(0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 5),
+)
+MONGO_COMMAND_FAILURES = Counter("mongo_command_failures_total", "MongoDB commands that returned an error", ["command"])
+PDF_RENDER_SECONDS = Histogram(
+    "pdf_render_duration_seconds", "Render pool time per PDF, cache misses only",
+    ["template"],
+    buckets=(0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10),
+)
+PDF_RENDER_BYTES = Histogram(
+    "pdf_render_size_bytes", "Size of rendered PDFs",
+    ["template"],
+    buckets=(2 ** 11, 2 ** 12, 2 ** 13, 2 ** 14, 2 ** 15, 2 ** 16, 2 ** 17, 2 ** 18, 2 ** 20),
+)
+LLM_REQUEST_SECONDS = Histogram(
+    "llm_request_duration_seconds", "OpenAI request latency including retries",
+    ["mode", "outcome"],
+    buckets=(0.25, 0.5, 1, 2, 4, 8, 15, 30, 60),
+)
+LLM_TOKENS = Counter("llm_tokens_total", "Tokens reported by OpenAI usage", ["mode"])
+RATE_LIMIT_REJECTIONS = Counter("rate_limit_rejections_total", "Requests rejected with 429 by the rate limiter")
+
+class MongoCommandMetrics(monitoring.CommandListener):
+    """Feeds PyMongo command events into the Mongo histograms."""
+
+    def started(self, event):
+        pass
+
+    def succeeded(self, event):
+        MONGO_COMMAND_SECONDS.labels(event.command_name).observe(event.duration_micros / 1e6)
+
+    def failed(self, event):
+        MONGO_COMMAND_SECONDS.labels(event.command_name).observe(event.duration_micros / 1e6)
+        MONGO_COMMAND_FAILURES.labels(event.command_name).inc()
+
 mongo_url = os.environ['MONGO_URL']
-client = AsyncIOMotorClient(mongo_url)
-db = client[os.environ['DB_NAME']]
+# Connected by connect_mongo() at startup, so importing the module (render pool workers,
+# scripts) never opens a client it won't use
+client: Optional[AsyncIOMotorClient] = None
+db = None
+
+def connect_mongo():
+    global client, db
+    if client is None:
+        # tz_aware: native BSON dates come back as UTC-aware datetimes, matching what we write
+        client = AsyncIOMotorClient(mongo_url, tz_aware=True, event_listeners=[MongoCommandMetrics()])
+        db = client[os.environ['DB_NAME']]
 
 app = FastAPI()
 api_router = APIRouter(prefix="/api")
 
-pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
 security = HTTPBearer()
 SECRET_KEY = os.environ.get("JWT_SECRET_KEY", "your-secret-key-change-this")
 ALGORITHM = "HS256"
 ACCESS_TOKEN_EXPIRE_MINUTES = 60 * 24 * 7
+# USER_CACHE_TTL_SECONDS is the maximum staleness of a cached user across workers
+USER_CACHE_TTL_SECONDS = float(os.environ.get("USER_CACHE_TTL_SECONDS", "60"))
+USER_CACHE_MAX_ENTRIES = int(os.environ.get("USER_CACHE_MAX_ENTRIES", "10000"))
+# When enabled, tokens carry the User claims and authentication never touches Mongo
+JWT_EMBED_USER = os.environ.get("JWT_EMBED_USER", "false").lower() in ("1", "true", "yes")
 
 OPENAI_API_KEY = os.environ.get("OPENAI_API_KEY")
-openai_client = AsyncOpenAI(api_key=OPENAI_API_KEY) if OPENAI_API_KEY else None
+# Created by get_openai_client() on the first AI request
+openai_client = None
+LLM_MODEL = "gpt-4o"
+LLM_TEMPERATURE = 0.7
+LLM_MAX_TOKENS = 1000
+LLM_CACHE_MAX_ENTRIES = int(os.environ.get("LLM_CACHE_MAX_ENTRIES", "1024"))
+LLM_CACHE_TTL_SECONDS = int(os.environ.get("LLM_CACHE_TTL_SECONDS", str(7 * 24 * 3600)))
+# Outbound LLM budget: concurrency caps plus a token bucket sized to the provider's tokens-per-minute limit
+LLM_MAX_CONCURRENCY = int(os.environ.get("LLM_MAX_CONCURRENCY", "16"))
+LLM_MAX_CONCURRENCY_PER_USER = int(os.environ.get("LLM_MAX_CONCURRENCY_PER_USER", "2"))
+LLM_TOKENS_PER_MINUTE = int(os.environ.get("LLM_TOKENS_PER_MINUTE", "30000"))
+LLM_MAX_RETRIES = int(os.environ.get("LLM_MAX_RETRIES", "3"))
+LLM_RETRY_BASE_DELAY = float(os.environ.get("LLM_RETRY_BASE_DELAY", "0.5"))
+LLM_RETRY_MAX_DELAY = float(os.environ.get("LLM_RETRY_MAX_DELAY", "8"))
+
+# Bump when any export backend's output changes so stale cached renders are not served
+RENDER_VERSION = "1"
+# Lowered export documents kept in memory, so a resume exported in several formats is processed once
+EXPORT_DOCUMENT_CACHE_MAX_ENTRIES = int(os.environ.get("EXPORT_DOCUMENT_CACHE_MAX_ENTRIES", "512"))
+RENDER_CACHE_MAX_ENTRIES = int(os.environ.get("RENDER_CACHE_MAX_ENTRIES", "256"))
+RENDER_CACHE_MAX_BYTES = int(os.environ.get("RENDER_CACHE_MAX_BYTES", str(64 * 1024 * 1024)))
+RENDER_CACHE_DIR = os.environ.get("RENDER_CACHE_DIR")
+# Disk tier budget; the least recently used renders are deleted once the directory outgrows it
+RENDER_CACHE_DIR_MAX_BYTES = int(os.environ.get("RENDER_CACHE_DIR_MAX_BYTES", str(1024 * 1024 * 1024)))
+
+# CPU-bound work (PDF rendering, bcrypt) runs on bounded pools so it never blocks the event loop
+RENDER_POOL_WORKERS = int(os.environ.get("RENDER_POOL_WORKERS", str(os.cpu_count() or 1)))
+RENDER_POOL_MAX_PENDING = int(os.environ.get("RENDER_POOL_MAX_PENDING", str(RENDER_POOL_WORKERS * 4)))
+AUTH_POOL_WORKERS = int(os.environ.get("AUTH_POOL_WORKERS", "4"))
+AUTH_POOL_MAX_PENDING = int(os.environ.get("AUTH_POOL_MAX_PENDING", str(AUTH_POOL_WORKERS * 8)))
+POOL_RETRY_AFTER_SECONDS = int(os.environ.get("POOL_RETRY_AFTER_SECONDS", "2"))
+
+# Resume import: uploads stream into the GridFS bucket IMPORT_UPLOAD_BUCKET chunk by chunk, the job
+# carries only the file id, and worker processes parse them
+IMPORT_MAX_BYTES = int(os.environ.get("IMPORT_MAX_BYTES", str(10 * 1024 * 1024)))
+IMPORT_UPLOAD_BUCKET = "import_uploads"
+IMPORT_POOL_WORKERS = int(os.environ.get("IMPORT_POOL_WORKERS", "2"))
+IMPORT_POOL_MAX_PENDING = int(os.environ.get("IMPORT_POOL_MAX_PENDING", str(IMPORT_POOL_WORKERS * 4)))
+
+# Background jobs live in db.jobs. The API runs an in-process worker unless JOB_WORKER_IN_PROCESS is off,
+# in which case `python worker.py` processes run them instead.
+JOB_WORKER_IN_PROCESS = os.environ.get("JOB_WORKER_IN_PROCESS", "true").lower() in ("1", "true", "yes")
+JOB_WORKER_CONCURRENCY = int(os.environ.get("JOB_WORKER_CONCURRENCY", "4"))
+JOB_LEASE_SECONDS = int(os.environ.get("JOB_LEASE_SECONDS", "60"))
+JOB_MAX_ATTEMPTS = int(os.environ.get("JOB_MAX_ATTEMPTS", "3"))
+JOB_POLL_INTERVAL_SECONDS = float(os.environ.get("JOB_POLL_INTERVAL_SECONDS", "1"))
+# POST /jobs clamps client priorities to JOB_MIN_USER_PRIORITY..0, so no client can jump the shared queue
+JOB_MIN_USER_PRIORITY = -10
+# Finished jobs, rendered files included, are deleted this long after they complete or fail
+JOB_RETENTION_SECONDS = int(os.environ.get("JOB_RETENTION_SECONDS", str(24 * 3600)))
+
+# Token buckets per user (per IP before login): a request costs its RATE_LIMIT_COSTS weight, 1 otherwise.
+# Each worker admits from its own copy of the bucket and reconciles with db.rate_limits every
+# RATE_LIMIT_SYNC_SECONDS (0 keeps limits per process), so across workers a client can overshoot
+# by at most what it spends within one sync interval.
+RATE_LIMIT_ENABLED = os.environ.get("RATE_LIMIT_ENABLED", "true").lower() in ("1", "true", "yes")
+RATE_LIMIT_CAPACITY = float(os.environ.get("RATE_LIMIT_CAPACITY", "120"))
+RATE_LIMIT_REFILL_PER_SECOND = float(os.environ.get("RATE_LIMIT_REFILL_PER_SECOND", "2"))
+RATE_LIMIT_SYNC_SECONDS = float(os.environ.get("RATE_LIMIT_SYNC_SECONDS", "1"))
+RATE_LIMIT_MAX_KEYS = int(os.environ.get("RATE_LIMIT_MAX_KEYS", "100000"))
+# Anonymous requests are keyed by client IP, read from X-Forwarded-For as appended by the nearest of this
+# many reverse proxies; otherwise every request would share the proxy's bucket. Exposed without a
+# proxy, set it to 0 so the socket peer is used, or clients could pick their own key.
+RATE_LIMIT_TRUSTED_PROXIES = int(os.environ.get("RATE_LIMIT_TRUSTED_PROXIES", "1"))
+RATE_LIMIT_COSTS = [
+    (re.compile(r"/api/auth/(login|register)$"), 10),  # bcrypt
+    (re.compile(r"/api/ai/"), 5),
+    (re.compile(r"/api/resumes/(export|import)$"), 10),
+    (re.compile(r"/api/resumes/[^/]+/download$"), 3),
+    (re.compile(r"/api/resumes/match-job$"), 2),
+    (re.compile(r"/api/analytics/rebuild$"), 10),
+]
+# Exact paths; anything below them (e.g. /api/status/query-plans) is charged as usual
+RATE_LIMIT_EXEMPT = {"/metrics", "/api/status"}
+
+# Version history: every write appends the delta from the previous ResumeData to db.resume_versions,
+# with a full snapshot every RESUME_HISTORY_SNAPSHOT_INTERVAL versions so reconstruction stays short.
+# Entries older than RESUME_HISTORY_TTL_DAYS are pruned once a snapshot past that age supersedes them,
+# never by a per-entry TTL, which would expire the snapshot that younger deltas are rebuilt from.
+RESUME_HISTORY_ENABLED = os.environ.get("RESUME_HISTORY_ENABLED", "true").lower() in ("1", "true", "yes")
+RESUME_HISTORY_SNAPSHOT_INTERVAL = int(os.environ.get("RESUME_HISTORY_SNAPSHOT_INTERVAL", "20"))
+RESUME_HISTORY_TTL_DAYS = int(os.environ.get("RESUME_HISTORY_TTL_DAYS", "90"))
+
+# Cross-user analytics: each resume stores its contribution (score, filled sections, skills) and every
+# write moves db.analytics / db.analytics_skills counters by the difference, so reads never scan resumes.
+# Counters only cover resumes written since this shipped (or since it was re-enabled) until a
+# POST /api/analytics/rebuild job has run.
+ANALYTICS_ENABLED = os.environ.get("ANALYTICS_ENABLED", "true").lower() in ("1", "true", "yes")
+ANALYTICS_REBUILD_BATCH_SIZE = int(os.environ.get("ANALYTICS_REBUILD_BATCH_SIZE", "500"))
+ANALYTICS_SKILL_MAX_LENGTH = 64
+# Comma-separated emails allowed to read analytics
+ADMIN_EMAILS = {email.strip().lower() for email in os.environ.get("ADMIN_EMAILS", "").split(",") if email.strip()}
+
+# Opt-in: PUT saves to the same resume within this window are merged into one Mongo write (0 disables)
+RESUME_SAVE_COALESCE_MS = int(os.environ.get("RESUME_SAVE_COALESCE_MS", "0"))
+
+MONGO_ENSURE_INDEXES = os.environ.get("MONGO_ENSURE_INDEXES", "true").lower() in ("1", "true", "yes")
+SLOW_QUERY_MS = int(os.environ.get("SLOW_QUERY_MS", "50"))
+# Older versions stored dates as ISO strings; the startup migration rewrites them as BSON dates
+MONGO_MIGRATE_DATES = os.environ.get("MONGO_MIGRATE_DATES", "true").lower() in ("1", "true", "yes")
+DATE_MIGRATION_BATCH_SIZE = int(os.environ.get("DATE_MIGRATION_BATCH_SIZE", "500"))
+DATE_MIGRATION_FIELDS = {
+    "users": ("created_at",),
+    "resumes": ("created_at", "updated_at"),
+}
+
+# Indexes backing every query the API issues; reconciled at startup
+# Fields covered by the resume text index, per section, and the weight each gets in ranking
+SEARCH_ITEM_FIELDS = {
+    "experiences": ("title", "organization", "description", "skills"),
+    "internships": ("title", "company", "description", "skills"),
+    "hackathons": ("name", "project_title", "description", "technologies"),
+    "education": ("institution", "degree", "field"),
+    "projects": ("title", "description", "technologies"),
+    "skills": ("name",),
+    "events": ("title", "organization", "description"),
+}
+SEARCH_FIELD_WEIGHTS = {"title": 4, "name": 4, "project_title": 4, "degree": 3, "skills": 3, "technologies": 3}
+SEARCH_WEIGHTS = {
+    "title": 10,
+    "data.summary": 2,
+    "data.skills.name": 5,
+    **{
+        f"data.{section}.{field}": SEARCH_FIELD_WEIGHTS.get(field, 1)
+        for section, fields in SEARCH_ITEM_FIELDS.items() if section != "skills"
+        for field in fields
+    },
+}
+SEARCH_MAX_HITS_PER_RESUME = 5
+# Job description matching keeps sparse term vectors per resume version in process memory
+TERM_VECTOR_CACHE_MAX_ENTRIES = int(os.environ.get("TERM_VECTOR_CACHE_MAX_ENTRIES", "20000"))
+JOB_MATCH_KEYWORDS = 20
+
+REQUIRED_INDEXES = {
+    "users": [
+        IndexModel([("email", 1)], name="email_unique", unique=True),
+        IndexModel([("id", 1)], name="id_unique", unique=True),
+    ],
+    "resumes": [
+        IndexModel([("user_id", 1), ("id", 1)], name="user_id_id", unique=True),
+        IndexModel([("user_id", 1), ("updated_at", -1), ("id", -1)], name="user_id_updated_at_id"),
+        IndexModel([("user_id", 1), ("score", -1), ("id", -1)], name="user_id_score_id"),
+        IndexModel([("id", 1)], name="id_unique", unique=True),
+        # Text search is scoped by the user_id equality prefix, so it only touches one user's entries
+        IndexModel(
+            [("user_id", 1)] + [(field, "text") for field in SEARCH_WEIGHTS],
+            name="user_id_text",
+            weights=SEARCH_WEIGHTS,
+            default_language="english",
+        ),
+    ],
+    "jobs": [
+        IndexModel([("id", 1)], name="id_unique", unique=True),
+        IndexModel([("status", 1), ("priority", -1), ("run_after", 1)], name="status_priority_run_after"),
+        IndexModel([("status", 1), ("lease_expires_at", 1)], name="status_lease_expires_at"),
+        IndexModel([("expires_at", 1)], name="expires_at_ttl", expireAfterSeconds=0),
+    ],
+    "llm_cache": [
+        IndexModel([("key", 1)], name="key_unique", unique=True),
+        IndexModel([("created_at", 1)], name="created_at_ttl", expireAfterSeconds=LLM_CACHE_TTL_SECONDS),
+    ],
+    "resume_versions": [
+        IndexModel([("resume_id", 1), ("version", -1)], name="resume_id_version", unique=True),
+    ],
+    "rate_limits": [
+        IndexModel([("expires_at", 1)], name="expires_at_ttl", expireAfterSeconds=0),
+    ],
+    "analytics": [
+        IndexModel([("id", 1)], name="id_unique", unique=True),
+    ],
+    "analytics_skills": [
+        IndexModel([("key", 1)], name="key_unique", unique=True),
+        # Top skills are read straight off this index
+        IndexModel([("count", -1), ("key", 1)], name="count_key"),
+    ],
+}
+
+# Indexes earlier versions created that must not survive an upgrade
+RETIRED_INDEXES = {
+    "resume_versions": ["created_at_ttl"],
+}
+
+# Representative filters for the hot queries, explained by check_query_plans
+QUERY_PLAN_PROBES = [
+    ("users", {"email": ""}),
+    ("users", {"id": ""}),
+    ("resumes", {"user_id": ""}),
+    ("resumes", {"id": "", "user_id": ""}),
+    ("resumes", {"user_id": "", "updated_at": {"$lt": datetime.now(timezone.utc)}}),
+    ("resumes", {"user_id": "", "$text": {"$search": "probe"}}),
+    ("resume_versions", {"resume_id": "", "version": {"$lte": 0}}),
+    ("analytics_skills", {"count": {"$gt": 0}}),
+]
+
+# List-valued sections of ResumeData, in display order
+RESUME_SECTIONS = ["experiences", "internships", "hackathons", "education", "projects", "skills", "events"]
+
+# Score components and the ResumeData fields each one reads
+SCORE_COMPONENT_SECTIONS = {
+    "personal_info": ["personal_info"],
+    "summary": ["summary"],
+    "experience": ["experiences", "internships"],
+    "education": ["education"],
+    "skills": ["skills"],
+    "achievements": ["hackathons", "projects", "events"],
+}
+SECTION_SCORE_COMPONENTS = {
+    section: component
+    for component, sections in SCORE_COMPONENT_SECTIONS.items()
+    for section in sections
+}
 
 # Models
 class UserRegister(BaseModel):
@@ -160,6 +509,87 @@ class Resume(BaseModel):
     data: ResumeData = Field(default_factory=ResumeData)
     created_at: datetime = Field(default_factory=lambda: datetime.now(timezone.utc))
     updated_at: datetime = Field(default_factory=lambda: datetime.now(timezone.utc))
+    version: int = 0  # bumped on every write; documents predating versioning read as 0
+    score: Optional[int] = None
+
+class ResumeSummary(BaseModel):
+    model_config = ConfigDict(extra="ignore")
+    id: str
+    title: str
+    template: str = "modern"
+    updated_at: datetime
+    section_counts: Dict[str, int] = {}
+    score: Optional[int] = None
+
+class ResumeSummaryPage(BaseModel):
+    items: List[ResumeSummary]
+    next_cursor: Optional[str] = None
+
+class SearchHit(BaseModel):
+    section: str  # "title", "summary" or a ResumeData list section
+    item_id: Optional[str] = None
+    matched_terms: List[str]
+    snippet: str
+
+class ResumeSearchResult(BaseModel):
+    resume_id: str
+    title: str
+    updated_at: datetime
+    relevance: float
+    hits: List[SearchHit]
+
+class ResumeSearchResponse(BaseModel):
+    query: str
+    results: List[ResumeSearchResult]
+
+class JobMatchRequest(BaseModel):
+    job_description: str = Field(..., min_length=1, max_length=20000)
+    resume_ids: Optional[List[str]] = None  # omitted ranks all of the user's resumes
+    limit: int = Field(20, ge=1, le=1000)
+
+class JobMatchResult(BaseModel):
+    resume_id: str
+    title: str
+    score: int  # TF-IDF cosine similarity to the job description, 0-100
+    keyword_coverage: int  # share of the job's top keywords the resume mentions, 0-100
+    matched_keywords: List[str]
+    missing_keywords: List[str]
+
+class JobMatchResponse(BaseModel):
+    keywords: List[str]  # the job description's top keywords, heaviest first
+    results: List[JobMatchResult]
+
+class ResumeVersionInfo(BaseModel):
+    version: int
+    created_at: datetime
+    snapshot: bool  # stored in full rather than as a delta
+    changes: List[str]  # ResumeData fields the version changed
+
+class ResumeVersionList(BaseModel):
+    versions: List[ResumeVersionInfo]
+    next_before: Optional[int] = None  # pass as ?before= for older versions
+
+class ResumeVersionDiff(BaseModel):
+    from_version: int
+    to_version: int
+    changes: Dict[str, Any]  # delta that turns from_version's data into to_version's
+
+class AnalyticsOverview(BaseModel):
+    resumes: int
+    average_score: Optional[float] = None
+    average_breakdown: Dict[str, float]
+    score_distribution: Dict[str, int]  # resumes per score band
+    section_completeness: Dict[str, float]  # share of resumes with each section filled in
+    updated_at: Optional[datetime] = None
+
+class SkillCount(BaseModel):
+    name: str
+    count: int
+    share: float  # of all counted resumes
+
+class SkillAnalytics(BaseModel):
+    resumes: int
+    skills: List[SkillCount]
 
 class ResumeCreate(BaseModel):
     title: str
@@ -169,22 +599,324 @@ class ResumeUpdate(BaseModel):
     title: Optional[str] = None
     template: Optional[str] = None
     data: Optional[ResumeData] = None
+    version: Optional[int] = None  # expected current version; omitted means an unconditional write
+
+class SectionPatch(BaseModel):
+    value: Any
+
+class JobCreate(BaseModel):
+    type: Literal["render_pdf", "generate_summary", "optimize_content"]
+    payload: Dict[str, Any] = {}
+    priority: int = 0  # higher runs first; clamped to JOB_MIN_USER_PRIORITY..0
+
+ExportFormat = Literal["pdf", "docx", "html", "md"]
+
+class ResumeExportRequest(BaseModel):
+    resume_ids: Optional[List[str]] = None  # None exports every resume the user owns
+    format: ExportFormat = "pdf"
 
 class AIRequest(BaseModel):
     prompt: str
     context: Optional[Dict[str, Any]] = None
+    regenerate: bool = False  # skip the LLM cache and fetch a fresh completion
 
 class ScoreResponse(BaseModel):
     score: int
     breakdown: Dict[str, int]
     suggestions: List[str]
 
+SECTION_ITEM_MODELS = {
+    "experiences": ExperienceItem,
+    "internships": InternshipItem,
+    "hackathons": HackathonItem,
+    "education": EducationItem,
+    "projects": ProjectItem,
+    "skills": SkillItem,
+    "events": EventItem,
+}
+
+# Worker Pools
+class BoundedPool:
+    """Executor wrapper that sheds load with a 503 once max_pending jobs are queued or running."""
+
+    def __init__(self, name: str, executor_factory, workers: int, max_pending: int):
+        self.name = name
+        self.workers = workers
+        self.max_pending = max_pending
+        self._executor_factory = executor_factory
+        self._executor = None
+        self.pending = 0
+        self.completed = 0
+        self.rejected = 0
+        self.broken = 0
+
+    @property
+    def executor(self):
+        # Created lazily so importing the module (e.g. in a spawned worker) never starts a pool
+        if self._executor is None:
+            self._executor = self._executor_factory(self.workers)
+        return self._executor
+
+    def ensure_capacity(self):
+        if self.pending >= self.max_pending:
+            self.rejected += 1
+            raise self.busy_error()
+
+    @staticmethod
+    def busy_error() -> HTTPException:
+        return HTTPException(
+            status_code=503,
+            detail="Server is busy, please retry shortly",
+            headers={"Retry-After": str(POOL_RETRY_AFTER_SECONDS)},
+        )
+
+    async def run(self, fn, *args, **kwargs):
+        self.ensure_capacity()
+        loop = asyncio.get_running_loop()
+        executor = self.executor
+        try:
+            future = executor.submit(functools.partial(fn, *args, **kwargs))
+            self.pending += 1
+            # A job stays pending until the executor is done with it, not until its caller stops waiting:
+            # cancelling the await leaves a job that already started running in its worker
+            future.add_done_callback(lambda _: self._call_on_loop(loop, self._finished))
+            return await asyncio.wrap_future(future)
+        except BrokenProcessPool:
+            # A worker died (OOM, segfault) and took the pool with it; the next call starts a fresh one
+            self.replace_broken(executor)
+            raise self.busy_error()
+
+    def replace_broken(self, executor):
+        # Only the first caller to see a broken pool drops it; later ones may already have a new pool
+        if self._executor is executor:
+            logging.error(f"{self.name} pool broke; starting a new one")
+            self._executor = None
+            self.broken += 1
+            executor.shutdown(wait=False, cancel_futures=True)
+
+    @staticmethod
+    def _call_on_loop(loop, callback):
+        # Done callbacks run on the executor's threads
+        try:
+            loop.call_soon_threadsafe(callback)
+        except RuntimeError:
+            pass  # loop already closed at shutdown
+
+    def _finished(self):
+        self.pending -= 1
+        self.completed += 1
+
+    def stats(self) -> Dict[str, Any]:
+        busy = min(self.pending, self.workers)
+        return {
+            "workers": self.workers,
+            "busy": busy,
+            "queued": self.pending - busy,
+            "max_pending": self.max_pending,
+            "utilization": round(busy / self.workers, 3) if self.workers else 0.0,
+            "completed": self.completed,
+            "rejected": self.rejected,
+            "broken": self.broken,
+        }
+
+    def shutdown(self):
+        if self._executor is not None:
+            self._executor.shutdown(wait=False, cancel_futures=True)
+            self._executor = None
+
+render_pool = BoundedPool(
+    "render",
+    lambda workers: ProcessPoolExecutor(max_workers=workers, mp_context=multiprocessing.get_context("spawn")),
+    RENDER_POOL_WORKERS,
+    RENDER_POOL_MAX_PENDING,
+)
+auth_pool = BoundedPool(
+    "auth",
+    lambda workers: ThreadPoolExecutor(max_workers=workers, thread_name_prefix="auth"),
+    AUTH_POOL_WORKERS,
+    AUTH_POOL_MAX_PENDING,
+)
+import_pool = BoundedPool(
+    "import",
+    lambda workers: ProcessPoolExecutor(max_workers=workers, mp_context=multiprocessing.get_context("spawn")),
+    IMPORT_POOL_WORKERS,
+    IMPORT_POOL_MAX_PENDING,
+)
+
+# User Cache
+class UserCache:
+    """TTL + LRU cache of authenticated users in front of db.users lookups. The API never changes a
+    user after registration, so entries are not invalidated; the TTL bounds staleness from edits made outside it."""
+
+    def __init__(self, max_entries: int, ttl_seconds: float):
+        self.max_entries = max_entries
+        self.ttl_seconds = ttl_seconds
+        self._entries: "OrderedDict[str, tuple]" = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, user_id: str) -> Optional[User]:
+        entry = self._entries.get(user_id)
+        if entry is not None:
+            expires_at, user = entry
+            if expires_at > time.monotonic():
+                self._entries.move_to_end(user_id)
+                self.hits += 1
+                return user
+            del self._entries[user_id]
+        self.misses += 1
+        return None
+
+    def put(self, user: User):
+        if self.ttl_seconds <= 0 or self.max_entries <= 0:
+            return
+        self._entries[user.id] = (time.monotonic() + self.ttl_seconds, user)
+        self._entries.move_to_end(user.id)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "entries": len(self._entries),
+            "hits": self.hits,
+            "misses": self.misses,
+            "ttl_seconds": self.ttl_seconds,
+            "token_claims": JWT_EMBED_USER,
+        }
+
+user_cache = UserCache(USER_CACHE_MAX_ENTRIES, USER_CACHE_TTL_SECONDS)
+
+# Database Indexes
+def index_key_changed(current: Dict[str, Any], spec: Dict[str, Any]) -> bool:
+    desired = list(spec["key"].items())
+    if not any(direction == "text" for _, direction in desired):
+        return list(current["key"]) != desired
+    # Mongo reports a text index as _fts/_ftsx keys; its text fields live in the weights map
+    current_plain = [(field, direction) for field, direction in current["key"] if field not in ("_fts", "_ftsx")]
+    desired_plain = [(field, direction) for field, direction in desired if direction != "text"]
+    desired_weights = {field: spec.get("weights", {}).get(field, 1) for field, direction in desired if direction == "text"}
+    return current_plain != desired_plain or current.get("weights") != desired_weights
+
+async def ensure_indexes():
+    for collection_name, names in RETIRED_INDEXES.items():
+        existing = await db[collection_name].index_information()
+        for name in names:
+            if name in existing:
+                logger.warning(f"Dropping retired index {collection_name}.{name}")
+                await db[collection_name].drop_index(name)
+    for collection_name, indexes in REQUIRED_INDEXES.items():
+        collection = db[collection_name]
+        existing = await collection.index_information()
+        missing = []
+        for index in indexes:
+            spec = index.document
+            current = existing.get(spec["name"])
+            if current is None:
+                missing.append(index)
+                continue
+            if (
+                index_key_changed(current, spec)
+                or bool(current.get("unique")) != bool(spec.get("unique"))
+                or current.get("expireAfterSeconds") != spec.get("expireAfterSeconds")
+            ):
+                logger.warning(f"Rebuilding index {collection_name}.{spec['name']}: definition changed")
+                await collection.drop_index(spec["name"])
+                missing.append(index)
+        if not missing:
+            continue
+        try:
+            await collection.create_indexes(missing)
+            logger.info(f"Created indexes on {collection_name}: {[index.document['name'] for index in missing]}")
+        except OperationFailure as e:
+            # Typically duplicate data blocking a unique index; the API keeps serving without it
+            logger.error(f"Index creation on {collection_name} failed: {str(e)}")
+
+def find_plan_stages(plan: Dict[str, Any]) -> List[str]:
+    stages = [plan.get("stage", "")]
+    if "inputStage" in plan:
+        stages.extend(find_plan_stages(plan["inputStage"]))
+    for child in plan.get("inputStages", []):
+        stages.extend(find_plan_stages(child))
+    return stages
+
+async def check_query_plans() -> List[Dict[str, Any]]:
+    report = []
+    for collection_name, query in QUERY_PLAN_PROBES:
+        try:
+            explained = await db[collection_name].find(query).explain()
+        except Exception as e:
+            report.append({"collection": collection_name, "query": list(query), "error": str(e)})
+            continue
+        winning_plan = explained.get("queryPlanner", {}).get("winningPlan", {})
+        stages = find_plan_stages(winning_plan)
+        elapsed_ms = explained.get("executionStats", {}).get("executionTimeMillis", 0)
+        report.append({
+            "collection": collection_name,
+            "query": list(query),
+            "stages": stages,
+            "execution_time_ms": elapsed_ms,
+            "unindexed": "COLLSCAN" in stages,
+            "slow": elapsed_ms > SLOW_QUERY_MS,
+        })
+    return report
+
+def parse_legacy_date(value: str) -> datetime:
+    parsed = datetime.fromisoformat(value)
+    return parsed if parsed.tzinfo else parsed.replace(tzinfo=timezone.utc)
+
+date_migration_status: Dict[str, Any] = {"state": "idle", "migrated": {}, "skipped": 0}
+
+async def migrate_string_dates():
+    """Rewrite ISO-string dates as BSON datetimes in _id order, in small batches, while the API serves traffic."""
+    date_migration_status["state"] = "running"
+    for collection_name, fields in DATE_MIGRATION_FIELDS.items():
+        collection = db[collection_name]
+        query: Dict[str, Any] = {"$or": [{field: {"$type": "string"}} for field in fields]}
+        migrated = 0
+        last_id = None
+        while True:
+            if last_id is not None:
+                query["_id"] = {"$gt": last_id}
+            batch = await collection.find(query, {"_id": 1, **{field: 1 for field in fields}}).sort("_id", 1).limit(DATE_MIGRATION_BATCH_SIZE).to_list(DATE_MIGRATION_BATCH_SIZE)
+            if not batch:
+                break
+            last_id = batch[-1]["_id"]
+            requests = []
+            for doc in batch:
+                # Matching on the old string means a write that landed meanwhile is left alone
+                match: Dict[str, Any] = {"_id": doc["_id"]}
+                changes = {}
+                for field in fields:
+                    value = doc.get(field)
+                    if not isinstance(value, str):
+                        continue
+                    try:
+                        changes[field] = parse_legacy_date(value)
+                    except ValueError:
+                        date_migration_status["skipped"] += 1
+                        logger.warning(f"Unparseable {collection_name}.{field} on {doc['_id']}: {value!r}")
+                        continue
+                    match[field] = value
+                if changes:
+                    requests.append(UpdateOne(match, {"$set": changes}))
+            if requests:
+                result = await collection.bulk_write(requests, ordered=False)
+                migrated += result.modified_count
+            date_migration_status["migrated"][collection_name] = migrated
+        if migrated:
+            logger.info(f"Migrated string dates to BSON dates on {migrated} {collection_name} documents")
+    date_migration_status["state"] = "done"
+
 # Helper Functions
+@functools.lru_cache(maxsize=None)
+def password_context():
+    return passlib_context.CryptContext(schemes=["bcrypt"], deprecated="auto")
+
 def hash_password(password: str) -> str:
-    return pwd_context.hash(password)
+    return password_context().hash(password)
 
 def verify_password(plain_password: str, hashed_password: str) -> bool:
-    return pwd_context.verify(plain_password, hashed_password)
+    return password_context().verify(plain_password, hashed_password)
 
 def create_access_token(data: dict):
     to_encode = data.copy()
@@ -193,6 +925,16 @@ def create_access_token(data: dict):
     encoded_jwt = jwt.encode(to_encode, SECRET_KEY, algorithm=ALGORITHM)
     return encoded_jwt
 
+def user_token_claims(user: User) -> dict:
+    claims = {"sub": user.id}
+    if JWT_EMBED_USER:
+        claims.update({
+            "email": user.email,
+            "name": user.name,
+            "created_at": user.created_at.isoformat(),
+        })
+    return claims
+
 async def get_current_user(credentials: HTTPAuthorizationCredentials = Depends(security)):
     try:
         token = credentials.credentials
@@ -200,137 +942,1347 @@ async def get_current_user(credentials: HTTPAuthorizationCredentials = Depends(s
         user_id: str = payload.get("sub")
         if user_id is None:
             raise HTTPException(status_code=401, detail="Invalid token")
+        if JWT_EMBED_USER and "email" in payload:
+            return User(id=user_id, email=payload["email"], name=payload["name"], created_at=payload["created_at"])
+        cached_user = user_cache.get(user_id)
+        if cached_user is not None:
+            return cached_user
         user = await db.users.find_one({"id": user_id}, {"_id": 0, "password_hash": 0})
         if user is None:
             raise HTTPException(status_code=401, detail="User not found")
-        return User(**user)
+        user_obj = User(**user)
+        user_cache.put(user_obj)
+        return user_obj
     except jwt.ExpiredSignatureError:
         raise HTTPException(status_code=401, detail="Token has expired")
     except Exception as e:
         raise HTTPException(status_code=401, detail="Invalid token")
 
-async def call_llm(prompt: str, system_message: str = "You are a helpful assistant.") -> str:
-    if not openai_client:
+async def get_admin_user(current_user: User = Depends(get_current_user)):
+    if current_user.email.lower() not in ADMIN_EMAILS:
+        raise HTTPException(status_code=403, detail="Admin access required")
+    return current_user
+
+class LLMCache:
+    """Content-addressed cache of completions: an in-process LRU in front of a TTL-indexed Mongo collection.
+    Both tiers expire a completion ttl_seconds after it was stored."""
+
+    def __init__(self, max_entries: int, ttl_seconds: float):
+        self.max_entries = max_entries
+        self.ttl_seconds = ttl_seconds
+        self._entries: "OrderedDict[str, tuple]" = OrderedDict()
+        self.memory_hits = 0
+        self.mongo_hits = 0
+        self.misses = 0
+        self.bypasses = 0
+
+    @staticmethod
+    def key(model: str, system_message: str, prompt: str, params: Dict[str, Any]) -> str:
+        payload = json.dumps([model, system_message, prompt, params], sort_keys=True)
+        return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+    async def get(self, key: str) -> Optional[str]:
+        entry = self._entries.get(key)
+        if entry is not None:
+            expires_at, content = entry
+            if expires_at > time.monotonic():
+                self._entries.move_to_end(key)
+                self.memory_hits += 1
+                return content
+            del self._entries[key]
+        now = datetime.now(timezone.utc)
+        try:
+            # The TTL monitor sweeps only once a minute; expired documents may still be there
+            doc = await db.llm_cache.find_one(
+                {"key": key, "created_at": {"$gt": now - timedelta(seconds=self.ttl_seconds)}},
+                {"_id": 0, "content": 1, "created_at": 1},
+            )
+        except Exception as e:
+            logging.warning(f"LLM cache lookup failed: {str(e)}")
+            doc = None
+        if doc is not None:
+            # Kept in memory only for what is left of the stored completion's lifetime
+            self._remember(key, doc["content"], self.ttl_seconds - (now - doc["created_at"]).total_seconds())
+            self.mongo_hits += 1
+            return doc["content"]
+        self.misses += 1
+        return None
+
+    async def put(self, key: str, content: str):
+        self._remember(key, content, self.ttl_seconds)
+        try:
+            await db.llm_cache.update_one(
+                {"key": key},
+                {"$set": {"content": content, "created_at": datetime.now(timezone.utc)}},
+                upsert=True,
+            )
+        except Exception as e:
+            logging.warning(f"LLM cache write failed: {str(e)}")
+
+    def _remember(self, key: str, content: str, ttl_seconds: float):
+        if ttl_seconds <= 0:
+            return
+        self._entries[key] = (time.monotonic() + ttl_seconds, content)
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+
+    def stats(self) -> Dict[str, Any]:
+        lookups = self.memory_hits + self.mongo_hits + self.misses
+        return {
+            "entries": len(self._entries),
+            "memory_hits": self.memory_hits,
+            "mongo_hits": self.mongo_hits,
+            "misses": self.misses,
+            "bypasses": self.bypasses,
+            "hit_rate": round((self.memory_hits + self.mongo_hits) / lookups, 3) if lookups else 0.0,
+        }
+
+llm_cache = LLMCache(LLM_CACHE_MAX_ENTRIES, LLM_CACHE_TTL_SECONDS)
+
+class LLMGateway:
+    """Admission control for openai_client: concurrency caps, a TPM token bucket,
+    single-flight for identical prompts and jittered retries on 429/5xx."""
+
+    def __init__(self, max_concurrency: int, max_per_user: int, tokens_per_minute: int, max_retries: int):
+        self.max_concurrency = max_concurrency
+        self.max_per_user = max_per_user
+        self.tokens_per_minute = tokens_per_minute
+        self.max_retries = max_retries
+        self.in_flight = 0
+        self._per_user: Dict[str, int] = {}
+        self._tokens = float(tokens_per_minute)
+        self._refilled_at = time.monotonic()
+        self._single_flight: Dict[str, asyncio.Task] = {}
+        self.admitted = 0
+        self.rejected = 0
+        self.coalesced = 0
+        self.retries = 0
+
+    def _refill(self):
+        now = time.monotonic()
+        self._tokens = min(self.tokens_per_minute, self._tokens + (now - self._refilled_at) * self.tokens_per_minute / 60)
+        self._refilled_at = now
+
+    def _reject(self, retry_after: float, reason: str):
+        self.rejected += 1
+        raise HTTPException(
+            status_code=429,
+            detail=f"AI service is busy ({reason}), please retry shortly",
+            headers={"Retry-After": str(max(1, math.ceil(retry_after)))},
+        )
+
+    @contextlib.asynccontextmanager
+    async def admit(self, user_id: Optional[str], estimated_tokens: int):
+        # Over budget fails immediately; the caller gets a 429 instead of queueing behind the provider
+        estimated_tokens = min(estimated_tokens, self.tokens_per_minute)
+        if self.in_flight >= self.max_concurrency:
+            self._reject(1, "too many concurrent requests")
+        if user_id and self._per_user.get(user_id, 0) >= self.max_per_user:
+            self._reject(1, "too many concurrent requests for this user")
+        self._refill()
+        if estimated_tokens > self._tokens:
+            self._reject((estimated_tokens - self._tokens) * 60 / self.tokens_per_minute, "token budget exhausted")
+        self._tokens -= estimated_tokens
+        self.in_flight += 1
+        if user_id:
+            self._per_user[user_id] = self._per_user.get(user_id, 0) + 1
+        self.admitted += 1
+        usage = {"tokens": estimated_tokens}
+        try:
+            yield usage
+        finally:
+            self.in_flight -= 1
+            if user_id:
+                remaining = self._per_user.get(user_id, 1) - 1
+                if remaining:
+                    self._per_user[user_id] = remaining
+                else:
+                    self._per_user.pop(user_id, None)
+            # Give back the unused part of the estimate once the real usage is known
+            self._tokens = min(self.tokens_per_minute, self._tokens + estimated_tokens - usage["tokens"])
+
+    async def single_flight(self, key: str, fn):
+        task = self._single_flight.get(key)
+        if task is not None:
+            self.coalesced += 1
+        else:
+            # A task rather than an inline await, so one caller disconnecting doesn't cancel the others
+            task = asyncio.ensure_future(fn())
+            self._single_flight[key] = task
+            task.add_done_callback(lambda _: self._single_flight.pop(key, None))
+        return await asyncio.shield(task)
+
+    async def with_retries(self, fn):
+        for attempt in range(self.max_retries + 1):
+            try:
+                return await fn()
+            except (openai.APIStatusError, openai.APIConnectionError) as e:
+                status_code = getattr(e, "status_code", None)
+                retryable = status_code is None or status_code == 429 or status_code >= 500
+                if not retryable or attempt == self.max_retries:
+                    raise
+                self.retries += 1
+                await asyncio.sleep(random.uniform(0, min(LLM_RETRY_MAX_DELAY, LLM_RETRY_BASE_DELAY * 2 ** attempt)))
+
+    def stats(self) -> Dict[str, Any]:
+        self._refill()
+        return {
+            "in_flight": self.in_flight,
+            "max_concurrency": self.max_concurrency,
+            "users_in_flight": len(self._per_user),
+            "tokens_available": int(self._tokens),
+            "tokens_per_minute": self.tokens_per_minute,
+            "admitted": self.admitted,
+            "rejected": self.rejected,
+            "coalesced": self.coalesced,
+            "retries": self.retries,
+        }
+
+llm_gateway = LLMGateway(LLM_MAX_CONCURRENCY, LLM_MAX_CONCURRENCY_PER_USER, LLM_TOKENS_PER_MINUTE, LLM_MAX_RETRIES)
+
+def estimate_llm_tokens(system_message: str, prompt: str) -> int:
+    # ~4 characters per token for English text, plus the completion budget
+    return (len(system_message) + len(prompt)) // 4 + LLM_MAX_TOKENS
+
+def get_openai_client():
+    global openai_client
+    if openai_client is None and OPENAI_API_KEY:
+        openai_client = openai.AsyncOpenAI(api_key=OPENAI_API_KEY)
+    return openai_client
+
+def llm_error_to_http(e: Exception) -> HTTPException:
+    if isinstance(e, HTTPException):
+        return e
+    if isinstance(e, openai.APIStatusError) and e.status_code == 429:
+        try:
+            retry_after = math.ceil(float(e.response.headers.get("retry-after", LLM_RETRY_MAX_DELAY)))
+        except ValueError:
+            retry_after = math.ceil(LLM_RETRY_MAX_DELAY)
+        return HTTPException(
+            status_code=429,
+            detail="AI service rate limit reached, please retry shortly",
+            headers={"Retry-After": str(max(1, retry_after))},
+        )
+    logging.error(f"LLM error: {str(e)}")
+    return HTTPException(status_code=500, detail="AI service error")
+
+@contextlib.contextmanager
+def observe_llm_request(mode: str):
+    started = time.perf_counter()
+    outcome = "error"
+    try:
+        yield
+        outcome = "ok"
+    finally:
+        LLM_REQUEST_SECONDS.labels(mode, outcome).observe(time.perf_counter() - started)
+
+async def call_llm(prompt: str, system_message: str = "You are a helpful assistant.", bypass_cache: bool = False, user_id: Optional[str] = None) -> str:
+    llm_client = get_openai_client()
+    if not llm_client:
         raise HTTPException(status_code=503, detail="AI service not configured. Please add OPENAI_API_KEY to use AI features.")
+    params = {"temperature": LLM_TEMPERATURE, "max_tokens": LLM_MAX_TOKENS}
+    cache_key = LLMCache.key(LLM_MODEL, system_message, prompt, params)
+    if bypass_cache:
+        llm_cache.bypasses += 1
+    else:
+        cached = await llm_cache.get(cache_key)
+        if cached is not None:
+            return cached
+    
+    async def complete() -> str:
+        async with llm_gateway.admit(user_id, estimate_llm_tokens(system_message, prompt)) as usage:
+            with observe_llm_request("complete"):
+                response = await llm_gateway.with_retries(lambda: llm_client.chat.completions.create(
+                    model=LLM_MODEL,
+                    messages=[
+                        {"role": "system", "content": system_message},
+                        {"role": "user", "content": prompt}
+                    ],
+                    **params
+                ))
+            if response.usage:
+                usage["tokens"] = response.usage.total_tokens
+                LLM_TOKENS.labels("complete").inc(response.usage.total_tokens)
+        content = response.choices[0].message.content
+        # A regenerated answer replaces the cached one so later plain requests see it
+        await llm_cache.put(cache_key, content)
+        return content
+    
     try:
-        response = await openai_client.chat.completions.create(
-            model="gpt-4o",
-            messages=[
-                {"role": "system", "content": system_message},
-                {"role": "user", "content": prompt}
-            ],
-            temperature=0.7,
-            max_tokens=1000
-        )
-        return response.choices[0].message.content
+        if bypass_cache:
+            # Joining a call already in flight would hand a regenerate the very answer it asked to skip
+            return await complete()
+        return await llm_gateway.single_flight(cache_key, complete)
     except Exception as e:
-        logging.error(f"LLM error: {str(e)}")
-        raise HTTPException(status_code=500, detail="AI service error")
+        raise llm_error_to_http(e)
+
+async def stream_llm(prompt: str, system_message: str = "You are a helpful assistant.", bypass_cache: bool = False, user_id: Optional[str] = None):
+    """Yield completion text as it arrives; a cache hit is yielded as a single chunk."""
+    llm_client = get_openai_client()
+    if not llm_client:
+        raise HTTPException(status_code=503, detail="AI service not configured. Please add OPENAI_API_KEY to use AI features.")
+    params = {"temperature": LLM_TEMPERATURE, "max_tokens": LLM_MAX_TOKENS}
+    cache_key = LLMCache.key(LLM_MODEL, system_message, prompt, params)
+    if bypass_cache:
+        llm_cache.bypasses += 1
+    else:
+        cached = await llm_cache.get(cache_key)
+        if cached is not None:
+            yield cached
+            return
+    async with llm_gateway.admit(user_id, estimate_llm_tokens(system_message, prompt)) as usage:
+        with observe_llm_request("stream"):
+            try:
+                stream = await llm_gateway.with_retries(lambda: llm_client.chat.completions.create(
+                    model=LLM_MODEL,
+                    messages=[
+                        {"role": "system", "content": system_message},
+                        {"role": "user", "content": prompt}
+                    ],
+                    stream=True,
+                    stream_options={"include_usage": True},
+                    **params
+                ))
+            except Exception as e:
+                raise llm_error_to_http(e)
+            parts = []
+            try:
+                async for chunk in stream:
+                    if getattr(chunk, "usage", None):
+                        usage["tokens"] = chunk.usage.total_tokens
+                        LLM_TOKENS.labels("stream").inc(chunk.usage.total_tokens)
+                    delta = chunk.choices[0].delta.content if chunk.choices else None
+                    if delta:
+                        parts.append(delta)
+                        yield delta
+            except Exception as e:
+                logging.error(f"LLM stream error: {str(e)}")
+                raise HTTPException(status_code=500, detail="AI service error")
+            finally:
+                # Runs on client disconnect too, so an abandoned generation is cancelled upstream
+                await stream.close()
+    await llm_cache.put(cache_key, "".join(parts))
 
 # Auth Endpoints
 @api_router.post("/auth/register", response_model=Token)
 async def register(user_data: UserRegister):
-    existing_user = await db.users.find_one({"email": user_data.email})
-    if existing_user:
-        raise HTTPException(status_code=400, detail="Email already registered")
-    
     user = User(
         email=user_data.email,
         name=user_data.name
     )
     user_dict = user.model_dump()
-    user_dict["password_hash"] = hash_password(user_data.password)
-    user_dict["created_at"] = user_dict["created_at"].isoformat()
+    user_dict["password_hash"] = await auth_pool.run(hash_password, user_data.password)
     
-    await db.users.insert_one(user_dict)
+    # The unique email index makes the insert itself the duplicate check
+    try:
+        await db.users.insert_one(user_dict)
+    except DuplicateKeyError:
+        raise HTTPException(status_code=400, detail="Email already registered")
+    user_cache.put(user)
     
-    access_token = create_access_token({"sub": user.id})
+    access_token = create_access_token(user_token_claims(user))
     return Token(access_token=access_token, token_type="bearer", user=user)
 
 @api_router.post("/auth/login", response_model=Token)
 async def login(user_data: UserLogin):
     user_doc = await db.users.find_one({"email": user_data.email})
-    if not user_doc or not verify_password(user_data.password, user_doc["password_hash"]):
+    if not user_doc or not await auth_pool.run(verify_password, user_data.password, user_doc["password_hash"]):
         raise HTTPException(status_code=401, detail="Invalid email or password")
     
     user_doc.pop("password_hash", None)
     user_doc.pop("_id", None)
-    if isinstance(user_doc.get("created_at"), str):
-        user_doc["created_at"] = datetime.fromisoformat(user_doc["created_at"])
-    
     user = User(**user_doc)
-    access_token = create_access_token({"sub": user.id})
+    access_token = create_access_token(user_token_claims(user))
     return Token(access_token=access_token, token_type="bearer", user=user)
 
 @api_router.get("/auth/me", response_model=User)
 async def get_me(current_user: User = Depends(get_current_user)):
     return current_user
 
+# Resume Scoring
+# Scores are stored on the resume and kept current on every write. Section-level writes
+# mark the components they touch in score_dirty; refresh_resume_score recomputes just those.
+SCORE_INPUT_PROJECTION = {
+    "_id": 0,
+    "updated_at": 1,
+    "version": 1,
+    "history_base": 1,
+    "score_breakdown": 1,
+    "score_dirty": 1,
+    "analytics": 1,
+    "data.personal_info": 1,
+    "data.summary": 1,
+    **{f"data.{section}.id": 1 for section in RESUME_SECTIONS},
+    "data.skills.name": 1,
+}
+
+def score_component(component: str, data: Dict[str, Any]) -> tuple:
+    """Return (points, suggestions) for one score component of a resume's data."""
+    if component == "personal_info":
+        personal_info = data.get("personal_info") or {}
+        if personal_info.get("full_name") and personal_info.get("email") and personal_info.get("phone"):
+            return 15, []
+        return 0, ["Complete your contact information"]
+    
+    if component == "summary":
+        summary = data.get("summary") or ""
+        if len(summary) > 50:
+            return 15, []
+        return 0, ["Add a professional summary (2-3 sentences)"]
+    
+    if component == "experience":
+        total_work_exp = len(data.get("experiences") or []) + len(data.get("internships") or [])
+        if total_work_exp >= 2:
+            return 25, []
+        if total_work_exp == 1:
+            return 15, ["Add more work experiences or internships"]
+        return 0, ["Add work experiences or internships"]
+    
+    if component == "education":
+        if data.get("education"):
+            return 15, []
+        return 0, ["Add your education background"]
+    
+    if component == "skills":
+        skill_count = len(data.get("skills") or [])
+        if skill_count >= 5:
+            return 15, []
+        if skill_count:
+            return 10, ["Add more skills (aim for 5+)"]
+        return 0, ["Add your technical and professional skills"]
+    
+    achievement_count = len(data.get("hackathons") or []) + len(data.get("projects") or []) + len(data.get("events") or [])
+    if achievement_count >= 3:
+        return 15, []
+    if achievement_count >= 1:
+        return 10, ["Add more projects, hackathons, or events"]
+    return 0, ["Add projects, hackathons, or relevant events"]
+
+def score_resume_data(data: Dict[str, Any]) -> Dict[str, Any]:
+    """Score every component; returns the fields stored on the resume document."""
+    breakdown = {}
+    suggestions = {}
+    for component in SCORE_COMPONENT_SECTIONS:
+        breakdown[component], suggestions[component] = score_component(component, data)
+    return {"score": sum(breakdown.values()), "score_breakdown": breakdown, "score_suggestions": suggestions}
+
+def build_score_response(breakdown: Dict[str, int], suggestions_by_component: Dict[str, List[str]]) -> ScoreResponse:
+    total_score = sum(breakdown.values())
+    suggestions = [suggestion for component in SCORE_COMPONENT_SECTIONS for suggestion in suggestions_by_component.get(component, [])]
+    
+    if total_score < 60:
+        suggestions.insert(0, "Your resume needs more content to stand out")
+    elif total_score < 80:
+        suggestions.insert(0, "Good progress! Add more details to reach excellence")
+    else:
+        suggestions.insert(0, "Great resume! Consider fine-tuning descriptions")
+    
+    return ScoreResponse(
+        score=total_score,
+        breakdown={component: breakdown.get(component, 0) for component in SCORE_COMPONENT_SECTIONS},
+        suggestions=suggestions
+    )
+
+async def refresh_resume_score(resume_id: str, doc: Dict[str, Any]):
+    # doc is the SCORE_INPUT_PROJECTION of the resume right after a write. The update only applies
+    # at that version; if a newer write got in first, its own refresh covers our dirty components.
+    breakdown = dict(doc.get("score_breakdown") or {})
+    dirty = set(doc.get("score_dirty") or []) | (set(SCORE_COMPONENT_SECTIONS) - set(breakdown))
+    if not dirty:
+        return
+    data = doc.get("data") or {}
+    changes: Dict[str, Any] = {}
+    for component in dirty:
+        points, suggestions = score_component(component, data)
+        breakdown[component] = points
+        changes[f"score_breakdown.{component}"] = points
+        changes[f"score_suggestions.{component}"] = suggestions
+    changes["score"] = sum(breakdown.values())
+    await db.resumes.update_one(
+        {"id": resume_id, **version_filter(doc.get("version", 0))},
+        {"$set": changes, "$unset": {"score_dirty": ""}},
+    )
+
+RESUME_LIST_ADAPTER = TypeAdapter(List[Resume])
+
+def json_response(content: Any, adapter: Optional[TypeAdapter] = None) -> Response:
+    # Returning a Response skips FastAPI's response_model pass (revalidate, convert to dicts, json.dumps);
+    # pydantic-core writes JSON straight from the validated models. response_model still documents the route.
+    body = adapter.dump_json(content) if adapter is not None else content.model_dump_json()
+    return Response(content=body, media_type="application/json")
+
+def build_resume_document(resume: Resume) -> Dict[str, Any]:
+    resume_dict = resume.model_dump()
+    resume_dict.update(score_resume_data(resume_dict["data"]))
+    resume.score = resume_dict["score"]
+    return resume_dict
+
+async def insert_resume(resume: Resume):
+    resume_dict = build_resume_document(resume)
+    if RESUME_HISTORY_ENABLED:
+        resume_dict["history_base"] = resume.version
+    if ANALYTICS_ENABLED:
+        resume_dict["analytics"] = resume_analytics(resume_dict["data"])
+    await db.resumes.insert_one(resume_dict)
+    await record_resume_version(resume.id, resume.user_id, resume.version, resume.version, None, resume_dict["data"])
+    await update_analytics_counters(None, resume_dict.get("analytics"))
+
 # Resume Endpoints
 @api_router.post("/resumes", response_model=Resume)
 async def create_resume(resume_data: ResumeCreate, current_user: User = Depends(get_current_user)):
+    validate_template_name(resume_data.template)
     resume = Resume(
         user_id=current_user.id,
         title=resume_data.title,
         template=resume_data.template
     )
-    resume_dict = resume.model_dump()
-    resume_dict["created_at"] = resume_dict["created_at"].isoformat()
-    resume_dict["updated_at"] = resume_dict["updated_at"].isoformat()
-    
-    await db.resumes.insert_one(resume_dict)
-    return resume
+    await insert_resume(resume)
+    return json_response(resume)
 
 @api_router.get("/resumes", response_model=List[Resume])
 async def get_resumes(current_user: User = Depends(get_current_user)):
     resumes = await db.resumes.find({"user_id": current_user.id}, {"_id": 0}).to_list(1000)
-    for resume in resumes:
-        if isinstance(resume.get("created_at"), str):
-            resume["created_at"] = datetime.fromisoformat(resume["created_at"])
-        if isinstance(resume.get("updated_at"), str):
-            resume["updated_at"] = datetime.fromisoformat(resume["updated_at"])
-    return resumes
+    return json_response(RESUME_LIST_ADAPTER.validate_python(resumes), RESUME_LIST_ADAPTER)
+
+def encode_listing_cursor(sort_value: Any, resume_id: str) -> str:
+    if isinstance(sort_value, datetime):
+        sort_value = sort_value.isoformat()
+    raw = json.dumps([sort_value, resume_id]).encode("utf-8")
+    return base64.urlsafe_b64encode(raw).decode("ascii")
+
+def decode_listing_cursor(cursor: str, sort: str) -> tuple:
+    try:
+        sort_value, resume_id = json.loads(base64.urlsafe_b64decode(cursor.encode("ascii")))
+        if sort == "updated_at" and isinstance(sort_value, str):
+            sort_value = datetime.fromisoformat(sort_value)
+    except Exception:
+        raise HTTPException(status_code=400, detail="Invalid cursor")
+    return sort_value, resume_id
+
+@api_router.get("/resumes/summaries", response_model=ResumeSummaryPage)
+async def get_resume_summaries(
+    limit: int = Query(20, ge=1, le=100),
+    cursor: Optional[str] = None,
+    sort: str = Query("updated_at", pattern="^(updated_at|score)$"),
+    min_score: Optional[int] = Query(None, ge=0, le=100),
+    current_user: User = Depends(get_current_user),
+):
+    # Keyset pagination on (sort field, id), descending, backed by user_id_updated_at_id / user_id_score_id
+    match: Dict[str, Any] = {"user_id": current_user.id}
+    if min_score is not None:
+        match["score"] = {"$gte": min_score}
+    if cursor:
+        after_value, after_id = decode_listing_cursor(cursor, sort)
+        match["$or"] = [
+            {sort: {"$lt": after_value}},
+            {sort: after_value, "id": {"$lt": after_id}},
+        ]
+        if sort == "score" and after_value is not None:
+            # Resumes stored before scores were kept sort after every number, where $lt never reaches
+            match["$or"].append({sort: None})
+    
+    projection: Dict[str, Any] = {"_id": 0, "id": 1, "title": 1, "template": 1, "updated_at": 1, "score": 1}
+    projection["section_counts"] = {
+        section: {"$size": {"$ifNull": [f"$data.{section}", []]}} for section in RESUME_SECTIONS
+    }
+    pipeline = [
+        {"$match": match},
+        {"$sort": {sort: -1, "id": -1}},
+        {"$limit": limit + 1},
+        {"$project": projection},
+    ]
+    docs = await db.resumes.aggregate(pipeline).to_list(limit + 1)
+    
+    next_cursor = None
+    if len(docs) > limit:
+        docs = docs[:limit]
+        next_cursor = encode_listing_cursor(docs[-1].get(sort), docs[-1]["id"])
+    return json_response(ResumeSummaryPage(items=docs, next_cursor=next_cursor))
+
+# Resume Search
+# Mongo's text index ranks whole resumes; the matching sections and items within each hit are
+# located here with the same tokenising, lowercasing and rough stemming.
+SEARCH_TOKEN = re.compile(r"[a-z0-9][a-z0-9+#.]*[a-z0-9+#]|[a-z0-9]")
+SEARCH_STOPWORDS = {"a", "an", "and", "as", "at", "by", "for", "from", "in", "of", "on", "or", "the", "to", "with"}
+SEARCH_PROJECTION = {
+    "_id": 0,
+    "id": 1,
+    "title": 1,
+    "updated_at": 1,
+    "data.summary": 1,
+    "relevance": {"$meta": "textScore"},
+    **{f"data.{section}.id": 1 for section in SEARCH_ITEM_FIELDS},
+    **{f"data.{section}.{field}": 1 for section, fields in SEARCH_ITEM_FIELDS.items() for field in fields},
+}
+
+def search_stem(word: str) -> str:
+    if not word.isalpha():
+        return word
+    for suffix in ("ing", "ed", "s"):
+        if len(word) > len(suffix) + 3 and word.endswith(suffix):
+            return word[:-len(suffix)]
+    return word
+
+def search_terms(query: str) -> Dict[str, str]:
+    """Map each stem the user searched for to the word they typed; negated words are left out."""
+    terms = {}
+    for word in query.lower().split():
+        if word.startswith("-"):
+            continue
+        for token in SEARCH_TOKEN.findall(word):
+            if token not in SEARCH_STOPWORDS:
+                terms.setdefault(search_stem(token), token)
+    return terms
+
+def search_snippet(text: str, stems: set, width: int = 160) -> str:
+    for match in SEARCH_TOKEN.finditer(text.lower()):
+        if search_stem(match.group()) in stems:
+            start = max(0, match.start() - width // 3)
+            snippet = text[start:start + width].strip()
+            return ("..." if start else "") + snippet + ("..." if start + width < len(text) else "")
+    return text[:width]
+
+def match_search_text(section: str, item_id: Optional[str], text: str, terms: Dict[str, str], weight: int) -> Optional[tuple]:
+    stems = {search_stem(token) for token in SEARCH_TOKEN.findall(text.lower())} & terms.keys()
+    if not stems:
+        return None
+    hit = SearchHit(
+        section=section,
+        item_id=item_id,
+        matched_terms=[terms[stem] for stem in terms if stem in stems],
+        snippet=search_snippet(text, stems),
+    )
+    return (len(stems), weight), hit
+
+def find_search_hits(doc: Dict[str, Any], terms: Dict[str, str]) -> List[SearchHit]:
+    data = doc.get("data") or {}
+    candidates = [
+        match_search_text("title", None, doc.get("title") or "", terms, SEARCH_WEIGHTS["title"]),
+        match_search_text("summary", None, data.get("summary") or "", terms, SEARCH_WEIGHTS["data.summary"]),
+    ]
+    for section, fields in SEARCH_ITEM_FIELDS.items():
+        weight = max(SEARCH_WEIGHTS[f"data.{section}.{field}"] for field in fields)
+        for item in data.get(section) or []:
+            parts = []
+            for field in fields:
+                value = item.get(field)
+                parts.extend(value if isinstance(value, list) else [value or ""])
+            candidates.append(match_search_text(section, item.get("id"), " · ".join(part for part in parts if part), terms, weight))
+    ranked = sorted((candidate for candidate in candidates if candidate), key=lambda candidate: candidate[0], reverse=True)
+    return [hit for _, hit in ranked[:SEARCH_MAX_HITS_PER_RESUME]]
+
+@api_router.get("/resumes/search", response_model=ResumeSearchResponse)
+async def search_resumes(
+    q: str = Query(..., min_length=1, max_length=200),
+    limit: int = Query(10, ge=1, le=50),
+    current_user: User = Depends(get_current_user),
+):
+    terms = search_terms(q)
+    if not terms:
+        raise HTTPException(status_code=422, detail="Search query has no searchable words")
+    docs = await db.resumes.find(
+        {"user_id": current_user.id, "$text": {"$search": q}},
+        SEARCH_PROJECTION,
+    ).sort([("relevance", {"$meta": "textScore"})]).limit(limit).to_list(limit)
+    results = [
+        ResumeSearchResult(
+            resume_id=doc["id"],
+            title=doc["title"],
+            updated_at=doc["updated_at"],
+            relevance=round(doc["relevance"], 3),
+            hits=find_search_hits(doc, terms),
+        )
+        for doc in docs
+    ]
+    return json_response(ResumeSearchResponse(query=q, results=results))
+
+@api_router.get("/resumes/{resume_id}/score", response_model=ScoreResponse)
+async def get_resume_score(resume_id: str, current_user: User = Depends(get_current_user)):
+    resume = await db.resumes.find_one(
+        {"id": resume_id, "user_id": current_user.id},
+        {"_id": 0, "score_breakdown": 1, "score_suggestions": 1, "score_dirty": 1},
+    )
+    if not resume:
+        raise HTTPException(status_code=404, detail="Resume not found")
+    if resume.get("score_breakdown") is None or resume.get("score_dirty"):
+        # Resumes written before scores were stored (or with a pending refresh) are scored now
+        doc = await db.resumes.find_one({"id": resume_id, "user_id": current_user.id}, SCORE_INPUT_PROJECTION)
+        if not doc:
+            raise HTTPException(status_code=404, detail="Resume not found")
+        await refresh_resume_score(resume_id, doc)
+        scored = score_resume_data(doc.get("data") or {})
+        return build_score_response(scored["score_breakdown"], scored["score_suggestions"])
+    return build_score_response(resume["score_breakdown"], resume.get("score_suggestions") or {})
 
 @api_router.get("/resumes/{resume_id}", response_model=Resume)
 async def get_resume(resume_id: str, current_user: User = Depends(get_current_user)):
     resume = await db.resumes.find_one({"id": resume_id, "user_id": current_user.id}, {"_id": 0})
     if not resume:
         raise HTTPException(status_code=404, detail="Resume not found")
-    if isinstance(resume.get("created_at"), str):
-        resume["created_at"] = datetime.fromisoformat(resume["created_at"])
-    if isinstance(resume.get("updated_at"), str):
-        resume["updated_at"] = datetime.fromisoformat(resume["updated_at"])
-    return Resume(**resume)
+    return json_response(Resume.model_validate(resume))
+
+async def raise_write_miss(resume_id: str, user_id: str, expected_version: Optional[int], not_found: str = "Resume not found"):
+    """Explain a conditional resume write that matched nothing: 409 when the version moved on, 404 otherwise."""
+    if expected_version is not None:
+        current = await db.resumes.find_one({"id": resume_id, "user_id": user_id}, {"_id": 0, "version": 1})
+        if current is not None and (current.get("version") or 0) != expected_version:
+            raise HTTPException(status_code=409, detail="Resume was modified by another save; reload and try again")
+    raise HTTPException(status_code=404, detail=not_found)
+
+def version_filter(expected_version: Optional[int]) -> Dict[str, Any]:
+    if expected_version is None:
+        return {}
+    if expected_version == 0:
+        # Documents written before versioning have no version field
+        return {"version": {"$in": [0, None]}}
+    return {"version": expected_version}
+
+async def apply_resume_update(resume_id: str, user_id: str, expected_version: Optional[int], changes: Dict[str, Any]) -> Resume:
+    # Compare-and-swap on version: one round trip on success, a second only to tell 404 from 409
+    update: Dict[str, Any] = {"$set": changes, "$inc": {"version": 1}}
+    if "data" in changes:
+        # A full data write rescores everything in the same round trip
+        changes.update(score_resume_data(changes["data"]))
+        update["$unset"] = {"score_dirty": ""}
+        if ANALYTICS_ENABLED:
+            changes["analytics"] = resume_analytics(changes["data"])
+    # The document before the write gives the history delta in the same round trip; the
+    # result is that document with the update applied (every key in changes is top-level)
+    previous = await db.resumes.find_one_and_update(
+        {"id": resume_id, "user_id": user_id, **version_filter(expected_version)},
+        update,
+        projection={"_id": 0},
+        return_document=ReturnDocument.BEFORE,
+    )
+    if previous is None:
+        await raise_write_miss(resume_id, user_id, expected_version)
+    updated_resume = {**previous, **changes, "version": (previous.get("version") or 0) + 1}
+    if "data" in changes:
+        delta = resume_data_delta(previous.get("data") or {}, changes["data"])
+    else:
+        delta = {}
+    await record_resume_version(resume_id, user_id, updated_resume["version"], previous.get("history_base"), delta, updated_resume.get("data") or {})
+    if "analytics" in changes:
+        await update_analytics_counters(previous.get("analytics"), changes["analytics"])
+    return Resume(**updated_resume)
+
+class ResumeSaveCoalescer:
+    """Merges unconditional saves for the same resume that arrive within a window into one write.
+    Saves carrying an expected version are never merged: each must win or lose its own compare-and-swap."""
+
+    def __init__(self, window_seconds: float):
+        self.window_seconds = window_seconds
+        self._pending: Dict[tuple, Dict[str, Any]] = {}
+        # The loop keeps only weak references to tasks; without these a pending flush could be collected
+        self._flushes: Set[asyncio.Task] = set()
+        self.saves = 0
+        self.writes = 0
+
+    async def submit(self, resume_id: str, user_id: str, changes: Dict[str, Any]) -> Resume:
+        key = (resume_id, user_id)
+        batch = self._pending.get(key)
+        if batch is None:
+            loop = asyncio.get_running_loop()
+            batch = {"changes": {}, "future": loop.create_future()}
+            self._pending[key] = batch
+            loop.call_later(self.window_seconds, self._start_flush, key)
+        # Later saves win field by field, matching the order they would have been applied in
+        batch["changes"].update(changes)
+        self.saves += 1
+        return await asyncio.shield(batch["future"])
+
+    def _start_flush(self, key: tuple):
+        task = asyncio.ensure_future(self._flush(key))
+        self._flushes.add(task)
+        task.add_done_callback(self._flushes.discard)
+
+    async def _flush(self, key: tuple):
+        batch = self._pending.pop(key)
+        self.writes += 1
+        resume_id, user_id = key
+        try:
+            result = await apply_resume_update(resume_id, user_id, None, batch["changes"])
+        except Exception as e:
+            batch["future"].set_exception(e)
+        else:
+            batch["future"].set_result(result)
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "window_ms": int(self.window_seconds * 1000),
+            "saves": self.saves,
+            "writes": self.writes,
+            "pending": len(self._pending),
+        }
+
+save_coalescer = ResumeSaveCoalescer(RESUME_SAVE_COALESCE_MS / 1000)
 
 @api_router.put("/resumes/{resume_id}", response_model=Resume)
 async def update_resume(resume_id: str, resume_update: ResumeUpdate, current_user: User = Depends(get_current_user)):
-    resume = await db.resumes.find_one({"id": resume_id, "user_id": current_user.id})
-    if not resume:
-        raise HTTPException(status_code=404, detail="Resume not found")
-    
+    validate_template_name(resume_update.template)
     update_dict = resume_update.model_dump(exclude_unset=True)
-    update_dict["updated_at"] = datetime.now(timezone.utc).isoformat()
+    if resume_update.data is not None:
+        # exclude_unset would also drop the ids generated for new items, minting fresh ones on every read
+        update_dict["data"] = resume_update.data.model_dump()
+    expected_version = update_dict.pop("version", None)
+    update_dict["updated_at"] = datetime.now(timezone.utc)
+    
+    if RESUME_SAVE_COALESCE_MS > 0 and expected_version is None:
+        return json_response(await save_coalescer.submit(resume_id, current_user.id, update_dict))
+    return json_response(await apply_resume_update(resume_id, current_user.id, expected_version, update_dict))
+
+# Section-level updates address one section or one item by id, so a small edit is a small write.
+# Each takes an optional ?version=: the write then only applies at that version, like PUT's "version".
+@functools.lru_cache(maxsize=None)
+def field_adapter(model, field_name: str) -> TypeAdapter:
+    return TypeAdapter(model.model_fields[field_name].annotation)
+
+def validate_fields(model, fields: Dict[str, Any]) -> Dict[str, Any]:
+    validated = {}
+    for name, value in fields.items():
+        if name == "id" or name not in model.model_fields:
+            raise HTTPException(status_code=422, detail=f"Unknown or read-only field: {name}")
+        try:
+            validated[name] = field_adapter(model, name).validate_python(value)
+        except ValidationError:
+            raise HTTPException(status_code=422, detail=f"Invalid value for field: {name}")
+    return validated
+
+def get_section_item_model(section: str):
+    model = SECTION_ITEM_MODELS.get(section)
+    if model is None:
+        raise HTTPException(status_code=404, detail=f"Unknown section: {section}")
+    return model
+
+@api_router.patch("/resumes/{resume_id}/sections/{section}")
+async def update_resume_section(resume_id: str, section: str, patch: SectionPatch, version: Optional[int] = None, current_user: User = Depends(get_current_user)):
+    if section == "summary":
+        if not isinstance(patch.value, str):
+            raise HTTPException(status_code=422, detail="Summary must be a string")
+        value = patch.value
+        changes = {"data.summary": value}
+    elif section == "personal_info":
+        if not isinstance(patch.value, dict):
+            raise HTTPException(status_code=422, detail="personal_info must be an object")
+        value = validate_fields(PersonalInfo, patch.value)
+        changes = {f"data.personal_info.{name}": field_value for name, field_value in value.items()}
+    else:
+        model = get_section_item_model(section)
+        try:
+            items = TypeAdapter(List[model]).validate_python(patch.value)
+        except ValidationError:
+            raise HTTPException(status_code=422, detail=f"Invalid items for section: {section}")
+        value = [item.model_dump() for item in items]
+        changes = {f"data.{section}": value}
     
-    await db.resumes.update_one({"id": resume_id}, {"$set": update_dict})
+    updated_at = datetime.now(timezone.utc)
+    changes["updated_at"] = updated_at
+    updated = await db.resumes.find_one_and_update(
+        {"id": resume_id, "user_id": current_user.id, **version_filter(version)},
+        {"$set": changes, "$inc": {"version": 1}, "$addToSet": {"score_dirty": SECTION_SCORE_COMPONENTS[section]}},
+        projection=SCORE_INPUT_PROJECTION,
+        return_document=ReturnDocument.AFTER,
+    )
+    if updated is None:
+        await raise_write_miss(resume_id, current_user.id, version)
+    if section == "summary":
+        delta = {"summary": value}
+    elif section == "personal_info":
+        delta = {"personal_info": value}
+    else:
+        delta = {section: {"replace": value}}
+    await record_resume_version(resume_id, current_user.id, updated["version"], updated.get("history_base"), delta)
+    await refresh_resume_score(resume_id, updated)
+    await sync_resume_analytics(resume_id, updated)
+    return {"section": section, "value": value, "updated_at": updated["updated_at"], "version": updated["version"]}
+
+@api_router.post("/resumes/{resume_id}/sections/{section}/items")
+async def add_resume_section_item(resume_id: str, section: str, item: Dict[str, Any] = Body(...), version: Optional[int] = None, current_user: User = Depends(get_current_user)):
+    model = get_section_item_model(section)
+    try:
+        item_obj = model(**item)
+    except ValidationError:
+        raise HTTPException(status_code=422, detail=f"Invalid item for section: {section}")
+    item_doc = item_obj.model_dump()
     
-    updated_resume = await db.resumes.find_one({"id": resume_id}, {"_id": 0})
-    if isinstance(updated_resume.get("created_at"), str):
-        updated_resume["created_at"] = datetime.fromisoformat(updated_resume["created_at"])
-    if isinstance(updated_resume.get("updated_at"), str):
-        updated_resume["updated_at"] = datetime.fromisoformat(updated_resume["updated_at"])
-    return Resume(**updated_resume)
+    updated_at = datetime.now(timezone.utc)
+    updated = await db.resumes.find_one_and_update(
+        {"id": resume_id, "user_id": current_user.id, f"data.{section}.id": {"$ne": item_obj.id}, **version_filter(version)},
+        {
+            "$push": {f"data.{section}": item_doc},
+            "$set": {"updated_at": updated_at},
+            "$inc": {"version": 1},
+            "$addToSet": {"score_dirty": SECTION_SCORE_COMPONENTS[section]},
+        },
+        projection=SCORE_INPUT_PROJECTION,
+        return_document=ReturnDocument.AFTER,
+    )
+    if updated is None:
+        if await db.resumes.count_documents({"id": resume_id, "user_id": current_user.id, **version_filter(version)}, limit=1):
+            raise HTTPException(status_code=409, detail="Item already exists")
+        await raise_write_miss(resume_id, current_user.id, version)
+    await record_resume_version(resume_id, current_user.id, updated["version"], updated.get("history_base"), {section: {"add": [item_doc]}})
+    await refresh_resume_score(resume_id, updated)
+    await sync_resume_analytics(resume_id, updated)
+    return {"section": section, "item": item_doc, "updated_at": updated["updated_at"], "version": updated["version"]}
+
+@api_router.patch("/resumes/{resume_id}/sections/{section}/items/{item_id}")
+async def update_resume_section_item(resume_id: str, section: str, item_id: str, fields: Dict[str, Any] = Body(...), version: Optional[int] = None, current_user: User = Depends(get_current_user)):
+    model = get_section_item_model(section)
+    validated = validate_fields(model, fields)
+    changes = {f"data.{section}.$.{name}": value for name, value in validated.items()}
+    
+    updated_at = datetime.now(timezone.utc)
+    changes["updated_at"] = updated_at
+    # Of item fields only skill names feed analytics; other edits leave the resume's contribution alone
+    updated = await db.resumes.find_one_and_update(
+        {"id": resume_id, "user_id": current_user.id, f"data.{section}.id": item_id, **version_filter(version)},
+        {"$set": changes, "$inc": {"version": 1}},
+        projection=SCORE_INPUT_PROJECTION if section == "skills" else {"_id": 0, "updated_at": 1, "version": 1, "history_base": 1},
+        return_document=ReturnDocument.AFTER,
+    )
+    if updated is None:
+        await raise_write_miss(resume_id, current_user.id, version, "Resume or item not found")
+    await record_resume_version(resume_id, current_user.id, updated["version"], updated.get("history_base"), {section: {"change": {item_id: validated}}})
+    if section == "skills":
+        await sync_resume_analytics(resume_id, updated)
+    return {"section": section, "item": {"id": item_id, **validated}, "updated_at": updated["updated_at"], "version": updated["version"]}
+
+@api_router.delete("/resumes/{resume_id}/sections/{section}/items/{item_id}")
+async def delete_resume_section_item(resume_id: str, section: str, item_id: str, version: Optional[int] = None, current_user: User = Depends(get_current_user)):
+    get_section_item_model(section)
+    updated_at = datetime.now(timezone.utc)
+    updated = await db.resumes.find_one_and_update(
+        {"id": resume_id, "user_id": current_user.id, f"data.{section}.id": item_id, **version_filter(version)},
+        {
+            "$pull": {f"data.{section}": {"id": item_id}},
+            "$set": {"updated_at": updated_at},
+            "$inc": {"version": 1},
+            "$addToSet": {"score_dirty": SECTION_SCORE_COMPONENTS[section]},
+        },
+        projection=SCORE_INPUT_PROJECTION,
+        return_document=ReturnDocument.AFTER,
+    )
+    if updated is None:
+        await raise_write_miss(resume_id, current_user.id, version, "Resume or item not found")
+    await record_resume_version(resume_id, current_user.id, updated["version"], updated.get("history_base"), {section: {"remove": [item_id]}})
+    await refresh_resume_score(resume_id, updated)
+    await sync_resume_analytics(resume_id, updated)
+    return {"message": "Item deleted successfully", "updated_at": updated["updated_at"], "version": updated["version"]}
 
 @api_router.delete("/resumes/{resume_id}")
 async def delete_resume(resume_id: str, current_user: User = Depends(get_current_user)):
-    result = await db.resumes.delete_one({"id": resume_id, "user_id": current_user.id})
-    if result.deleted_count == 0:
+    deleted = await db.resumes.find_one_and_delete({"id": resume_id, "user_id": current_user.id}, projection={"_id": 0, "analytics": 1})
+    if deleted is None:
         raise HTTPException(status_code=404, detail="Resume not found")
+    await db.resume_versions.delete_many({"resume_id": resume_id, "user_id": current_user.id})
+    await update_analytics_counters(deleted.get("analytics"), None)
     return {"message": "Resume deleted successfully"}
 
+# Resume Version History
+# Each write stores a delta against the previous version, keyed on item ids for list sections:
+#   {"summary": "...", "personal_info": {changed fields}, "<section>": {"add": [items],
+#    "change": {id: {changed fields}}, "remove": [ids], "order": [ids] | "replace": [items]}}
+# Snapshot entries also carry the version's full "data". A version is rebuilt from the nearest snapshot at
+# or below it plus the deltas after it; a missing delta (write recorded without its history entry)
+# makes the versions after it unrecoverable until the next snapshot.
+def section_delta(before: List[Dict[str, Any]], after: List[Dict[str, Any]]) -> Dict[str, Any]:
+    before_by_id = {item.get("id"): item for item in before}
+    after_by_id = {item.get("id"): item for item in after}
+    if len(before_by_id) != len(before) or len(after_by_id) != len(after) or None in before_by_id or None in after_by_id:
+        # Ids must be unique to address items; otherwise store the section whole
+        return {"replace": after}
+    delta: Dict[str, Any] = {}
+    added = [item for item in after if item["id"] not in before_by_id]
+    removed = [item_id for item_id in before_by_id if item_id not in after_by_id]
+    changed = {}
+    for item in after:
+        previous = before_by_id.get(item["id"])
+        if previous is not None and previous != item:
+            changed[item["id"]] = {name: value for name, value in item.items() if previous.get(name) != value}
+    if added:
+        delta["add"] = added
+    if changed:
+        delta["change"] = changed
+    if removed:
+        delta["remove"] = removed
+    implied_order = [item_id for item_id in before_by_id if item_id in after_by_id] + [item["id"] for item in added]
+    order = [item["id"] for item in after]
+    if order != implied_order:
+        delta["order"] = order
+    return delta
+
+def resume_data_delta(before: Dict[str, Any], after: Dict[str, Any]) -> Dict[str, Any]:
+    delta = {}
+    for field in ResumeData.model_fields:
+        old, new = before.get(field), after.get(field)
+        if old == new:
+            continue
+        if field in RESUME_SECTIONS:
+            delta[field] = section_delta(old or [], new or [])
+        elif field == "personal_info" and isinstance(old, dict) and isinstance(new, dict):
+            delta[field] = {name: value for name, value in new.items() if old.get(name) != value}
+        else:
+            delta[field] = new
+    return delta
+
+def apply_resume_delta(data: Dict[str, Any], delta: Dict[str, Any]) -> Dict[str, Any]:
+    data = dict(data)
+    for field, change in delta.items():
+        if field in RESUME_SECTIONS:
+            if "replace" in change:
+                data[field] = change["replace"]
+                continue
+            removed = set(change.get("remove", ()))
+            edits = change.get("change", {})
+            items = [{**item, **edits.get(item.get("id"), {})} for item in data.get(field) or [] if item.get("id") not in removed]
+            items.extend(change.get("add", ()))
+            if "order" in change:
+                by_id = {item["id"]: item for item in items}
+                items = [by_id[item_id] for item_id in change["order"] if item_id in by_id]
+            data[field] = items
+        elif field == "personal_info":
+            data[field] = {**(data.get(field) or {}), **change}
+        else:
+            data[field] = change
+    return data
+
+async def record_resume_version(resume_id: str, user_id: str, version: int, history_base: Optional[int],
+                                delta: Optional[Dict[str, Any]], data: Optional[Dict[str, Any]] = None):
+    """Append the history entry for `version`. `data`, when the caller has it, is that version's
+    full ResumeData; it is only stored when a snapshot is due."""
+    if not RESUME_HISTORY_ENABLED:
+        return
+    snapshot_due = history_base is None or (version - history_base) % RESUME_HISTORY_SNAPSHOT_INTERVAL == 0
+    if snapshot_due and data is None:
+        # Section writes only know their own change; read the version back (None if a newer write got in)
+        doc = await db.resumes.find_one({"id": resume_id, "version": version}, {"_id": 0, "data": 1})
+        data = (doc.get("data") or {}) if doc is not None else None
+    if history_base is None:
+        # The resume predates history, so there is no earlier version for a delta to apply to
+        if data is None:
+            return
+        await db.resumes.update_one({"id": resume_id, "history_base": {"$exists": False}}, {"$set": {"history_base": version}})
+    entry: Dict[str, Any] = {
+        "resume_id": resume_id,
+        "user_id": user_id,
+        "version": version,
+        "created_at": datetime.now(timezone.utc),
+        "delta": delta,
+        "snapshot": snapshot_due and data is not None,
+    }
+    if entry["snapshot"]:
+        entry["data"] = data
+    try:
+        await db.resume_versions.insert_one(entry)
+    except DuplicateKeyError:
+        return
+    if entry["snapshot"]:
+        await prune_resume_versions(resume_id)
+
+async def prune_resume_versions(resume_id: str):
+    """Drop the entries before the newest snapshot older than RESUME_HISTORY_TTL_DAYS. Everything from
+    that snapshot on stays rebuildable, so expired history goes a whole chain at a time."""
+    cutoff = datetime.now(timezone.utc) - timedelta(days=RESUME_HISTORY_TTL_DAYS)
+    base = await db.resume_versions.find_one(
+        {"resume_id": resume_id, "snapshot": True, "created_at": {"$lt": cutoff}},
+        {"_id": 0, "version": 1},
+        sort=[("version", -1)],
+    )
+    if base is not None:
+        await db.resume_versions.delete_many({"resume_id": resume_id, "version": {"$lt": base["version"]}})
+
+async def load_resume_version(resume_id: str, user_id: str, version: int) -> Dict[str, Any]:
+    query = {"resume_id": resume_id, "user_id": user_id}
+    snapshot = await db.resume_versions.find_one(
+        {**query, "version": {"$lte": version}, "snapshot": True},
+        {"_id": 0, "version": 1, "data": 1},
+        sort=[("version", -1)],
+    )
+    if snapshot is None:
+        raise HTTPException(status_code=404, detail="Version not found")
+    data = snapshot["data"]
+    expected = snapshot["version"] + 1
+    if expected <= version:
+        cursor = db.resume_versions.find(
+            {**query, "version": {"$gt": snapshot["version"], "$lte": version}},
+            {"_id": 0, "version": 1, "delta": 1},
+        ).sort("version", 1)
+        async for entry in cursor:
+            if entry["version"] != expected:
+                break
+            data = apply_resume_delta(data, entry.get("delta") or {})
+            expected += 1
+        if expected != version + 1:
+            raise HTTPException(status_code=404, detail="Version not found or no longer recoverable")
+    return data
+
+async def require_resume(resume_id: str, user_id: str) -> Dict[str, Any]:
+    resume = await db.resumes.find_one({"id": resume_id, "user_id": user_id}, {"_id": 0, "version": 1})
+    if not resume:
+        raise HTTPException(status_code=404, detail="Resume not found")
+    return resume
+
+@api_router.get("/resumes/{resume_id}/versions", response_model=ResumeVersionList)
+async def list_resume_versions(resume_id: str, before: Optional[int] = None, limit: int = Query(50, ge=1, le=200), current_user: User = Depends(get_current_user)):
+    await require_resume(resume_id, current_user.id)
+    query: Dict[str, Any] = {"resume_id": resume_id, "user_id": current_user.id}
+    if before is not None:
+        query["version"] = {"$lt": before}
+    # Snapshots' data stays in Mongo; only the names of the fields each delta touched are listed
+    entries = await db.resume_versions.find(query, {"_id": 0, "version": 1, "created_at": 1, "snapshot": 1, "delta": 1}).sort("version", -1).limit(limit + 1).to_list(limit + 1)
+    versions = [
+        ResumeVersionInfo(version=entry["version"], created_at=entry["created_at"], snapshot=entry["snapshot"], changes=list(entry.get("delta") or {}))
+        for entry in entries[:limit]
+    ]
+    next_before = versions[-1].version if len(entries) > limit else None
+    return json_response(ResumeVersionList(versions=versions, next_before=next_before))
+
+@api_router.get("/resumes/{resume_id}/versions/{version}", response_model=ResumeData)
+async def get_resume_version(resume_id: str, version: int, current_user: User = Depends(get_current_user)):
+    await require_resume(resume_id, current_user.id)
+    return json_response(ResumeData(**await load_resume_version(resume_id, current_user.id, version)))
+
+@api_router.get("/resumes/{resume_id}/versions/{version}/diff", response_model=ResumeVersionDiff)
+async def diff_resume_version(resume_id: str, version: int, against: Optional[int] = None, current_user: User = Depends(get_current_user)):
+    """Changes from `against` (default: the version before) to `version`."""
+    await require_resume(resume_id, current_user.id)
+    against = version - 1 if against is None else against
+    before, after = await asyncio.gather(
+        load_resume_version(resume_id, current_user.id, against),
+        load_resume_version(resume_id, current_user.id, version),
+    )
+    # Both sides go through the model so defaults added since either version don't show as changes
+    changes = resume_data_delta(ResumeData(**before).model_dump(), ResumeData(**after).model_dump())
+    return json_response(ResumeVersionDiff(from_version=against, to_version=version, changes=changes))
+
+@api_router.post("/resumes/{resume_id}/versions/{version}/restore", response_model=Resume)
+async def restore_resume_version(resume_id: str, version: int, current_user: User = Depends(get_current_user)):
+    """Writes the old data as a new version, so the restore itself can be undone."""
+    current = await require_resume(resume_id, current_user.id)
+    data = ResumeData(**await load_resume_version(resume_id, current_user.id, version))
+    changes = {"data": data.model_dump(), "updated_at": datetime.now(timezone.utc)}
+    return json_response(await apply_resume_update(resume_id, current_user.id, current.get("version", 0), changes))
+
+# Resume Analytics
+# A resume's contribution is {"score", "breakdown", "complete": [sections], "skills": [names]}, stored
+# on the resume as "analytics". The counters always equal the sum of the stored contributions: a write
+# swaps the contribution and moves the counters by the difference. db.analytics holds one "resumes"
+# document of totals; db.analytics_skills holds one document per normalised skill name.
+ANALYTICS_SECTIONS = ["personal_info", "summary", *RESUME_SECTIONS]
+# Rebuild reads the same fields the scoring refresh does
+ANALYTICS_INPUT_PROJECTION = {
+    "_id": 1,
+    "id": 1,
+    "version": 1,
+    "analytics": 1,
+    **{field: 1 for field in SCORE_INPUT_PROJECTION if field.startswith("data.")},
+}
+
+def skill_key(name: str) -> str:
+    return " ".join(name.lower().split())[:ANALYTICS_SKILL_MAX_LENGTH]
+
+def score_band(score: int) -> str:
+    low = min(score // 10 * 10, 90)
+    return "90-100" if low == 90 else f"{low}-{low + 9}"
+
+def resume_analytics(data: Dict[str, Any]) -> Dict[str, Any]:
+    """A resume's contribution to the counters; `data` only needs SCORE_INPUT_PROJECTION's fields."""
+    breakdown = {component: score_component(component, data)[0] for component in SCORE_COMPONENT_SECTIONS}
+    filled = {section: bool(data.get(section)) for section in ANALYTICS_SECTIONS}
+    # Contact details count as filled in once they earn their score points
+    filled["personal_info"] = breakdown["personal_info"] > 0
+    skills = {}
+    for item in data.get("skills") or []:
+        name = " ".join((item.get("name") or "").split())[:ANALYTICS_SKILL_MAX_LENGTH]
+        # Each resume counts a skill once, however it is cased or repeated
+        skills.setdefault(skill_key(name), name)
+    skills.pop("", None)
+    return {
+        "score": sum(breakdown.values()),
+        "breakdown": breakdown,
+        "complete": [section for section in ANALYTICS_SECTIONS if filled[section]],
+        "skills": list(skills.values()),
+    }
+
+def analytics_counter_delta(old: Optional[Dict[str, Any]], new: Optional[Dict[str, Any]]) -> tuple:
+    """Counter changes for replacing contribution `old` with `new` (None: not counted).
+    Returns ({totals field: change}, {skill key: [name, change]}) without zero entries."""
+    totals: Dict[str, int] = {}
+    skills: Dict[str, list] = {}
+    for contribution, sign in ((old, -1), (new, 1)):
+        if contribution is None:
+            continue
+        changes = [("resumes", 1), ("score_sum", contribution["score"]), (f"score_bands.{score_band(contribution['score'])}", 1)]
+        changes.extend((f"breakdown_sums.{component}", points) for component, points in contribution["breakdown"].items())
+        changes.extend((f"complete.{section}", 1) for section in contribution["complete"])
+        for field, amount in changes:
+            totals[field] = totals.get(field, 0) + sign * amount
+        for name in contribution["skills"]:
+            entry = skills.setdefault(skill_key(name), [name, 0])
+            entry[1] += sign
+    return (
+        {field: change for field, change in totals.items() if change},
+        {key: entry for key, entry in skills.items() if entry[1]},
+    )
+
+def merge_analytics_delta(into: tuple, delta: tuple):
+    for field, change in delta[0].items():
+        into[0][field] = into[0].get(field, 0) + change
+    for key, (name, change) in delta[1].items():
+        into[1].setdefault(key, [name, 0])[1] += change
+
+async def apply_analytics_delta(delta: tuple):
+    totals, skills = delta
+    totals = {field: change for field, change in totals.items() if change}
+    if totals:
+        await db.analytics.update_one(
+            {"id": "resumes"},
+            {"$inc": totals, "$set": {"updated_at": datetime.now(timezone.utc)}},
+            upsert=True,
+        )
+    skills = {key: entry for key, entry in skills.items() if entry[1]}
+    if skills:
+        await db.analytics_skills.bulk_write([
+            UpdateOne({"key": key}, {"$inc": {"count": change}, "$setOnInsert": {"name": name}}, upsert=True)
+            for key, (name, change) in skills.items()
+        ], ordered=False)
+        dropped = [key for key, (_, change) in skills.items() if change < 0]
+        if dropped:
+            await db.analytics_skills.delete_many({"key": {"$in": dropped}, "count": {"$lte": 0}})
+
+async def update_analytics_counters(old: Optional[Dict[str, Any]], new: Optional[Dict[str, Any]]):
+    # Runs after the resume write it accounts for; should it fail, the counters drift from the
+    # stored contributions until a recount
+    if not ANALYTICS_ENABLED or old == new:
+        return
+    try:
+        await apply_analytics_delta(analytics_counter_delta(old, new))
+    except Exception as e:
+        logger.error(f"Analytics counter update failed: {str(e)}")
+
+async def sync_resume_analytics(resume_id: str, doc: Dict[str, Any]):
+    # doc is the SCORE_INPUT_PROJECTION of the resume right after a section write. The swap only applies
+    # at that version and over the contribution we read, so each change moves the counters exactly once.
+    if not ANALYTICS_ENABLED:
+        return
+    old = doc.get("analytics")
+    new = resume_analytics(doc.get("data") or {})
+    if new == old:
+        return
+    result = await db.resumes.update_one(
+        {"id": resume_id, **version_filter(doc.get("version", 0)), "analytics": old},
+        {"$set": {"analytics": new}},
+    )
+    if result.modified_count:
+        await update_analytics_counters(old, new)
+
+async def rebuild_analytics(recount: bool = False) -> Dict[str, Any]:
+    """Bring every resume's stored contribution up to date, streaming resumes in _id order.
+
+    By default each stale contribution is swapped like a section write and its difference applied,
+    batch by batch, so it is safe alongside traffic and backfills resumes that predate analytics.
+    With `recount` the counters are then overwritten with the sum of all contributions, which also
+    repairs drift from failed counter updates; writes landing mid-recount may need another pass.
+    """
+    scanned = updated = 0
+    tally = ({}, {})
+    query: Dict[str, Any] = {}
+    last_id = None
+    while True:
+        if last_id is not None:
+            query["_id"] = {"$gt": last_id}
+        batch = await db.resumes.find(query, ANALYTICS_INPUT_PROJECTION).sort("_id", 1).limit(ANALYTICS_REBUILD_BATCH_SIZE).to_list(ANALYTICS_REBUILD_BATCH_SIZE)
+        if not batch:
+            break
+        last_id = batch[-1]["_id"]
+        swaps = []
+        for doc in batch:
+            old = doc.get("analytics")
+            new = resume_analytics(doc.get("data") or {})
+            if recount:
+                merge_analytics_delta(tally, analytics_counter_delta(None, new))
+            if new != old:
+                swaps.append((doc, old, new))
+        results = await asyncio.gather(*(
+            db.resumes.update_one({"_id": doc["_id"], **version_filter(doc.get("version", 0)), "analytics": old}, {"$set": {"analytics": new}})
+            for doc, old, new in swaps
+        ))
+        delta = ({}, {})
+        for (doc, old, new), result in zip(swaps, results):
+            if result.modified_count:
+                updated += 1
+                merge_analytics_delta(delta, analytics_counter_delta(old, new))
+        if not recount:
+            await apply_analytics_delta(delta)
+        scanned += len(batch)
+    if recount:
+        totals, skills = tally
+        now = datetime.now(timezone.utc)
+        await db.analytics.replace_one({"id": "resumes"}, {"id": "resumes", **expand_counter_fields(totals), "updated_at": now}, upsert=True)
+        # Skills missing from this recount are the ones not stamped with it
+        stamp = str(uuid.uuid4())
+        requests = [
+            UpdateOne({"key": key}, {"$set": {"name": name, "count": count, "recount": stamp}}, upsert=True)
+            for key, (name, count) in skills.items() if count > 0
+        ]
+        for start in range(0, len(requests), ANALYTICS_REBUILD_BATCH_SIZE):
+            await db.analytics_skills.bulk_write(requests[start:start + ANALYTICS_REBUILD_BATCH_SIZE], ordered=False)
+        await db.analytics_skills.delete_many({"recount": {"$ne": stamp}})
+    return {"scanned": scanned, "updated": updated, "recount": recount}
+
+def expand_counter_fields(totals: Dict[str, int]) -> Dict[str, Any]:
+    """Turn dotted counter paths ("complete.summary") into the nested document they address."""
+    document: Dict[str, Any] = {}
+    for path, value in totals.items():
+        *parents, name = path.split(".")
+        target = document
+        for parent in parents:
+            target = target.setdefault(parent, {})
+        target[name] = value
+    return document
+
+@api_router.get("/analytics/overview", response_model=AnalyticsOverview)
+async def analytics_overview(admin: User = Depends(get_admin_user)):
+    totals = await db.analytics.find_one({"id": "resumes"}, {"_id": 0}) or {}
+    count = totals.get("resumes", 0)
+    breakdown_sums = totals.get("breakdown_sums") or {}
+    complete = totals.get("complete") or {}
+    bands = totals.get("score_bands") or {}
+    return AnalyticsOverview(
+        resumes=count,
+        average_score=round(totals.get("score_sum", 0) / count, 1) if count else None,
+        average_breakdown={component: round(breakdown_sums.get(component, 0) / count, 1) if count else 0.0 for component in SCORE_COMPONENT_SECTIONS},
+        score_distribution={score_band(low): bands.get(score_band(low), 0) for low in range(0, 100, 10)},
+        section_completeness={section: round(complete.get(section, 0) / count, 3) if count else 0.0 for section in ANALYTICS_SECTIONS},
+        updated_at=totals.get("updated_at"),
+    )
+
+@api_router.get("/analytics/skills", response_model=SkillAnalytics)
+async def analytics_skills(limit: int = Query(20, ge=1, le=200), admin: User = Depends(get_admin_user)):
+    totals, top = await asyncio.gather(
+        db.analytics.find_one({"id": "resumes"}, {"_id": 0, "resumes": 1}),
+        db.analytics_skills.find({"count": {"$gt": 0}}, {"_id": 0, "name": 1, "count": 1}).sort([("count", -1), ("key", 1)]).limit(limit).to_list(limit),
+    )
+    count = (totals or {}).get("resumes", 0)
+    return SkillAnalytics(
+        resumes=count,
+        skills=[SkillCount(name=skill["name"], count=skill["count"], share=round(skill["count"] / count, 3) if count else 0.0) for skill in top],
+    )
+
+@api_router.post("/analytics/rebuild", status_code=202)
+async def start_analytics_rebuild(recount: bool = False, admin: User = Depends(get_admin_user)):
+    # Below interactive jobs so a long rebuild never delays a user's render
+    job = await enqueue_job("rebuild_analytics", admin.id, {"recount": recount}, priority=-1)
+    return public_job_view(job)
+
 # AI Endpoints
-@api_router.post("/ai/generate-summary")
-async def generate_summary(request: AIRequest, current_user: User = Depends(get_current_user)):
-    context = request.context or {}
+SUMMARY_SYSTEM_MESSAGE = "You are a professional resume writer."
+OPTIMIZE_SYSTEM_MESSAGE = "You are a professional resume optimization expert."
+
+def build_summary_prompt(context: Dict[str, Any]) -> tuple:
+    """Return the summary prompt and the template response used when AI is not configured."""
     experiences = context.get("experiences", [])
     internships = context.get("internships", [])
     hackathons = context.get("hackathons", [])
@@ -356,269 +2308,1595 @@ Skills: {skills_text}
 
 Write a compelling summary that highlights key strengths and career focus. Keep it concise and impactful."""
     
+    fallback = {
+        "summary": f"Motivated professional with experience in {skills_text[:50]}... Proven track record in {'internships and ' if internships else ''}{'hackathons and ' if hackathons else ''}project development.",
+        "note": "AI summary generation requires OpenAI API key. This is a template - please customize it."
+    }
+    return prompt, fallback
+
+def build_optimize_prompt(content: str) -> tuple:
+    """Return the optimisation prompt and the response used when AI is not configured."""
+    prompt = f"""Optimize the following resume content for ATS (Applicant Tracking System) and make it more impactful:
+
+{content}
+
+Provide an improved version with strong action verbs, quantifiable achievements, and relevant keywords."""
+    
+    fallback = {
+        "optimized": content,
+        "note": "AI optimization requires OpenAI API key. Consider adding action verbs and quantifiable achievements."
+    }
+    return prompt, fallback
+
+def sse_event(data: Dict[str, Any], event: Optional[str] = None) -> str:
+    prefix = f"event: {event}\n" if event else ""
+    return f"{prefix}data: {json.dumps(data)}\n\n"
+
+async def llm_event_stream(prompt: str, system_message: str, field: str, fallback: Dict[str, Any], bypass_cache: bool, user_id: str):
+    # Events: unnamed "data" events carry token deltas, then a final "done" (or "error") event
+    if not get_openai_client():
+        yield sse_event({"delta": fallback[field]})
+        yield sse_event(fallback, event="done")
+        return
+    parts = []
+    try:
+        async for delta in stream_llm(prompt, system_message, bypass_cache=bypass_cache, user_id=user_id):
+            parts.append(delta)
+            yield sse_event({"delta": delta})
+    except HTTPException as e:
+        error = {"detail": e.detail}
+        if e.headers and "Retry-After" in e.headers:
+            error["retry_after"] = int(e.headers["Retry-After"])
+        yield sse_event(error, event="error")
+        return
+    yield sse_event({field: "".join(parts)}, event="done")
+
+def sse_response(events) -> StreamingResponse:
+    # Starlette cancels the generator when the client disconnects, which closes the upstream stream
+    return StreamingResponse(
+        events,
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
+
+@api_router.post("/ai/generate-summary")
+async def generate_summary(request: AIRequest, current_user: User = Depends(get_current_user)):
+    prompt, fallback = build_summary_prompt(request.context or {})
+    
     try:
-        summary = await call_llm(prompt, "You are a professional resume writer.")
+        summary = await call_llm(prompt, SUMMARY_SYSTEM_MESSAGE, bypass_cache=request.regenerate, user_id=current_user.id)
         return {"summary": summary}
     except HTTPException as e:
         # If AI not available, return a helpful template
         if e.status_code == 503:
-            return {
-                "summary": f"Motivated professional with experience in {skills_text[:50]}... Proven track record in {'internships and ' if internships else ''}{'hackathons and ' if hackathons else ''}project development.",
-                "note": "AI summary generation requires OpenAI API key. This is a template - please customize it."
-            }
+            return fallback
         raise
 
+@api_router.post("/ai/generate-summary/stream")
+async def stream_generate_summary(request: AIRequest, current_user: User = Depends(get_current_user)):
+    prompt, fallback = build_summary_prompt(request.context or {})
+    return sse_response(llm_event_stream(prompt, SUMMARY_SYSTEM_MESSAGE, "summary", fallback, request.regenerate, current_user.id))
+
 @api_router.post("/ai/optimize-content")
 async def optimize_content(request: AIRequest, current_user: User = Depends(get_current_user)):
-    prompt = f"""Optimize the following resume content for ATS (Applicant Tracking System) and make it more impactful:
-
-{request.prompt}
-
-Provide an improved version with strong action verbs, quantifiable achievements, and relevant keywords."""
+    prompt, fallback = build_optimize_prompt(request.prompt)
     
     try:
-        optimized = await call_llm(prompt, "You are a professional resume optimization expert.")
+        optimized = await call_llm(prompt, OPTIMIZE_SYSTEM_MESSAGE, bypass_cache=request.regenerate, user_id=current_user.id)
         return {"optimized": optimized}
     except HTTPException as e:
         if e.status_code == 503:
-            return {
-                "optimized": request.prompt,
-                "note": "AI optimization requires OpenAI API key. Consider adding action verbs and quantifiable achievements."
-            }
+            return fallback
         raise
 
+@api_router.post("/ai/optimize-content/stream")
+async def stream_optimize_content(request: AIRequest, current_user: User = Depends(get_current_user)):
+    prompt, fallback = build_optimize_prompt(request.prompt)
+    return sse_response(llm_event_stream(prompt, OPTIMIZE_SYSTEM_MESSAGE, "optimized", fallback, request.regenerate, current_user.id))
+
 @api_router.post("/ai/calculate-score", response_model=ScoreResponse)
 async def calculate_score(request: AIRequest, current_user: User = Depends(get_current_user)):
-    resume_data = request.context or {}
-    
-    personal_info = resume_data.get("personal_info", {})
-    summary = resume_data.get("summary", "")
-    experiences = resume_data.get("experiences", [])
-    internships = resume_data.get("internships", [])
-    hackathons = resume_data.get("hackathons", [])
-    education = resume_data.get("education", [])
-    projects = resume_data.get("projects", [])
-    skills = resume_data.get("skills", [])
-    events = resume_data.get("events", [])
-    
-    scores = {
-        "personal_info": 0,
-        "summary": 0,
-        "experience": 0,
-        "education": 0,
-        "skills": 0,
-        "achievements": 0
-    }
-    suggestions = []
-    
-    if personal_info.get("full_name") and personal_info.get("email") and personal_info.get("phone"):
-        scores["personal_info"] = 15
-    else:
-        suggestions.append("Complete your contact information")
-    
-    if summary and len(summary) > 50:
-        scores["summary"] = 15
-    else:
-        suggestions.append("Add a professional summary (2-3 sentences)")
-    
-    total_work_exp = len(experiences) + len(internships)
-    if total_work_exp >= 2:
-        scores["experience"] = 25
-    elif total_work_exp == 1:
-        scores["experience"] = 15
-        suggestions.append("Add more work experiences or internships")
-    else:
-        suggestions.append("Add work experiences or internships")
-    
-    if education:
-        scores["education"] = 15
-    else:
-        suggestions.append("Add your education background")
-    
-    if skills and len(skills) >= 5:
-        scores["skills"] = 15
-    elif skills:
-        scores["skills"] = 10
-        suggestions.append("Add more skills (aim for 5+)")
-    else:
-        suggestions.append("Add your technical and professional skills")
+    scored = score_resume_data(request.context or {})
+    return build_score_response(scored["score_breakdown"], scored["score_suggestions"])
+
+# Job Description Matching
+# Resumes and the job description become TF-IDF vectors. Each resume's sparse term counts are cached
+# per version, so ranking only re-tokenises resumes edited since the last request. Term ids are assigned
+# per request over the candidates' and the job's terms, and IDF is computed over that same batch.
+JOB_MATCH_STOPWORDS = SEARCH_STOPWORDS | {
+    "ability", "able", "about", "are", "be", "been", "being", "but", "can", "candidate", "do", "etc", "experience",
+    "have", "has", "help", "hiring", "ideal", "including", "is", "it", "its", "join", "looking", "must", "new", "our", "own", "plus",
+    "preferred", "requirements", "responsibilities", "role", "should", "strong", "that", "their", "they", "this",
+    "we", "what", "who", "will", "work", "working", "year", "years", "you", "your",
+}
+JOB_MATCH_PROJECTION = {
+    "_id": 0,
+    "id": 1,
+    "version": 1,
+    "data.summary": 1,
+    **{f"data.{section}.{field}": 1 for section, fields in SEARCH_ITEM_FIELDS.items() for field in fields},
+}
+
+def count_match_terms(text: str, counts: Dict[str, int], surface: Optional[Dict[str, str]] = None, weight: int = 1):
+    for token in SEARCH_TOKEN.findall(text.lower()):
+        if token in JOB_MATCH_STOPWORDS or token.isdigit():
+            continue
+        stem = search_stem(token)
+        counts[stem] = counts.get(stem, 0) + weight
+        if surface is not None:
+            surface.setdefault(stem, token)
+
+def resume_term_counts(doc: Dict[str, Any]) -> Dict[str, int]:
+    counts: Dict[str, int] = {}
+    data = doc.get("data") or {}
+    count_match_terms(data.get("summary") or "", counts)
+    for section, fields in SEARCH_ITEM_FIELDS.items():
+        # Listed skills are deliberate claims, so they count double
+        weight = 2 if section == "skills" else 1
+        for item in data.get(section) or []:
+            for field in fields:
+                value = item.get(field)
+                for text in value if isinstance(value, list) else [value or ""]:
+                    count_match_terms(text, counts, weight=2 if field in ("skills", "technologies") else weight)
+    return counts
+
+class TermVectorCache:
+    """Sparse term-count vectors per (resume id, version), as (terms, counts) arrays; evicting a
+    resume frees its terms, so memory follows the cached resumes rather than every term ever seen."""
+
+    def __init__(self, max_entries: int):
+        self.max_entries = max_entries
+        self._entries: "OrderedDict[str, tuple]" = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, resume_id: str, version: int) -> Optional[tuple]:
+        entry = self._entries.get(resume_id)
+        if entry is None or entry[0] != version:
+            self.misses += 1
+            return None
+        self._entries.move_to_end(resume_id)
+        self.hits += 1
+        return entry[1]
+
+    def put(self, resume_id: str, version: int, counts: Dict[str, int]) -> tuple:
+        vector = (np.array(list(counts), dtype=str), np.fromiter(counts.values(), dtype=np.float64, count=len(counts)))
+        self._entries[resume_id] = (version, vector)
+        self._entries.move_to_end(resume_id)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+        return vector
+
+    def stats(self) -> Dict[str, Any]:
+        terms = sum(len(vector[0]) for _, vector in self._entries.values())
+        return {"entries": len(self._entries), "terms": terms, "hits": self.hits, "misses": self.misses}
+
+term_vector_cache = TermVectorCache(TERM_VECTOR_CACHE_MAX_ENTRIES)
+
+def rank_against_job(vectors: List[tuple], job_counts: Dict[str, int]) -> tuple:
+    """Return (cosine scores, keyword presence matrix, top keyword stems) for resume vectors against a job."""
+    job_terms = list(job_counts)
+    job_tf = np.fromiter(job_counts.values(), dtype=np.float64, count=len(job_counts))
+
+    # Ids over this request's terms only, so every array below is sized by the request
+    lengths = np.array([len(terms) for terms, _ in vectors], dtype=np.int64)
+    vocabulary, inverse = np.unique(np.concatenate([terms for terms, _ in vectors] + [np.array(job_terms, dtype=str)]), return_inverse=True)
+    width = len(vocabulary)
+    all_ids = inverse[:-len(job_terms)]
+    job_ids = inverse[-len(job_terms):]
+    all_tf = np.concatenate([tf for _, tf in vectors]) if vectors else np.zeros(0)
+    rows = np.repeat(np.arange(len(vectors)), lengths)
+
+    # Smoothed IDF over the batch, with the job description as one more document
+    document_frequency = np.bincount(all_ids, minlength=width).astype(np.float64)
+    document_frequency[job_ids] += 1
+    idf = np.log((2 + len(vectors)) / (1 + document_frequency)) + 1
+
+    weights = (1 + np.log(all_tf)) * idf[all_ids]
+    norms = np.sqrt(np.bincount(rows, weights=weights ** 2, minlength=len(vectors)))
+    job_vector = np.zeros(width)
+    job_vector[job_ids] = (1 + np.log(job_tf)) * idf[job_ids]
+    job_vector /= np.linalg.norm(job_vector)
+    dots = np.bincount(rows, weights=weights * job_vector[all_ids], minlength=len(vectors))
+    scores = np.divide(dots, norms, out=np.zeros(len(vectors)), where=norms > 0)
+
+    # Which of the job's heaviest terms each resume contains, as a resumes x keywords matrix
+    top_positions = np.argsort(-job_vector[job_ids], kind="stable")[:JOB_MATCH_KEYWORDS]
+    top_ids = job_ids[top_positions]
+    column = np.full(width, -1, dtype=np.int64)
+    column[top_ids] = np.arange(len(top_ids))
+    columns = column[all_ids]
+    present = np.zeros((len(vectors), len(top_ids)), dtype=bool)
+    hit = columns >= 0
+    present[rows[hit], columns[hit]] = True
+    return scores, present, [job_terms[position] for position in top_positions]
+
+@api_router.post("/resumes/match-job", response_model=JobMatchResponse)
+async def match_job(request: JobMatchRequest, current_user: User = Depends(get_current_user)):
+    job_counts: Dict[str, int] = {}
+    surface: Dict[str, str] = {}
+    count_match_terms(request.job_description, job_counts, surface)
+    if not job_counts:
+        raise HTTPException(status_code=422, detail="Job description has no usable keywords")
     
-    achievement_count = len(hackathons) + len(projects) + len(events)
-    if achievement_count >= 3:
-        scores["achievements"] = 15
-    elif achievement_count >= 1:
-        scores["achievements"] = 10
-        suggestions.append("Add more projects, hackathons, or events")
-    else:
-        suggestions.append("Add projects, hackathons, or relevant events")
+    query: Dict[str, Any] = {"user_id": current_user.id}
+    if request.resume_ids is not None:
+        query["id"] = {"$in": request.resume_ids}
+    heads = await db.resumes.find(query, {"_id": 0, "id": 1, "title": 1, "version": 1}).to_list(1000)
+    vectors = {head["id"]: term_vector_cache.get(head["id"], head.get("version", 0)) for head in heads}
+    stale = [resume_id for resume_id, vector in vectors.items() if vector is None]
+    if stale:
+        # Only resumes edited since they were last vectorised are read in full
+        async for doc in db.resumes.find({"user_id": current_user.id, "id": {"$in": stale}}, JOB_MATCH_PROJECTION):
+            vectors[doc["id"]] = term_vector_cache.put(doc["id"], doc.get("version", 0), resume_term_counts(doc))
+    heads = [head for head in heads if vectors.get(head["id"]) is not None]
     
-    total_score = sum(scores.values())
+    scores, present, top_terms = rank_against_job([vectors[head["id"]] for head in heads], job_counts)
+    keywords = [surface[term] for term in top_terms]
     
-    if total_score < 60:
-        suggestions.insert(0, "Your resume needs more content to stand out")
-    elif total_score < 80:
-        suggestions.insert(0, "Good progress! Add more details to reach excellence")
-    else:
-        suggestions.insert(0, "Great resume! Consider fine-tuning descriptions")
-    
-    return ScoreResponse(
-        score=total_score,
-        breakdown=scores,
-        suggestions=suggestions
-    )
+    results = []
+    for index in np.argsort(-scores, kind="stable")[:request.limit]:
+        row = present[index]
+        results.append(JobMatchResult(
+            resume_id=heads[index]["id"],
+            title=heads[index]["title"],
+            score=int(round(scores[index] * 100)),
+            keyword_coverage=int(round(row.mean() * 100)) if len(row) else 0,
+            matched_keywords=[keyword for keyword, found in zip(keywords, row) if found],
+            missing_keywords=[keyword for keyword, found in zip(keywords, row) if not found],
+        ))
+    return json_response(JobMatchResponse(keywords=keywords, results=results))
+
+# Export Rendering
+class RenderCache:
+    """Bounded LRU of rendered exports keyed by content hash, with an optional on-disk tier.
+    The disk tier is LRU by mtime (reads touch the file) and trimmed to directory_max_bytes."""
+
+    def __init__(self, max_entries: int, max_bytes: int, directory: Optional[str] = None, directory_max_bytes: int = 0):
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self.directory = Path(directory) if directory else None
+        self.directory_max_bytes = directory_max_bytes
+        if self.directory:
+            self.directory.mkdir(parents=True, exist_ok=True)
+        self._entries: "OrderedDict[str, bytes]" = OrderedDict()
+        self._size = 0
+        # Directory size as of the last sweep plus this process's writes since; None until the first write
+        self._disk_size: Optional[int] = None
+        self.hits = 0
+        self.misses = 0
+        self.disk_evictions = 0
+
+    def get(self, key: str) -> Optional[bytes]:
+        data = self._entries.get(key)
+        if data is not None:
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return data
+        if self.directory:
+            path = self.directory / f"{key}.render"
+            try:
+                data = path.read_bytes()
+                os.utime(path)
+            except FileNotFoundError:
+                data = None
+            if data is not None:
+                self._remember(key, data)
+                self.hits += 1
+                return data
+        self.misses += 1
+        return None
+
+    def put(self, key: str, data: bytes):
+        self._remember(key, data)
+        if self.directory:
+            path = self.directory / f"{key}.render"
+            tmp_path = path.with_suffix(f".{uuid.uuid4().hex}.tmp")
+            try:
+                tmp_path.write_bytes(data)
+                os.replace(tmp_path, path)
+            except OSError as e:
+                logging.warning(f"Render cache write failed: {str(e)}")
+                tmp_path.unlink(missing_ok=True)
+                return
+            if self._disk_size is None:
+                self._sweep_disk()
+            else:
+                self._disk_size += len(data)
+                if self._disk_size > self.directory_max_bytes:
+                    self._sweep_disk()
+
+    def _sweep_disk(self):
+        # Other workers share the directory, so every sweep re-reads it rather than trusting our count.
+        # Trimming to 90% of the budget keeps the next sweep a good number of writes away.
+        files = []
+        for path in self.directory.glob("*.render"):
+            try:
+                info = path.stat()
+            except FileNotFoundError:
+                continue
+            files.append((info.st_mtime, info.st_size, path))
+        size = sum(file_size for _, file_size, _ in files)
+        if size > self.directory_max_bytes:
+            target = self.directory_max_bytes * 0.9
+            for _, file_size, path in sorted(files, key=lambda file: file[0]):
+                if size <= target:
+                    break
+                path.unlink(missing_ok=True)
+                size -= file_size
+                self.disk_evictions += 1
+        self._disk_size = size
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "entries": len(self._entries),
+            "bytes": self._size,
+            "hits": self.hits,
+            "misses": self.misses,
+            "disk_bytes": self._disk_size,
+            "disk_evictions": self.disk_evictions,
+        }
+
+    def _remember(self, key: str, data: bytes):
+        if len(data) > self.max_bytes:
+            return
+        old = self._entries.pop(key, None)
+        if old is not None:
+            self._size -= len(old)
+        self._entries[key] = data
+        self._size += len(data)
+        while len(self._entries) > self.max_entries or self._size > self.max_bytes:
+            _, evicted = self._entries.popitem(last=False)
+            self._size -= len(evicted)
+
+render_cache = RenderCache(RENDER_CACHE_MAX_ENTRIES, RENDER_CACHE_MAX_BYTES, RENDER_CACHE_DIR, RENDER_CACHE_DIR_MAX_BYTES)
+
+def render_cache_key(resume: Resume, export_format: str = "pdf") -> str:
+    payload = f"{RENDER_VERSION}\0{export_format}\0{resume.template}\0{resume.data.model_dump_json()}"
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+def etag_matches(if_none_match: Optional[str], etag: str) -> bool:
+    if not if_none_match:
+        return False
+    for candidate in if_none_match.split(","):
+        candidate = candidate.strip()
+        if candidate == "*":
+            return True
+        if candidate.startswith("W/"):
+            candidate = candidate[2:]
+        if candidate == etag:
+            return True
+    return False
+
+async def render_resume_export(resume: Resume, export_format: str = "pdf", cache_key: Optional[str] = None) -> bytes:
+    cache_key = cache_key or render_cache_key(resume, export_format)
+    content = render_cache.get(cache_key)
+    if content is None:
+        backend, _, _, in_pool = EXPORT_FORMATS[export_format]
+        document = export_document_cache.get(resume.data)
+        template = pdf_template_name(resume.template)
+        started = time.perf_counter()
+        # PDF and DOCX are CPU-bound; HTML and Markdown cost less than the hop to the pool
+        content = await render_pool.run(backend, document, template) if in_pool else backend(document, template)
+        if export_format == "pdf":
+            PDF_RENDER_SECONDS.labels(template).observe(time.perf_counter() - started)
+            PDF_RENDER_BYTES.labels(template).observe(len(content))
+        render_cache.put(cache_key, content)
+    return content
+
+# Export Documents
+# A resume is lowered once into an ExportDocument: plain blocks of styled text runs that every
+# export backend (PDF, DOCX, HTML, Markdown) renders without walking ResumeData again.
+# Documents are cached by content hash in the API process and shipped to the render pool as-is.
+SECTION_TITLES = {
+    "summary": "PROFESSIONAL SUMMARY",
+    "experiences": "EXPERIENCE",
+    "internships": "INTERNSHIPS",
+    "hackathons": "HACKATHONS",
+    "education": "EDUCATION",
+    "projects": "PROJECTS",
+    "events": "EVENTS & ACTIVITIES",
+    "skills": "SKILLS",
+}
+
+# A block is (style, runs) with style "body" or "meta" and runs a list of (text, mark), mark being
+# None, "b" or "i"; or ("space", inches) for vertical space that only paged formats honour.
+def text_block(style: str, *runs) -> tuple:
+    return (style, [run if isinstance(run, tuple) else (run, None) for run in runs])
+
+def space_block(inches: float) -> tuple:
+    return ("space", inches)
+
+def lower_summary(summary: str) -> list:
+    return [text_block("body", summary), space_block(0.15)]
+
+def lower_experiences(experiences: List[ExperienceItem]) -> list:
+    blocks = []
+    for exp in experiences:
+        blocks.append(text_block("body", (exp.title, "b"), f" - {exp.organization}"))
+        blocks.append(text_block("meta", (f"{exp.start_date} - {exp.end_date}", "i")))
+        if exp.location:
+            blocks.append(text_block("body", f"Location: {exp.location}"))
+        blocks.append(text_block("body", exp.description))
+        if exp.skills:
+            blocks.append(text_block("body", f"Skills: {', '.join(exp.skills)}"))
+        blocks.append(space_block(0.1))
+    return blocks
+
+def lower_internships(internships: List[InternshipItem]) -> list:
+    blocks = []
+    for intern in internships:
+        blocks.append(text_block("body", (intern.title, "b"), f" - {intern.company}"))
+        blocks.append(text_block("meta", (f"{intern.start_date} - {intern.end_date}", "i")))
+        if intern.location:
+            blocks.append(text_block("body", f"Location: {intern.location}"))
+        blocks.append(text_block("body", intern.description))
+        if intern.skills:
+            blocks.append(text_block("body", f"Skills: {', '.join(intern.skills)}"))
+        blocks.append(space_block(0.1))
+    return blocks
+
+def lower_hackathons(hackathons: List[HackathonItem]) -> list:
+    blocks = []
+    for hack in hackathons:
+        blocks.append(text_block("body", (hack.name, "b"), f" - {hack.organizer}"))
+        blocks.append(text_block("meta", (hack.date, "i")))
+        blocks.append(text_block("body", f"Project: {hack.project_title}"))
+        if hack.achievement:
+            blocks.append(text_block("body", f"Achievement: {hack.achievement}"))
+        blocks.append(text_block("body", hack.description))
+        if hack.technologies:
+            blocks.append(text_block("body", f"Technologies: {', '.join(hack.technologies)}"))
+        blocks.append(space_block(0.1))
+    return blocks
+
+def lower_education(education: List[EducationItem]) -> list:
+    blocks = []
+    for edu in education:
+        blocks.append(text_block("body", (edu.degree, "b"), f" - {edu.field}"))
+        blocks.append(text_block("meta", f"{edu.institution} | {edu.start_date} - {edu.end_date}"))
+        if edu.gpa:
+            blocks.append(text_block("body", f"GPA: {edu.gpa}"))
+        blocks.append(space_block(0.1))
+    return blocks
+
+def lower_projects(projects: List[ProjectItem]) -> list:
+    blocks = []
+    for proj in projects:
+        blocks.append(text_block("body", (proj.title, "b")))
+        blocks.append(text_block("body", proj.description))
+        if proj.technologies:
+            blocks.append(text_block("body", f"Technologies: {', '.join(proj.technologies)}"))
+        blocks.append(space_block(0.1))
+    return blocks
+
+def lower_events(events: List[EventItem]) -> list:
+    blocks = []
+    for event in events:
+        blocks.append(text_block("body", (event.title, "b"), f" - {event.organization}"))
+        blocks.append(text_block("meta", (event.date, "i")))
+        if event.role:
+            blocks.append(text_block("body", f"Role: {event.role}"))
+        blocks.append(text_block("body", event.description))
+        blocks.append(space_block(0.1))
+    return blocks
+
+def lower_skills(skills: List[SkillItem]) -> list:
+    return [text_block("body", ", ".join([skill.name for skill in skills]))]
+
+SECTION_LOWERERS = {
+    "summary": lower_summary,
+    "experiences": lower_experiences,
+    "internships": lower_internships,
+    "hackathons": lower_hackathons,
+    "education": lower_education,
+    "projects": lower_projects,
+    "events": lower_events,
+    "skills": lower_skills,
+}
+
+class ExportDocument:
+    """A resume lowered to a name, contact line and non-empty sections of text blocks."""
+
+    __slots__ = ("name", "contact", "sections")
+
+    def __init__(self, name: Optional[str], contact: List[str], sections: Dict[str, list]):
+        self.name = name
+        self.contact = contact
+        self.sections = sections
+
+    def __getstate__(self):
+        return (self.name, self.contact, self.sections)
+
+    def __setstate__(self, state):
+        self.name, self.contact, self.sections = state
+
+    def ordered_sections(self, section_order: List[str]):
+        for section in section_order:
+            blocks = self.sections.get(section)
+            if blocks:
+                yield SECTION_TITLES[section], blocks
+
+def lower_resume(data: ResumeData) -> ExportDocument:
+    personal = data.personal_info
+    contact = [value for value in (personal.email, personal.phone, personal.location) if value]
+    sections = {}
+    for section, lower in SECTION_LOWERERS.items():
+        value = getattr(data, section)
+        if value:
+            sections[section] = lower(value)
+    return ExportDocument(personal.full_name or None, contact, sections)
+
+class ExportDocumentCache:
+    """Bounded LRU of ExportDocuments keyed by the hash of the resume content they came from."""
+
+    def __init__(self, max_entries: int):
+        self.max_entries = max_entries
+        self._entries: "OrderedDict[str, ExportDocument]" = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, data: ResumeData) -> ExportDocument:
+        key = hashlib.sha256(data.model_dump_json().encode("utf-8")).hexdigest()
+        document = self._entries.get(key)
+        if document is not None:
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return document
+        self.misses += 1
+        document = self._entries[key] = lower_resume(data)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+        return document
+
+    def stats(self) -> Dict[str, Any]:
+        return {"entries": len(self._entries), "hits": self.hits, "misses": self.misses}
+
+export_document_cache = ExportDocumentCache(EXPORT_DOCUMENT_CACHE_MAX_ENTRIES)
+
+# Templates
+# A template is a name, label and section order shared by every format; its PDF styles are built
+# on first use in each process (in practice the render pool workers), so ReportLab is never
+# loaded by an API process that only serves cached exports.
+class PdfTemplate:
+    """ReportLab rendering of a template: prebuilt paragraph styles, page margins and heading rule."""
+
+    def __init__(self, name: str, styles: Dict[str, Any], section_order: List[str],
+                 margins: Optional[float] = None, heading_rule: Any = None):
+        self.name = name
+        self.styles = styles
+        self.section_order = section_order
+        self.margins = units.inch if margins is None else margins
+        self.heading_rule = heading_rule
+
+    def heading(self, title: str) -> list:
+        flowables = [platypus.Paragraph(title, self.styles["heading"])]
+        if self.heading_rule is not None:
+            flowables.append(platypus.HRFlowable(width="100%", thickness=0.5, color=self.heading_rule, spaceBefore=0, spaceAfter=4))
+        return flowables
+
+    def flowables(self, blocks: list) -> list:
+        flowables = []
+        for style, content in blocks:
+            if style == "space":
+                flowables.append(platypus.Spacer(1, content*units.inch))
+            else:
+                # Text goes in as ReportLab paragraph markup, as it always has
+                markup = "".join(f"<{mark}>{text}</{mark}>" if mark else text for text, mark in content)
+                flowables.append(platypus.Paragraph(markup, self.styles[style]))
+        return flowables
+
+    def build_story(self, document: ExportDocument) -> list:
+        story = []
+        if document.name:
+            story.append(platypus.Paragraph(document.name, self.styles["title"]))
+            if document.contact:
+                story.append(platypus.Paragraph(" | ".join(document.contact), self.styles["contact"]))
+            story.append(platypus.Spacer(1, 0.2*units.inch))
+        for title, blocks in document.ordered_sections(self.section_order):
+            story.extend(self.heading(title))
+            story.extend(self.flowables(blocks))
+        return story
+
+# name -> (label, section order, PDF template builder); PDF_TEMPLATES holds those built so far in this process
+EXPORT_TEMPLATES: Dict[str, tuple] = {}
+PDF_TEMPLATES: Dict[str, PdfTemplate] = {}
+DEFAULT_PDF_TEMPLATE = "modern"
+
+def register_template(name: str, label: str, section_order: List[str], build_pdf):
+    EXPORT_TEMPLATES[name] = (label, section_order, build_pdf)
+    PDF_TEMPLATES.pop(name, None)
+
+def pdf_template_name(name: Optional[str]) -> str:
+    # Resumes saved with a template that has since been removed render with the default
+    return name if name in EXPORT_TEMPLATES else DEFAULT_PDF_TEMPLATE
+
+def template_section_order(name: Optional[str]) -> List[str]:
+    return EXPORT_TEMPLATES[pdf_template_name(name)][1]
+
+def get_pdf_template(name: Optional[str]) -> PdfTemplate:
+    name = pdf_template_name(name)
+    template = PDF_TEMPLATES.get(name)
+    if template is None:
+        _, section_order, build_pdf = EXPORT_TEMPLATES[name]
+        template = PDF_TEMPLATES[name] = build_pdf(name, section_order)
+    return template
+
+def build_modern_template(name: str, section_order: List[str]) -> PdfTemplate:
+    base = rl_styles.getSampleStyleSheet()
+    styles = {
+        "title": rl_styles.ParagraphStyle(
+            'ModernTitle',
+            parent=base['Heading1'],
+            fontSize=24,
+            textColor=colors.HexColor('#1a365d'),
+            spaceAfter=6,
+            alignment=enums.TA_CENTER
+        ),
+        "heading": rl_styles.ParagraphStyle(
+            'ModernHeading',
+            parent=base['Heading2'],
+            fontSize=14,
+            textColor=colors.HexColor('#2c5282'),
+            spaceAfter=6,
+            spaceBefore=12,
+        ),
+        "contact": base['Normal'],
+        "body": base['Normal'],
+        "meta": base['Normal'],
+    }
+    return PdfTemplate(name, styles, section_order)
+
+def build_classic_template(name: str, section_order: List[str]) -> PdfTemplate:
+    base = rl_styles.getSampleStyleSheet()
+    body = rl_styles.ParagraphStyle('ClassicBody', parent=base['Normal'], fontName='Times-Roman', fontSize=11, leading=13.5)
+    styles = {
+        "title": rl_styles.ParagraphStyle('ClassicTitle', parent=body, fontName='Times-Bold', fontSize=22, leading=26, spaceAfter=4, alignment=enums.TA_CENTER),
+        "heading": rl_styles.ParagraphStyle('ClassicHeading', parent=body, fontName='Times-Bold', fontSize=13, leading=16, spaceBefore=10, spaceAfter=2),
+        "contact": rl_styles.ParagraphStyle('ClassicContact', parent=body, alignment=enums.TA_CENTER),
+        "body": body,
+        "meta": rl_styles.ParagraphStyle('ClassicMeta', parent=body, textColor=colors.HexColor('#444444')),
+    }
+    return PdfTemplate(name, styles, section_order, margins=0.75*units.inch, heading_rule=colors.black)
+
+def build_minimal_template(name: str, section_order: List[str]) -> PdfTemplate:
+    base = rl_styles.getSampleStyleSheet()
+    body = rl_styles.ParagraphStyle('MinimalBody', parent=base['Normal'], fontSize=9.5, leading=12, textColor=colors.HexColor('#222222'))
+    styles = {
+        "title": rl_styles.ParagraphStyle('MinimalTitle', parent=body, fontName='Helvetica-Bold', fontSize=18, leading=22, spaceAfter=2, alignment=enums.TA_LEFT),
+        "heading": rl_styles.ParagraphStyle('MinimalHeading', parent=body, fontName='Helvetica-Bold', fontSize=10, leading=13, spaceBefore=10, spaceAfter=3, textColor=colors.HexColor('#555555')),
+        "contact": rl_styles.ParagraphStyle('MinimalContact', parent=body, textColor=colors.HexColor('#555555')),
+        "body": body,
+        "meta": rl_styles.ParagraphStyle('MinimalMeta', parent=body, textColor=colors.HexColor('#777777')),
+    }
+    return PdfTemplate(name, styles, section_order, margins=0.6*units.inch, heading_rule=colors.HexColor('#cccccc'))
+
+register_template("modern", "Modern", list(SECTION_TITLES), build_modern_template)
+register_template("classic", "Classic", ["summary", "experiences", "education", "projects", "internships", "hackathons", "events", "skills"], build_classic_template)
+register_template("minimal", "Minimal", ["summary", "skills", "experiences", "projects", "education", "internships", "hackathons", "events"], build_minimal_template)
+
+def validate_template_name(name: Optional[str]):
+    if name is not None and name not in EXPORT_TEMPLATES:
+        raise HTTPException(status_code=422, detail=f"Unknown template: {name}")
 
-# PDF Generation
-def generate_pdf(resume: Resume) -> bytes:
+# Export Backends
+# Each takes an ExportDocument and a template name and returns the file's bytes.
+def generate_pdf(document: ExportDocument, template_name: str) -> bytes:
+    template = get_pdf_template(template_name)
     buffer = io.BytesIO()
-    doc = SimpleDocTemplate(buffer, pagesize=letter, topMargin=0.5*inch, bottomMargin=0.5*inch)
-    story = []
-    styles = getSampleStyleSheet()
-    
-    title_style = ParagraphStyle(
-        'CustomTitle',
-        parent=styles['Heading1'],
-        fontSize=24,
-        textColor=colors.HexColor('#1a365d'),
-        spaceAfter=6,
-        alignment=TA_CENTER
+    # invariant=1 drops the creation timestamp and random document ID so identical
+    # input renders to identical bytes, which keeps the content-hash ETag strong
+    doc = platypus.SimpleDocTemplate(
+        buffer,
+        pagesize=pagesizes.letter,
+        topMargin=0.5*units.inch,
+        bottomMargin=0.5*units.inch,
+        leftMargin=template.margins,
+        rightMargin=template.margins,
+        invariant=1,
     )
-    
-    heading_style = ParagraphStyle(
-        'CustomHeading',
-        parent=styles['Heading2'],
-        fontSize=14,
-        textColor=colors.HexColor('#2c5282'),
-        spaceAfter=6,
-        spaceBefore=12,
-        borderColor=colors.HexColor('#2c5282'),
-        borderWidth=0,
-        borderPadding=0,
-    )
-    
-    personal = resume.data.personal_info
-    if personal.full_name:
-        story.append(Paragraph(personal.full_name, title_style))
-        contact_info = []
-        if personal.email:
-            contact_info.append(personal.email)
-        if personal.phone:
-            contact_info.append(personal.phone)
-        if personal.location:
-            contact_info.append(personal.location)
-        if contact_info:
-            story.append(Paragraph(" | ".join(contact_info), styles['Normal']))
-        story.append(Spacer(1, 0.2*inch))
-    
-    if resume.data.summary:
-        story.append(Paragraph("PROFESSIONAL SUMMARY", heading_style))
-        story.append(Paragraph(resume.data.summary, styles['Normal']))
-        story.append(Spacer(1, 0.15*inch))
-    
-    if resume.data.experiences:
-        story.append(Paragraph("EXPERIENCE", heading_style))
-        for exp in resume.data.experiences:
-            exp_title = f"<b>{exp.title}</b> - {exp.organization}"
-            story.append(Paragraph(exp_title, styles['Normal']))
-            story.append(Paragraph(f"<i>{exp.start_date} - {exp.end_date}</i>", styles['Normal']))
-            if exp.location:
-                story.append(Paragraph(f"Location: {exp.location}", styles['Normal']))
-            story.append(Paragraph(exp.description, styles['Normal']))
-            if exp.skills:
-                story.append(Paragraph(f"Skills: {', '.join(exp.skills)}", styles['Normal']))
-            story.append(Spacer(1, 0.1*inch))
-    
-    if resume.data.internships:
-        story.append(Paragraph("INTERNSHIPS", heading_style))
-        for intern in resume.data.internships:
-            intern_title = f"<b>{intern.title}</b> - {intern.company}"
-            story.append(Paragraph(intern_title, styles['Normal']))
-            story.append(Paragraph(f"<i>{intern.start_date} - {intern.end_date}</i>", styles['Normal']))
-            if intern.location:
-                story.append(Paragraph(f"Location: {intern.location}", styles['Normal']))
-            story.append(Paragraph(intern.description, styles['Normal']))
-            if intern.skills:
-                story.append(Paragraph(f"Skills: {', '.join(intern.skills)}", styles['Normal']))
-            story.append(Spacer(1, 0.1*inch))
-    
-    if resume.data.hackathons:
-        story.append(Paragraph("HACKATHONS", heading_style))
-        for hack in resume.data.hackathons:
-            hack_title = f"<b>{hack.name}</b> - {hack.organizer}"
-            story.append(Paragraph(hack_title, styles['Normal']))
-            story.append(Paragraph(f"<i>{hack.date}</i>", styles['Normal']))
-            story.append(Paragraph(f"Project: {hack.project_title}", styles['Normal']))
-            if hack.achievement:
-                story.append(Paragraph(f"Achievement: {hack.achievement}", styles['Normal']))
-            story.append(Paragraph(hack.description, styles['Normal']))
-            if hack.technologies:
-                story.append(Paragraph(f"Technologies: {', '.join(hack.technologies)}", styles['Normal']))
-            story.append(Spacer(1, 0.1*inch))
-    
-    if resume.data.education:
-        story.append(Paragraph("EDUCATION", heading_style))
-        for edu in resume.data.education:
-            edu_title = f"<b>{edu.degree}</b> - {edu.field}"
-            story.append(Paragraph(edu_title, styles['Normal']))
-            story.append(Paragraph(f"{edu.institution} | {edu.start_date} - {edu.end_date}", styles['Normal']))
-            if edu.gpa:
-                story.append(Paragraph(f"GPA: {edu.gpa}", styles['Normal']))
-            story.append(Spacer(1, 0.1*inch))
-    
-    if resume.data.projects:
-        story.append(Paragraph("PROJECTS", heading_style))
-        for proj in resume.data.projects:
-            story.append(Paragraph(f"<b>{proj.title}</b>", styles['Normal']))
-            story.append(Paragraph(proj.description, styles['Normal']))
-            if proj.technologies:
-                story.append(Paragraph(f"Technologies: {', '.join(proj.technologies)}", styles['Normal']))
-            story.append(Spacer(1, 0.1*inch))
-    
-    if resume.data.events:
-        story.append(Paragraph("EVENTS & ACTIVITIES", heading_style))
-        for event in resume.data.events:
-            event_title = f"<b>{event.title}</b> - {event.organization}"
-            story.append(Paragraph(event_title, styles['Normal']))
-            story.append(Paragraph(f"<i>{event.date}</i>", styles['Normal']))
-            if event.role:
-                story.append(Paragraph(f"Role: {event.role}", styles['Normal']))
-            story.append(Paragraph(event.description, styles['Normal']))
-            story.append(Spacer(1, 0.1*inch))
-    
-    if resume.data.skills:
-        story.append(Paragraph("SKILLS", heading_style))
-        skills_text = ", ".join([skill.name for skill in resume.data.skills])
-        story.append(Paragraph(skills_text, styles['Normal']))
-    
-    doc.build(story)
-    buffer.seek(0)
+    doc.build(template.build_story(document))
+    return buffer.getvalue()
+
+def generate_docx(document: ExportDocument, template_name: str) -> bytes:
+    word = docx.Document()
+    if document.name:
+        word.add_heading(document.name, level=0)
+        if document.contact:
+            word.add_paragraph(" | ".join(document.contact))
+    for title, blocks in document.ordered_sections(template_section_order(template_name)):
+        word.add_heading(title, level=1)
+        for style, content in blocks:
+            if style == "space":
+                continue
+            paragraph = word.add_paragraph()
+            for text, mark in content:
+                run = paragraph.add_run(text)
+                run.bold = mark == "b" or None
+                run.italic = mark == "i" or style == "meta" or None
+    buffer = io.BytesIO()
+    word.save(buffer)
     return buffer.getvalue()
 
+HTML_EXPORT_STYLE = (
+    "body{font-family:Helvetica,Arial,sans-serif;font-size:11pt;line-height:1.4;color:#222;max-width:48rem;margin:2rem auto;padding:0 1rem}"
+    "h1{text-align:center;color:#1a365d;margin-bottom:.25rem}.contact{text-align:center;margin-top:0}"
+    "h2{font-size:13pt;color:#2c5282;border-bottom:1px solid #ccc;margin-top:1.5rem}"
+    "p{margin:.15rem 0}.meta{color:#555}"
+)
+
+def html_runs(content: list) -> str:
+    tags = {"b": "strong", "i": "em"}
+    return "".join(f"<{tags[mark]}>{html.escape(text)}</{tags[mark]}>" if mark else html.escape(text) for text, mark in content)
+
+def generate_html(document: ExportDocument, template_name: str) -> bytes:
+    title = html.escape(document.name or "Resume")
+    parts = [f'<!DOCTYPE html>\n<html lang="en"><head><meta charset="utf-8"><title>{title}</title><style>{HTML_EXPORT_STYLE}</style></head>'
+             f'<body class="template-{html.escape(pdf_template_name(template_name))}">']
+    if document.name:
+        parts.append(f"<h1>{title}</h1>")
+        if document.contact:
+            parts.append(f'<p class="contact">{html.escape(" | ".join(document.contact))}</p>')
+    for section_title, blocks in document.ordered_sections(template_section_order(template_name)):
+        parts.append(f"<section><h2>{html.escape(section_title)}</h2>")
+        for style, content in blocks:
+            if style != "space":
+                parts.append(f'<p class="{style}">{html_runs(content)}</p>')
+        parts.append("</section>")
+    parts.append("</body></html>\n")
+    return "\n".join(parts).encode("utf-8")
+
+MARKDOWN_SPECIAL = re.compile(r"([\\`*_\[\]<>#])")
+
+def markdown_escape(text: str) -> str:
+    return MARKDOWN_SPECIAL.sub(r"\\\1", text)
+
+def markdown_runs(content: list) -> str:
+    marks = {"b": "**", "i": "*"}
+    return "".join(f"{marks[mark]}{markdown_escape(text)}{marks[mark]}" if mark else markdown_escape(text) for text, mark in content)
+
+def generate_markdown(document: ExportDocument, template_name: str) -> bytes:
+    parts = []
+    if document.name:
+        parts.append(f"# {markdown_escape(document.name)}")
+        if document.contact:
+            parts.append(markdown_escape(" | ".join(document.contact)))
+    for title, blocks in document.ordered_sections(template_section_order(template_name)):
+        parts.append(f"## {markdown_escape(title)}")
+        # Lines of one entry stay together (hard breaks); a space block ends the entry
+        entry = []
+        for style, content in blocks:
+            if style == "space":
+                if entry:
+                    parts.append("  \n".join(entry))
+                entry = []
+            else:
+                entry.append(markdown_runs(content))
+        if entry:
+            parts.append("  \n".join(entry))
+    return ("\n\n".join(parts) + "\n").encode("utf-8")
+
+# format -> (backend, media type, file extension, runs in the render pool)
+EXPORT_FORMATS: Dict[str, tuple] = {
+    "pdf": (generate_pdf, "application/pdf", "pdf", True),
+    "docx": (generate_docx, "application/vnd.openxmlformats-officedocument.wordprocessingml.document", "docx", True),
+    "html": (generate_html, "text/html; charset=utf-8", "html", False),
+    "md": (generate_markdown, "text/markdown; charset=utf-8", "md", False),
+}
+
+def export_filename(resume: Resume, export_format: str) -> str:
+    return f"{resume.title.replace(' ', '_')}.{EXPORT_FORMATS[export_format][2]}"
+
+@api_router.get("/templates")
+async def list_templates():
+    return [{"name": name, "label": label} for name, (label, _, _) in EXPORT_TEMPLATES.items()]
+
 @api_router.get("/resumes/{resume_id}/download")
-async def download_resume(resume_id: str, current_user: User = Depends(get_current_user)):
+async def download_resume(resume_id: str, request: Request, export_format: ExportFormat = Query("pdf", alias="format"), current_user: User = Depends(get_current_user)):
     resume = await db.resumes.find_one({"id": resume_id, "user_id": current_user.id}, {"_id": 0})
     if not resume:
         raise HTTPException(status_code=404, detail="Resume not found")
     
-    if isinstance(resume.get("created_at"), str):
-        resume["created_at"] = datetime.fromisoformat(resume["created_at"])
-    if isinstance(resume.get("updated_at"), str):
-        resume["updated_at"] = datetime.fromisoformat(resume["updated_at"])
-    
     resume_obj = Resume(**resume)
-    pdf_bytes = generate_pdf(resume_obj)
+    cache_key = render_cache_key(resume_obj, export_format)
+    etag = f'"{cache_key}"'
+    headers = {
+        "ETag": etag,
+        "Cache-Control": "private, no-cache",
+    }
+    if etag_matches(request.headers.get("if-none-match"), etag):
+        return Response(status_code=status.HTTP_304_NOT_MODIFIED, headers=headers)
+    
+    content = await render_resume_export(resume_obj, export_format, cache_key)
+    
+    headers["Content-Disposition"] = f"attachment; filename={export_filename(resume_obj, export_format)}"
+    return Response(content=content, media_type=EXPORT_FORMATS[export_format][1], headers=headers)
+
+class ZipStreamBuffer(io.RawIOBase):
+    """Unseekable sink for zipfile; drain() hands back whatever was written since the last call."""
+
+    def __init__(self):
+        self._chunks: List[bytes] = []
+
+    def writable(self) -> bool:
+        return True
+
+    def write(self, b) -> int:
+        self._chunks.append(bytes(b))
+        return len(b)
+
+    def drain(self) -> bytes:
+        data = b"".join(self._chunks)
+        self._chunks.clear()
+        return data
+
+async def render_for_export(resume: Resume, export_format: str) -> tuple:
+    # Bulk exports wait for pool capacity instead of failing mid-stream
+    while True:
+        try:
+            return resume, await render_resume_export(resume, export_format)
+        except HTTPException as e:
+            if e.status_code != 503:
+                raise
+            await asyncio.sleep(POOL_RETRY_AFTER_SECONDS)
+
+async def iter_rendered_resumes(cursor, window: int, export_format: str):
+    in_flight = set()
+    try:
+        async for resume in cursor:
+            in_flight.add(asyncio.ensure_future(render_for_export(Resume(**resume), export_format)))
+            if len(in_flight) >= window:
+                done, in_flight = await asyncio.wait(in_flight, return_when=asyncio.FIRST_COMPLETED)
+                for task in done:
+                    yield task.result()
+        while in_flight:
+            done, in_flight = await asyncio.wait(in_flight, return_when=asyncio.FIRST_COMPLETED)
+            for task in done:
+                yield task.result()
+    finally:
+        for task in in_flight:
+            task.cancel()
+
+@api_router.post("/resumes/export")
+async def export_resumes(export_request: ResumeExportRequest, current_user: User = Depends(get_current_user)):
+    query: Dict[str, Any] = {"user_id": current_user.id}
+    if export_request.resume_ids is not None:
+        query["id"] = {"$in": export_request.resume_ids}
+    
+    if await db.resumes.count_documents(query, limit=1) == 0:
+        raise HTTPException(status_code=404, detail="No resumes found")
+    
+    async def stream_zip():
+        sink = ZipStreamBuffer()
+        used_names = set()
+        cursor = db.resumes.find(query, {"_id": 0})
+        extension = EXPORT_FORMATS[export_request.format][2]
+        # PDFs and DOCX are already compressed, so entries are stored to keep the event loop free
+        with zipfile.ZipFile(sink, "w", compression=zipfile.ZIP_STORED) as archive:
+            async for resume_obj, content in iter_rendered_resumes(cursor, max(1, render_pool.workers), export_request.format):
+                base_name = resume_obj.title.replace(' ', '_') or "resume"
+                name = f"{base_name}.{extension}"
+                if name in used_names:
+                    name = f"{base_name}_{resume_obj.id[:8]}.{extension}"
+                used_names.add(name)
+                archive.writestr(name, content)
+                yield sink.drain()
+        yield sink.drain()
     
     return StreamingResponse(
-        io.BytesIO(pdf_bytes),
-        media_type="application/pdf",
-        headers={"Content-Disposition": f"attachment; filename={resume_obj.title.replace(' ', '_')}.pdf"}
+        stream_zip(),
+        media_type="application/zip",
+        headers={"Content-Disposition": "attachment; filename=resumes.zip"}
+    )
+
+# Resume Import
+IMPORT_SECTION_HEADINGS = {
+    "summary": ["summary", "professional summary", "profile", "objective", "about me"],
+    "experiences": ["experience", "work experience", "professional experience", "employment", "employment history"],
+    "internships": ["internships", "internship"],
+    "hackathons": ["hackathons"],
+    "education": ["education", "academic background"],
+    "projects": ["projects", "personal projects"],
+    "skills": ["skills", "technical skills", "core skills"],
+    "events": ["events", "events & activities", "activities", "extracurricular activities"],
+}
+HEADING_TO_SECTION = {heading: section for section, headings in IMPORT_SECTION_HEADINGS.items() for heading in headings}
+EMAIL_PATTERN = re.compile(r"[\w.+-]+@[\w-]+\.[\w.-]+")
+PHONE_PATTERN = re.compile(r"\+?\d[\d\s().-]{7,}\d")
+DATE_RANGE_PATTERN = re.compile(r"(?P<start>[A-Za-z]{3,9}\.? \d{4}|\d{1,2}/\d{4}|\d{4})\s*(?:-|–|—|to)\s*(?P<end>[A-Za-z]{3,9}\.? \d{4}|\d{1,2}/\d{4}|\d{4}|present|current)", re.IGNORECASE)
+
+def extract_resume_text(content: bytes, extension: str) -> str:
+    if extension == ".pdf":
+        reader = pypdf.PdfReader(io.BytesIO(content))
+        return "\n".join(page.extract_text() or "" for page in reader.pages)
+    document = docx.Document(io.BytesIO(content))
+    lines = [paragraph.text for paragraph in document.paragraphs]
+    for table in document.tables:
+        for row in table.rows:
+            lines.append(" | ".join(cell.text for cell in row.cells))
+    return "\n".join(lines)
+
+def split_entries(lines: List[str]) -> List[List[str]]:
+    entries, current = [], []
+    for line in lines:
+        if not line:
+            if current:
+                entries.append(current)
+                current = []
+            continue
+        current.append(line)
+    if current:
+        entries.append(current)
+    return entries
+
+def parse_entry(lines: List[str]) -> Dict[str, str]:
+    header = lines[0]
+    title, _, organization = header.partition(" - ")
+    if not organization:
+        title, _, organization = header.partition(" at ")
+    dates = {"start_date": "", "end_date": ""}
+    date_line_text = ""
+    description = []
+    for line in lines[1:]:
+        match = DATE_RANGE_PATTERN.search(line)
+        if match and not dates["start_date"]:
+            dates = {"start_date": match.group("start"), "end_date": match.group("end")}
+            # Whatever shares the line with the dates, e.g. "MIT | 2012 - 2016"
+            date_line_text = (line[:match.start()] + line[match.end():]).strip(" |,")
+            continue
+        description.append(line)
+    return {
+        "title": title.strip(" *"),
+        "organization": organization.strip(),
+        "description": " ".join(description),
+        "date_line_text": date_line_text,
+        **dates,
+    }
+
+def parse_resume_text(text: str) -> Dict[str, Any]:
+    """Heuristically split plain resume text into ResumeData fields."""
+    sections: Dict[str, List[str]] = {"header": []}
+    current = "header"
+    for raw_line in text.splitlines():
+        line = raw_line.strip()
+        heading = HEADING_TO_SECTION.get(line.rstrip(":").lower())
+        if heading:
+            current = heading
+            sections.setdefault(current, [])
+            continue
+        sections.setdefault(current, []).append(line)
+    
+    header = [line for line in sections["header"] if line]
+    header_text = " ".join(header)
+    email = EMAIL_PATTERN.search(header_text)
+    phone = PHONE_PATTERN.search(header_text)
+    links = re.findall(r"(?:https?://)?(?:www\.)?(?:linkedin\.com|github\.com)/[\w/-]+", header_text)
+    data: Dict[str, Any] = {
+        "personal_info": {
+            "full_name": header[0] if header else "",
+            "email": email.group(0) if email else "",
+            "phone": phone.group(0).strip() if phone else "",
+            "linkedin": next((link for link in links if "linkedin" in link), ""),
+            "github": next((link for link in links if "github" in link), ""),
+        },
+        "summary": " ".join(line for line in sections.get("summary", []) if line),
+    }
+    
+    skills_text = " ".join(line for line in sections.get("skills", []) if line)
+    data["skills"] = [{"name": name.strip()} for name in re.split(r"[,;•|]", skills_text) if name.strip()]
+    
+    for entry in split_entries(sections.get("experiences", [])):
+        parsed = parse_entry(entry)
+        data.setdefault("experiences", []).append({"type": "work", **parsed})
+    for entry in split_entries(sections.get("internships", [])):
+        parsed = parse_entry(entry)
+        parsed["company"] = parsed.pop("organization")
+        data.setdefault("internships", []).append(parsed)
+    for entry in split_entries(sections.get("education", [])):
+        parsed = parse_entry(entry)
+        data.setdefault("education", []).append({
+            "degree": parsed["title"],
+            "field": parsed["organization"],
+            "institution": parsed["date_line_text"] or parsed["description"],
+            "start_date": parsed["start_date"],
+            "end_date": parsed["end_date"],
+        })
+    for entry in split_entries(sections.get("projects", [])):
+        parsed = parse_entry(entry)
+        data.setdefault("projects", []).append({"title": parsed["title"], "description": parsed["description"]})
+    for entry in split_entries(sections.get("hackathons", [])):
+        parsed = parse_entry(entry)
+        data.setdefault("hackathons", []).append({
+            "name": parsed["title"],
+            "organizer": parsed["organization"],
+            "project_title": "",
+            "description": parsed["description"],
+            "date": parsed["start_date"],
+        })
+    for entry in split_entries(sections.get("events", [])):
+        parsed = parse_entry(entry)
+        data.setdefault("events", []).append({
+            "title": parsed["title"],
+            "organization": parsed["organization"],
+            "description": parsed["description"],
+            "date": parsed["start_date"],
+        })
+    return data
+
+def parse_resume_file(content: bytes, extension: str) -> Dict[str, Any]:
+    # Runs in an import worker process; returns plain dicts so the result pickles cheaply
+    text = extract_resume_text(content, extension)
+    return ResumeData(**parse_resume_text(text)).model_dump()
+
+def import_upload_bucket() -> AsyncIOMotorGridFSBucket:
+    return AsyncIOMotorGridFSBucket(db, bucket_name=IMPORT_UPLOAD_BUCKET)
+
+async def store_upload(file: UploadFile, user_id: str):
+    """Stream an upload into GridFS without holding more than one chunk in memory; returns its file id."""
+    upload = import_upload_bucket().open_upload_stream(file.filename or "resume", metadata={"user_id": user_id})
+    size = 0
+    try:
+        while True:
+            chunk = await file.read(64 * 1024)
+            if not chunk:
+                break
+            size += len(chunk)
+            if size > IMPORT_MAX_BYTES:
+                raise HTTPException(status_code=413, detail=f"File is larger than {IMPORT_MAX_BYTES // (1024 * 1024)} MB")
+            await upload.write(chunk)
+    except BaseException:
+        await upload.abort()
+        raise
+    await upload.close()
+    return upload._id
+
+async def read_upload(upload_id) -> bytes:
+    try:
+        stream = await import_upload_bucket().open_download_stream(upload_id)
+    except NoFile:
+        raise PermanentJobError("The uploaded file is no longer available")
+    return await stream.read()
+
+async def delete_upload(upload_id):
+    try:
+        await import_upload_bucket().delete(upload_id)
+    except NoFile:
+        pass
+
+@api_router.post("/resumes/import", status_code=202)
+async def import_resume(file: UploadFile = File(...), current_user: User = Depends(get_current_user)):
+    filename = file.filename or "resume"
+    extension = Path(filename).suffix.lower()
+    if extension not in (".pdf", ".docx"):
+        raise HTTPException(status_code=415, detail="Only PDF and DOCX files can be imported")
+    upload_id = await store_upload(file, current_user.id)
+
+    # Parsing runs on a job worker; clients poll GET /imports/{job_id}
+    try:
+        job = await enqueue_job(
+            "import_resume",
+            current_user.id,
+            {"filename": filename, "extension": extension, "upload_id": upload_id},
+            priority=10,
+        )
+    except Exception:
+        await delete_upload(upload_id)
+        raise
+    return {"job_id": job["id"], "status": job["status"]}
+
+@api_router.get("/imports/{job_id}")
+async def get_import_job(job_id: str, current_user: User = Depends(get_current_user)):
+    job = await db.jobs.find_one(
+        {"id": job_id, "user_id": current_user.id, "type": "import_resume"},
+        {"_id": 0, "id": 1, "payload.filename": 1, "status": 1, "result": 1, "error": 1, "created_at": 1, "updated_at": 1},
+    )
+    if not job:
+        raise HTTPException(status_code=404, detail="Import job not found")
+    return {
+        "id": job["id"],
+        "filename": job["payload"]["filename"],
+        "status": job["status"],
+        "resume_id": (job.get("result") or {}).get("resume_id"),
+        "error": job.get("error"),
+        "created_at": job["created_at"],
+        "updated_at": job["updated_at"],
+    }
+
+# Background Jobs
+class PermanentJobError(Exception):
+    """Raised by a job handler when retrying cannot help."""
+
+async def enqueue_job(job_type: str, user_id: str, payload: Dict[str, Any], priority: int = 0) -> Dict[str, Any]:
+    now = datetime.now(timezone.utc)
+    job = {
+        "id": str(uuid.uuid4()),
+        "type": job_type,
+        "user_id": user_id,
+        "payload": payload,
+        "priority": priority,
+        "status": "queued",
+        "attempts": 0,
+        "max_attempts": JOB_MAX_ATTEMPTS,
+        "run_after": now,
+        "lease_expires_at": None,
+        "worker_id": None,
+        "result": None,
+        "error": None,
+        "created_at": now,
+        "updated_at": now,
+    }
+    await db.jobs.insert_one(job)
+    job.pop("_id", None)
+    return job
+
+async def claim_job(worker_id: str) -> Optional[Dict[str, Any]]:
+    # Queued jobs that are due, or running jobs whose worker stopped renewing its lease
+    now = datetime.now(timezone.utc)
+    return await db.jobs.find_one_and_update(
+        {"$or": [
+            {"status": "queued", "run_after": {"$lte": now}},
+            {"status": "running", "lease_expires_at": {"$lt": now}},
+        ]},
+        {
+            "$set": {
+                "status": "running",
+                "worker_id": worker_id,
+                "lease_expires_at": now + timedelta(seconds=JOB_LEASE_SECONDS),
+                "updated_at": now,
+            },
+            "$inc": {"attempts": 1},
+        },
+        projection={"_id": 0},
+        sort=[("priority", -1), ("run_after", 1)],
+        return_document=ReturnDocument.AFTER,
+    )
+
+async def finish_job(job: Dict[str, Any], worker_id: str, changes: Dict[str, Any]):
+    now = datetime.now(timezone.utc)
+    changes["updated_at"] = now
+    cleared = {"lease_expires_at": ""}
+    final = changes["status"] in ("completed", "failed")
+    if final:
+        changes["expires_at"] = now + timedelta(seconds=JOB_RETENTION_SECONDS)
+        # Uploaded files are only needed while the job can still run
+        cleared["payload.content"] = ""
+    # Guarded on worker_id so a worker that lost its lease cannot overwrite the new owner's outcome
+    result = await db.jobs.update_one(
+        {"id": job["id"], "worker_id": worker_id, "status": "running"},
+        {"$set": changes, "$unset": cleared},
     )
+    if final and result.modified_count and job["payload"].get("upload_id") is not None:
+        await delete_upload(job["payload"]["upload_id"])
+
+async def renew_job_lease(job_id: str, worker_id: str):
+    while True:
+        await asyncio.sleep(JOB_LEASE_SECONDS / 3)
+        await db.jobs.update_one(
+            {"id": job_id, "worker_id": worker_id, "status": "running"},
+            {"$set": {"lease_expires_at": datetime.now(timezone.utc) + timedelta(seconds=JOB_LEASE_SECONDS)}},
+        )
+
+async def handle_render_pdf(job: Dict[str, Any]) -> Dict[str, Any]:
+    resume = await db.resumes.find_one({"id": job["payload"].get("resume_id"), "user_id": job["user_id"]}, {"_id": 0})
+    if not resume:
+        raise PermanentJobError("Resume not found")
+    export_format = job["payload"].get("format", "pdf")
+    if export_format not in EXPORT_FORMATS:
+        raise PermanentJobError(f"Unknown export format: {export_format}")
+    resume_obj = Resume(**resume)
+    content = await render_resume_export(resume_obj, export_format)
+    return {
+        "content_type": EXPORT_FORMATS[export_format][1],
+        "filename": export_filename(resume_obj, export_format),
+        "data": Binary(content),
+    }
+
+async def handle_import_resume(job: Dict[str, Any]) -> Dict[str, Any]:
+    payload = job["payload"]
+    # Jobs queued before uploads moved to GridFS still carry the file inline
+    content = bytes(payload["content"]) if "content" in payload else await read_upload(payload["upload_id"])
+    try:
+        data = await import_pool.run(parse_resume_file, content, payload["extension"])
+    except HTTPException:
+        raise
+    except Exception as e:
+        logging.error(f"Resume import {job['id']} failed: {str(e)}")
+        raise PermanentJobError("Could not read this file")
+    resume = Resume(user_id=job["user_id"], title=Path(payload["filename"]).stem or "Imported Resume", data=ResumeData(**data))
+    await insert_resume(resume)
+    return {"resume_id": resume.id}
+
+async def handle_generate_summary(job: Dict[str, Any]) -> Dict[str, Any]:
+    prompt, fallback = build_summary_prompt(job["payload"].get("context") or {})
+    try:
+        return {"summary": await call_llm(prompt, SUMMARY_SYSTEM_MESSAGE, bypass_cache=bool(job["payload"].get("regenerate")), user_id=job["user_id"])}
+    except HTTPException as e:
+        if e.status_code == 503:
+            return fallback
+        raise
+
+async def handle_optimize_content(job: Dict[str, Any]) -> Dict[str, Any]:
+    prompt, fallback = build_optimize_prompt(job["payload"].get("prompt", ""))
+    try:
+        return {"optimized": await call_llm(prompt, OPTIMIZE_SYSTEM_MESSAGE, bypass_cache=bool(job["payload"].get("regenerate")), user_id=job["user_id"])}
+    except HTTPException as e:
+        if e.status_code == 503:
+            return fallback
+        raise
+
+async def handle_rebuild_analytics(job: Dict[str, Any]) -> Dict[str, Any]:
+    return await rebuild_analytics(bool(job["payload"].get("recount")))
+
+JOB_HANDLERS = {
+    "render_pdf": handle_render_pdf,
+    "import_resume": handle_import_resume,
+    "generate_summary": handle_generate_summary,
+    "optimize_content": handle_optimize_content,
+    "rebuild_analytics": handle_rebuild_analytics,
+}
+
+async def execute_job(job: Dict[str, Any], worker_id: str):
+    handler = JOB_HANDLERS.get(job["type"])
+    lease_task = asyncio.ensure_future(renew_job_lease(job["id"], worker_id))
+    try:
+        if handler is None:
+            raise PermanentJobError(f"Unknown job type: {job['type']}")
+        if job["attempts"] > job["max_attempts"]:
+            raise PermanentJobError("Job exceeded its attempts after losing its lease")
+        result = await handler(job)
+    except Exception as e:
+        # Client errors and PermanentJobError fail at once; everything else is retried with backoff
+        permanent = isinstance(e, PermanentJobError) or (isinstance(e, HTTPException) and e.status_code < 500 and e.status_code != 429)
+        error = e.detail if isinstance(e, HTTPException) else str(e)
+        if permanent or job["attempts"] >= job["max_attempts"]:
+            logging.error(f"Job {job['id']} ({job['type']}) failed: {error}")
+            await finish_job(job, worker_id, {"status": "failed", "error": error})
+        else:
+            delay = 2 ** job["attempts"]
+            await finish_job(job, worker_id, {
+                "status": "queued",
+                "error": error,
+                "run_after": datetime.now(timezone.utc) + timedelta(seconds=delay),
+            })
+    else:
+        await finish_job(job, worker_id, {"status": "completed", "result": result, "error": None})
+    finally:
+        lease_task.cancel()
+
+async def run_job_worker(worker_id: str, concurrency: int, stop_event: asyncio.Event):
+    """Claim and run jobs until stop_event is set; used in-process by the API and by worker.py."""
+    slots = asyncio.Semaphore(concurrency)
+    running = set()
+    while not stop_event.is_set():
+        await slots.acquire()
+        try:
+            job = await claim_job(worker_id)
+        except Exception as e:
+            logging.error(f"Job claim failed: {str(e)}")
+            job = None
+        if job is None:
+            slots.release()
+            try:
+                await asyncio.wait_for(stop_event.wait(), timeout=JOB_POLL_INTERVAL_SECONDS)
+            except asyncio.TimeoutError:
+                pass
+            continue
+        task = asyncio.ensure_future(execute_job(job, worker_id))
+        running.add(task)
+        task.add_done_callback(lambda done: (running.discard(done), slots.release()))
+    if running:
+        await asyncio.gather(*running, return_exceptions=True)
+
+def public_job_view(job: Dict[str, Any]) -> Dict[str, Any]:
+    result = job.get("result")
+    if isinstance(result, dict) and "data" in result:
+        # Binary results are fetched through /jobs/{id}/result
+        result = {key: value for key, value in result.items() if key != "data"}
+    return {
+        "id": job["id"],
+        "type": job["type"],
+        "status": job["status"],
+        "priority": job["priority"],
+        "attempts": job["attempts"],
+        "result": result,
+        "error": job.get("error"),
+        "created_at": job["created_at"],
+        "updated_at": job["updated_at"],
+    }
+
+@api_router.post("/jobs", status_code=202)
+async def create_job(job_request: JobCreate, current_user: User = Depends(get_current_user)):
+    if job_request.type == "render_pdf":
+        resume_id = job_request.payload.get("resume_id")
+        if not resume_id or not await db.resumes.count_documents({"id": resume_id, "user_id": current_user.id}, limit=1):
+            raise HTTPException(status_code=404, detail="Resume not found")
+    # The queue is shared by every user: clients may lower their jobs' priority, never raise it
+    priority = max(JOB_MIN_USER_PRIORITY, min(job_request.priority, 0))
+    job = await enqueue_job(job_request.type, current_user.id, job_request.payload, priority)
+    return public_job_view(job)
+
+@api_router.get("/jobs/{job_id}")
+async def get_job(job_id: str, current_user: User = Depends(get_current_user)):
+    job = await db.jobs.find_one({"id": job_id, "user_id": current_user.id}, {"_id": 0, "payload": 0})
+    if not job:
+        raise HTTPException(status_code=404, detail="Job not found")
+    return public_job_view(job)
+
+@api_router.get("/jobs/{job_id}/result")
+async def get_job_result(job_id: str, current_user: User = Depends(get_current_user)):
+    job = await db.jobs.find_one({"id": job_id, "user_id": current_user.id}, {"_id": 0, "status": 1, "result": 1})
+    if not job:
+        raise HTTPException(status_code=404, detail="Job not found")
+    if job["status"] != "completed":
+        raise HTTPException(status_code=409, detail=f"Job is {job['status']}")
+    result = job["result"]
+    if isinstance(result, dict) and "data" in result:
+        return Response(
+            content=bytes(result["data"]),
+            media_type=result["content_type"],
+            headers={"Content-Disposition": f"attachment; filename={result['filename']}"},
+        )
+    return result
 
 @api_router.get("/")
 async def root():
     return {"message": "Smart Resume Builder API"}
 
+@api_router.get("/status")
+async def service_status():
+    return {
+        "pools": {
+            "render": render_pool.stats(),
+            "auth": auth_pool.stats(),
+            "import": import_pool.stats(),
+        },
+        "render_cache": render_cache.stats(),
+        "export_documents": export_document_cache.stats(),
+        "user_cache": user_cache.stats(),
+        "save_coalescer": save_coalescer.stats(),
+        "llm_cache": llm_cache.stats(),
+        "llm_gateway": llm_gateway.stats(),
+        "date_migration": date_migration_status,
+        "term_vectors": term_vector_cache.stats(),
+        "rate_limiter": rate_limiter.stats(),
+        "startup": startup_report,
+    }
+
+@api_router.get("/status/query-plans")
+async def query_plan_status(admin: User = Depends(get_admin_user)):
+    # Explains run against the live collections and reveal index layout, so admins only
+    return {"slow_query_ms": SLOW_QUERY_MS, "queries": await check_query_plans()}
+
 app.include_router(api_router)
 
+class MetricsMiddleware:
+    """Times every HTTP request and labels it with the route template, not the raw path."""
+
+    def __init__(self, app):
+        self.app = app
+        self.route_templates: Dict[Any, str] = {}
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+        status_code = 500
+        
+        async def send_with_status(message):
+            nonlocal status_code
+            if message["type"] == "http.response.start":
+                status_code = message["status"]
+            await send(message)
+        
+        started = time.perf_counter()
+        HTTP_REQUESTS_IN_FLIGHT.inc()
+        try:
+            await self.app(scope, receive, send_with_status)
+        finally:
+            HTTP_REQUESTS_IN_FLIGHT.dec()
+            if startup_report["first_request_ms"] is None:
+                startup_report["first_request_ms"] = elapsed_since_import_ms()
+            HTTP_REQUEST_SECONDS.labels(scope["method"], self.route_template(scope), str(status_code)).observe(time.perf_counter() - started)
+
+    def route_template(self, scope) -> str:
+        # The router records the matched endpoint in scope; raw paths would explode label cardinality
+        endpoint = scope.get("endpoint")
+        if endpoint is None:
+            return "unmatched"
+        if endpoint not in self.route_templates:
+            self.route_templates.update({route.endpoint: route.path for route in app.routes if hasattr(route, "endpoint")})
+        return self.route_templates.get(endpoint, "unmatched")
+
+class RateLimiter:
+    """Token buckets per client key. acquire() decides in process; sync() pushes what this worker
+    spent into the shared bucket in db.rate_limits and adopts the balance all workers see."""
+
+    def __init__(self, capacity: float, refill_per_second: float, max_keys: int):
+        self.capacity = capacity
+        self.refill_per_second = refill_per_second
+        self.max_keys = max_keys
+        # key -> [tokens, refilled_at, spent since the last sync]
+        self._buckets: "OrderedDict[str, list]" = OrderedDict()
+        self._touched: set = set()
+        self.allowed = 0
+        self.rejected = 0
+        self.syncs = 0
+        self.sync_errors = 0
+
+    def acquire(self, key: str, cost: float) -> tuple:
+        """Returns (allowed, tokens left, seconds until the request would be affordable)."""
+        now = time.monotonic()
+        bucket = self._buckets.get(key)
+        if bucket is None:
+            bucket = self._buckets[key] = [self.capacity, now, 0.0]
+            if len(self._buckets) > self.max_keys:
+                self._buckets.popitem(last=False)
+        else:
+            self._buckets.move_to_end(key)
+            bucket[0] = min(self.capacity, bucket[0] + (now - bucket[1]) * self.refill_per_second)
+            bucket[1] = now
+        self._touched.add(key)
+        if bucket[0] >= cost:
+            bucket[0] -= cost
+            bucket[2] += cost
+            self.allowed += 1
+            return True, bucket[0], 0.0
+        self.rejected += 1
+        return False, bucket[0], (cost - bucket[0]) / self.refill_per_second
+
+    def seconds_until_full(self, tokens: float) -> float:
+        return max(0.0, self.capacity - tokens) / self.refill_per_second
+
+    async def sync(self, batch_size: int = 100):
+        # Keys that saw traffic since the last sync, including rejected-only ones, so a client
+        # spending on other workers is also throttled here
+        keys, self._touched = list(self._touched), set()
+        for start in range(0, len(keys), batch_size):
+            results = await asyncio.gather(*(self._sync_key(key) for key in keys[start:start + batch_size]), return_exceptions=True)
+            errors = [result for result in results if isinstance(result, Exception)]
+            if errors:
+                self.sync_errors += len(errors)
+                logging.warning(f"Rate limit sync failed for {len(errors)} keys: {errors[0]}")
+        self.syncs += 1
+
+    async def _sync_key(self, key: str):
+        bucket = self._buckets.get(key)
+        if bucket is None:
+            return
+        spent, bucket[2] = bucket[2], 0.0
+        # Refill by Mongo's clock ($$NOW) so workers on different hosts agree; the balance may go
+        # negative (down to -capacity) when workers together overspent between syncs
+        refilled = {"$min": [self.capacity, {"$add": [
+            {"$ifNull": ["$tokens", self.capacity]},
+            {"$multiply": [self.refill_per_second / 1000, {"$subtract": ["$$NOW", {"$ifNull": ["$updated_at", "$$NOW"]}]}]},
+        ]}]}
+        ttl_ms = int(self.capacity / self.refill_per_second * 1000) + 60_000
+        try:
+            doc = await db.rate_limits.find_one_and_update(
+                {"_id": key},
+                [{"$set": {
+                    "tokens": {"$max": [-self.capacity, {"$subtract": [refilled, spent]}]},
+                    "updated_at": "$$NOW",
+                    "expires_at": {"$add": ["$$NOW", ttl_ms]},
+                }}],
+                projection={"tokens": 1},
+                upsert=True,
+                return_document=ReturnDocument.AFTER,
+            )
+        except Exception:
+            bucket[2] += spent
+            self._touched.add(key)
+            raise
+        if doc is not None:
+            # What was spent during the round trip has not reached Mongo yet
+            bucket[0] = min(self.capacity, doc["tokens"] - bucket[2])
+            bucket[1] = time.monotonic()
+
+    async def run(self, interval: float, stop_event: asyncio.Event):
+        while not stop_event.is_set():
+            try:
+                await asyncio.wait_for(stop_event.wait(), timeout=interval)
+            except asyncio.TimeoutError:
+                pass
+            await self.sync()
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "enabled": RATE_LIMIT_ENABLED,
+            "keys": len(self._buckets),
+            "capacity": self.capacity,
+            "refill_per_second": self.refill_per_second,
+            "allowed": self.allowed,
+            "rejected": self.rejected,
+            "syncs": self.syncs,
+            "sync_errors": self.sync_errors,
+        }
+
+rate_limiter = RateLimiter(RATE_LIMIT_CAPACITY, RATE_LIMIT_REFILL_PER_SECOND, RATE_LIMIT_MAX_KEYS)
+
+@functools.lru_cache(maxsize=4096)
+def token_subject(token: str) -> Optional[str]:
+    # Signature checked, expiry not: an expired token still names who is calling
+    try:
+        return jwt.decode(token, SECRET_KEY, algorithms=[ALGORITHM], options={"verify_exp": False}).get("sub")
+    except jwt.PyJWTError:
+        return None
+
+def rate_limit_key(scope) -> str:
+    authorization = forwarded = None
+    for name, value in scope["headers"]:
+        if name == b"authorization":
+            authorization = value
+        elif name == b"x-forwarded-for":
+            forwarded = value
+    if authorization and authorization[:7].lower() == b"bearer ":
+        subject = token_subject(authorization[7:].decode("latin-1").strip())
+        if subject:
+            return f"user:{subject}"
+    if forwarded and RATE_LIMIT_TRUSTED_PROXIES > 0:
+        # Entries left of the ones our proxies appended were supplied by the client
+        hops = [hop.strip() for hop in forwarded.decode("latin-1").split(",")]
+        if len(hops) >= RATE_LIMIT_TRUSTED_PROXIES and hops[-RATE_LIMIT_TRUSTED_PROXIES]:
+            return f"ip:{hops[-RATE_LIMIT_TRUSTED_PROXIES]}"
+    client = scope.get("client")
+    return f"ip:{client[0] if client else 'unknown'}"
+
+def rate_limit_cost(path: str) -> float:
+    for pattern, cost in RATE_LIMIT_COSTS:
+        if pattern.match(path):
+            return cost
+    return 1
+
+class RateLimitMiddleware:
+    """Charges each request's route cost to the caller's bucket; over-limit requests are answered
+    with 429 before routing, authentication or any database work."""
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http" or scope["method"] == "OPTIONS" or scope["path"] in RATE_LIMIT_EXEMPT:
+            await self.app(scope, receive, send)
+            return
+        allowed, tokens, retry_after = rate_limiter.acquire(rate_limit_key(scope), rate_limit_cost(scope["path"]))
+        limit_headers = [
+            (b"ratelimit-limit", str(int(rate_limiter.capacity)).encode()),
+            (b"ratelimit-remaining", str(max(0, int(tokens))).encode()),
+            (b"ratelimit-reset", str(math.ceil(rate_limiter.seconds_until_full(tokens))).encode()),
+        ]
+        if not allowed:
+            RATE_LIMIT_REJECTIONS.inc()
+            body = b'{"detail":"Rate limit exceeded"}'
+            await send({
+                "type": "http.response.start",
+                "status": 429,
+                "headers": [
+                    (b"content-type", b"application/json"),
+                    (b"content-length", str(len(body)).encode()),
+                    (b"retry-after", str(max(1, math.ceil(retry_after))).encode()),
+                ] + limit_headers,
+            })
+            await send({"type": "http.response.body", "body": body})
+            return
+        
+        async def send_with_limits(message):
+            if message["type"] == "http.response.start":
+                message["headers"] = list(message.get("headers", [])) + limit_headers
+            await send(message)
+        
+        await self.app(scope, receive, send_with_limits)
+
+@app.get("/metrics", include_in_schema=False)
+async def metrics():
+    if os.environ.get("PROMETHEUS_MULTIPROC_DIR"):
+        registry = CollectorRegistry()
+        multiprocess.MultiProcessCollector(registry)
+        return Response(content=generate_latest(registry), media_type=CONTENT_TYPE_LATEST)
+    return Response(content=generate_latest(), media_type=CONTENT_TYPE_LATEST)
+
+# Rate limiting sits inside CORS so 429s still carry CORS headers
+if RATE_LIMIT_ENABLED:
+    app.add_middleware(RateLimitMiddleware)
 app.add_middleware(
     CORSMiddleware,
     allow_credentials=True,
@@ -626,6 +3904,7 @@ app.add_middleware(
     allow_methods=["*"],
     allow_headers=["*"],
 )
+app.add_middleware(MetricsMiddleware)
 
 logging.basicConfig(
     level=logging.INFO,
@@ -633,6 +3912,54 @@ logging.basicConfig(
 )
 logger = logging.getLogger(__name__)
 
-@app.on_event("shutdown")
-async def shutdown_db_client():
-    client.close()
\ No newline at end of file
+@contextlib.asynccontextmanager
+async def lifespan(app: FastAPI):
+    started = time.perf_counter()
+    # Per lifespan, so a later startup in the same process (tests, reloads) gets loops that run
+    job_worker_stop = asyncio.Event()
+    rate_limit_stop = asyncio.Event()
+    job_worker_task: Optional[asyncio.Task] = None
+    rate_limit_task: Optional[asyncio.Task] = None
+    migration_task: Optional[asyncio.Task] = None
+    connect_mongo()
+    if PREWARM_IMPORTS:
+        await asyncio.to_thread(prewarm_imports, PREWARM_IMPORTS)
+    if MONGO_ENSURE_INDEXES:
+        await ensure_indexes()
+        for plan in await check_query_plans():
+            if plan.get("unindexed") or plan.get("slow"):
+                logger.warning(f"Query plan needs attention: {plan}")
+    if MONGO_MIGRATE_DATES:
+        # Runs alongside traffic; every read path accepts both string and BSON dates meanwhile
+        migration_task = asyncio.ensure_future(migrate_string_dates())
+    if JOB_WORKER_IN_PROCESS:
+        job_worker_task = asyncio.ensure_future(run_job_worker(f"api-{os.getpid()}", JOB_WORKER_CONCURRENCY, job_worker_stop))
+    if RATE_LIMIT_ENABLED and RATE_LIMIT_SYNC_SECONDS > 0:
+        rate_limit_task = asyncio.ensure_future(rate_limiter.run(RATE_LIMIT_SYNC_SECONDS, rate_limit_stop))
+    startup_report["lifespan_ms"] = round((time.perf_counter() - started) * 1000, 1)
+    startup_ms = startup_report["module_import_ms"] + startup_report["lifespan_ms"]
+    logger.info(f"Startup: import {startup_report['module_import_ms']} ms, lifespan {startup_report['lifespan_ms']} ms")
+    if STARTUP_BUDGET_MS and startup_ms > STARTUP_BUDGET_MS:
+        logger.warning(f"Startup took {startup_ms:.0f} ms, over the {STARTUP_BUDGET_MS:.0f} ms budget: {startup_report}")
+    try:
+        yield
+    finally:
+        job_worker_stop.set()
+        rate_limit_stop.set()
+        if job_worker_task is not None:
+            await job_worker_task
+        if rate_limit_task is not None:
+            await rate_limit_task
+        if migration_task is not None:
+            # Safe to stop part way: the next startup picks up the string dates still left
+            migration_task.cancel()
+            await asyncio.gather(migration_task, return_exceptions=True)
+        if client is not None:
+            client.close()
+        render_pool.shutdown()
+        auth_pool.shutdown()
+        import_pool.shutdown()
+
+app.router.lifespan_context = lifespan
+
+startup_report["module_import_ms"] = elapsed_since_import_ms()
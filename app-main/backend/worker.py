@@ -0,0 +1,39 @@
+"""Standalone job worker: runs render, import and AI jobs from db.jobs outside the API process.
+
+Usage: python worker.py [--concurrency N]
+Set JOB_WORKER_IN_PROCESS=false on the API when workers are deployed separately.
+"""
+import argparse
+import asyncio
+import logging
+import os
+import signal
+import socket
+
+import server
+
+
+async def main(concurrency: int):
+    stop_event = asyncio.Event()
+    loop = asyncio.get_running_loop()
+    for signum in (signal.SIGINT, signal.SIGTERM):
+        loop.add_signal_handler(signum, stop_event.set)
+
+    server.connect_mongo()
+    await server.ensure_indexes()
+    worker_id = f"{socket.gethostname()}-{os.getpid()}"
+    logging.info(f"Job worker {worker_id} started with concurrency {concurrency}")
+    try:
+        await server.run_job_worker(worker_id, concurrency, stop_event)
+    finally:
+        server.render_pool.shutdown()
+        server.import_pool.shutdown()
+        server.client.close()
+        logging.info(f"Job worker {worker_id} stopped")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Run background jobs from MongoDB")
+    parser.add_argument("--concurrency", type=int, default=server.JOB_WORKER_CONCURRENCY)
+    args = parser.parse_args()
+    asyncio.run(main(args.concurrency))
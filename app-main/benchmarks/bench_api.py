@@ -0,0 +1,392 @@
+"""Endpoint benchmarks for the backend.
+
+Drives the FastAPI app in-process through httpx's ASGI transport, against a local mongod
+(--mongo-url) or mongomock-motor, with a deterministic fake OpenAI client. Reports p50/p95/p99
+latency and requests per second per scenario and resume size. Alternatively --base-url points
+it at a running uvicorn instance (start it with RATE_LIMIT_ENABLED=false and
+ADMIN_EMAILS=bench@example.com).
+
+    python benchmarks/bench_api.py --output results.json
+    python benchmarks/bench_api.py --baseline results.json   # flags regressions, exits 1
+
+Results depend on the machine; compare runs from the same host with the same arguments.
+Cold downloads beyond the render pool's capacity are shed with 503 and show up under errs.
+"""
+import argparse
+import asyncio
+import hashlib
+import json
+import os
+import platform
+import random
+import subprocess
+import sys
+import time
+from pathlib import Path
+from types import SimpleNamespace
+
+BACKEND_DIR = Path(__file__).resolve().parent.parent / "backend"
+
+SCENARIOS = ["login", "me", "list", "summaries", "get", "update", "section_patch", "score", "calculate_score", "download", "download_cold", "export_docx_cold", "export_html_cold", "summary_ai", "match_job", "analytics"]
+SIZES = {
+    # name: (experiences, internships, hackathons, education, projects, events, skills, description words)
+    "tiny": (0, 0, 0, 0, 0, 0, 0, 0),
+    "small": (2, 1, 0, 1, 2, 0, 8, 40),
+    "large": (12, 4, 3, 3, 10, 5, 30, 80),
+    "huge": (60, 10, 10, 5, 40, 20, 120, 150),
+}
+# Scenarios whose cost does not depend on resume size run once, against "tiny"
+SIZE_INDEPENDENT = {"login", "me", "summary_ai"}
+
+JOB_DESCRIPTION = ("Backend engineer to build reliable data pipelines and APIs in Python with FastAPI and MongoDB. "
+                   "You will scale services on the cloud platform, reduce latency for customers and lead a small team.")
+
+WORDS = ("built designed scaled shipped led migrated optimised python react mongodb fastapi "
+         "service pipeline latency customers platform team api cloud data reliability").split()
+
+
+class FakeChatCompletions:
+    """Stands in for openai_client.chat.completions with fixed latency and content derived from the prompt."""
+
+    def __init__(self, latency: float):
+        self.latency = latency
+
+    async def create(self, model, messages, stream=False, **kwargs):
+        await asyncio.sleep(self.latency)
+        digest = hashlib.sha256(json.dumps(messages).encode("utf-8")).hexdigest()
+        content = f"Deterministic completion {digest[:16]} for benchmarking."
+        usage = SimpleNamespace(total_tokens=sum(len(m["content"]) for m in messages) // 4 + 12)
+        if not stream:
+            return SimpleNamespace(choices=[SimpleNamespace(message=SimpleNamespace(content=content))], usage=usage)
+
+        chunks = [SimpleNamespace(choices=[SimpleNamespace(delta=SimpleNamespace(content=word + " "))], usage=None) for word in content.split(" ")]
+        return FakeStream(chunks + [SimpleNamespace(choices=[], usage=usage)])
+
+
+class FakeStream:
+    """Async iterator with the close() that stream_llm calls on the real AsyncStream."""
+
+    def __init__(self, chunks):
+        self.chunks = iter(chunks)
+
+    def __aiter__(self):
+        return self
+
+    async def __anext__(self):
+        try:
+            return next(self.chunks)
+        except StopIteration:
+            raise StopAsyncIteration
+
+    async def close(self):
+        pass
+
+
+class FakeOpenAI:
+    def __init__(self, latency: float):
+        self.chat = SimpleNamespace(completions=FakeChatCompletions(latency))
+
+
+def patch_mongomock():
+    import mongomock.collection
+
+    sys.path.insert(0, str(BACKEND_DIR.parent))
+    from tests.mongomock_support import find_one_and_update_dropping_id
+
+    original = mongomock.collection.Collection.find_one_and_update
+    mongomock.collection.Collection.find_one_and_update = find_one_and_update_dropping_id(original)
+
+
+def make_resume_data(size: str, seed: int) -> dict:
+    # Items carry stable ids like the frontend sends; without them every read mints new ids
+    # and the render cache key never repeats
+    rng = random.Random(f"{size}:{seed}")
+    experiences, internships, hackathons, education, projects, events, skills, words = SIZES[size]
+
+    def text(count):
+        return " ".join(rng.choice(WORDS) for _ in range(count))
+
+    return {
+        "personal_info": {"full_name": "Bench User", "email": "bench@example.com", "phone": "555-0100", "location": "Remote"},
+        "summary": text(words),
+        "experiences": [
+            {"id": f"exp-{i}", "type": "work", "title": f"Engineer {i}", "organization": f"Company {i}", "start_date": "2019-01",
+             "end_date": "2021-06", "description": text(words), "skills": [rng.choice(WORDS) for _ in range(4)]}
+            for i in range(experiences)
+        ],
+        "internships": [
+            {"id": f"intern-{i}", "title": f"Intern {i}", "company": f"Startup {i}", "start_date": "2018-06", "end_date": "2018-09",
+             "description": text(words), "skills": [rng.choice(WORDS) for _ in range(3)]}
+            for i in range(internships)
+        ],
+        "hackathons": [
+            {"id": f"hack-{i}", "name": f"Hack {i}", "organizer": "Org", "date": "2020-03", "project_title": f"Hack project {i}",
+             "description": text(words), "technologies": [rng.choice(WORDS) for _ in range(3)]}
+            for i in range(hackathons)
+        ],
+        "education": [
+            {"id": f"edu-{i}", "institution": f"University {i}", "degree": "BSc", "field": "Computer Science", "start_date": "2014",
+             "end_date": "2018", "gpa": "3.8"}
+            for i in range(education)
+        ],
+        "projects": [
+            {"id": f"project-{i}", "title": f"Project {i}", "description": text(words), "technologies": [rng.choice(WORDS) for _ in range(4)]}
+            for i in range(projects)
+        ],
+        "events": [
+            {"id": f"event-{i}", "title": f"Talk {i}", "organization": "Meetup", "date": "2022-05", "description": text(words // 2)}
+            for i in range(events)
+        ],
+        "skills": [{"id": f"skill-{i}", "name": f"{rng.choice(WORDS)}-{i}", "proficiency": rng.randint(1, 5)} for i in range(skills)],
+    }
+
+
+def percentile(sorted_values, fraction):
+    # Nearest-rank, so the reported value is always an observed latency
+    index = max(0, min(len(sorted_values) - 1, int(round(fraction * len(sorted_values) + 0.5)) - 1))
+    return sorted_values[index]
+
+
+class Bench:
+    def __init__(self, client, args):
+        self.client = client
+        self.args = args
+        self.credentials = {"email": "bench@example.com", "password": "bench-password"}
+        self.headers = {}
+        self.resume_ids = {}
+
+    async def setup(self):
+        response = await self.client.post("/api/auth/register", json={**self.credentials, "name": "Bench User"})
+        if response.status_code == 400:
+            # Reusing a database from an earlier run against --base-url
+            response = await self.client.post("/api/auth/login", json=self.credentials)
+        response.raise_for_status()
+        self.headers = {"Authorization": f"Bearer {response.json()['access_token']}"}
+        for size in self.args.sizes:
+            response = await self.client.post("/api/resumes", json={"title": f"Bench {size}"}, headers=self.headers)
+            response.raise_for_status()
+            resume_id = response.json()["id"]
+            response = await self.client.put(f"/api/resumes/{resume_id}", json={"data": make_resume_data(size, 0)}, headers=self.headers)
+            response.raise_for_status()
+            self.resume_ids[size] = resume_id
+
+    async def prepare(self, scenario: str, size: str, i: int):
+        # Untimed; runs before each request that needs fresh state
+        if scenario.endswith("_cold"):
+            # A new summary changes the content hash, so the render cache misses
+            response = await self.client.patch(
+                f"/api/resumes/{self.resume_ids[size]}/sections/summary",
+                json={"value": f"Cold render {i} {time.perf_counter_ns()}"},
+                headers=self.headers,
+            )
+            response.raise_for_status()
+
+    def request_for(self, scenario: str, size: str, i: int):
+        """Return (method, path, kwargs) for the i-th request of a scenario."""
+        resume_id = self.resume_ids[size]
+        if scenario == "login":
+            return "POST", "/api/auth/login", {"json": self.credentials}
+        if scenario == "me":
+            return "GET", "/api/auth/me", {}
+        if scenario == "list":
+            return "GET", "/api/resumes", {}
+        if scenario == "summaries":
+            return "GET", "/api/resumes/summaries", {"params": {"limit": 20}}
+        if scenario == "get":
+            return "GET", f"/api/resumes/{resume_id}", {}
+        if scenario == "update":
+            # Unconditional full writes; cycling seeds means each write changes the data
+            return "PUT", f"/api/resumes/{resume_id}", {"json": {"data": make_resume_data(size, 1 + i % 8)}}
+        if scenario == "section_patch":
+            return "PATCH", f"/api/resumes/{resume_id}/sections/summary", {"json": {"value": f"Summary revision {i}"}}
+        if scenario == "score":
+            return "GET", f"/api/resumes/{resume_id}/score", {}
+        if scenario == "calculate_score":
+            return "POST", "/api/ai/calculate-score", {"json": {"prompt": "", "context": make_resume_data(size, 0)}}
+        if scenario in ("download", "download_cold"):
+            return "GET", f"/api/resumes/{resume_id}/download", {}
+        if scenario in ("export_docx_cold", "export_html_cold"):
+            return "GET", f"/api/resumes/{resume_id}/download", {"params": {"format": scenario.split("_")[1]}}
+        if scenario == "match_job":
+            return "POST", "/api/resumes/match-job", {"json": {"job_description": JOB_DESCRIPTION, "resume_ids": [resume_id]}}
+        if scenario == "summary_ai":
+            return "POST", "/api/ai/generate-summary", {"json": {"prompt": "", "context": {"name": f"Bench {i}"}, "regenerate": True}}
+        if scenario == "analytics":
+            return "GET", "/api/analytics/skills", {"params": {"limit": 20}}
+        raise ValueError(f"Unknown scenario: {scenario}")
+
+    async def timed_request(self, scenario: str, size: str, i: int) -> tuple:
+        await self.prepare(scenario, size, i)
+        method, path, kwargs = self.request_for(scenario, size, i)
+        started = time.perf_counter()
+        response = await self.client.request(method, path, headers=self.headers, **kwargs)
+        return time.perf_counter() - started, response.status_code < 400
+
+    async def run_scenario(self, scenario: str, size: str) -> dict:
+        for i in range(self.args.warmup):
+            await self.timed_request(scenario, size, i)
+
+        latencies = []
+        errors = 0
+        pending = iter(range(self.args.warmup, self.args.warmup + self.args.requests))
+
+        async def worker():
+            nonlocal errors
+            for i in pending:
+                elapsed, ok = await self.timed_request(scenario, size, i)
+                latencies.append(elapsed)
+                errors += not ok
+
+        started = time.perf_counter()
+        await asyncio.gather(*(worker() for _ in range(self.args.concurrency)))
+        wall = time.perf_counter() - started
+        latencies.sort()
+        return {
+            "scenario": scenario,
+            "size": size,
+            "requests": len(latencies),
+            "errors": errors,
+            "rps": round(len(latencies) / wall, 1),
+            "p50_ms": round(percentile(latencies, 0.50) * 1000, 2),
+            "p95_ms": round(percentile(latencies, 0.95) * 1000, 2),
+            "p99_ms": round(percentile(latencies, 0.99) * 1000, 2),
+        }
+
+
+def configure_environment(args):
+    # Must run before server is imported: it reads configuration at import time
+    os.environ["MONGO_URL"] = args.mongo_url or "mongodb://localhost:27017"
+    os.environ["DB_NAME"] = args.db_name
+    os.environ.pop("OPENAI_API_KEY", None)
+    # Coalescing would add its window to every update; the in-process job worker would poll Mongo;
+    # the rate limiter would throttle the benchmark client (its own cost is in the middleware timing)
+    os.environ.setdefault("RESUME_SAVE_COALESCE_MS", "0")
+    os.environ.setdefault("JOB_WORKER_IN_PROCESS", "false")
+    os.environ.setdefault("RATE_LIMIT_ENABLED", "false")
+    os.environ.setdefault("RENDER_CACHE_DIR", "")
+    os.environ.setdefault("ADMIN_EMAILS", "bench@example.com")
+    sys.path.insert(0, str(BACKEND_DIR))
+
+
+async def run_in_process(args) -> list:
+    import httpx
+
+    configure_environment(args)
+    import server
+
+    if args.mongo_url:
+        server.connect_mongo()
+        await server.client.drop_database(args.db_name)
+    else:
+        from mongomock_motor import AsyncMongoMockClient
+
+        patch_mongomock()
+        server.client = AsyncMongoMockClient(tz_aware=True)
+        server.db = server.client[args.db_name]
+    server.openai_client = FakeOpenAI(args.llm_latency_ms / 1000)
+
+    async with server.app.router.lifespan_context(server.app):
+        transport = httpx.ASGITransport(app=server.app)
+        async with httpx.AsyncClient(transport=transport, base_url="http://bench", timeout=None) as client:
+            return await run_all(client, args)
+
+
+async def run_against_server(args) -> list:
+    import httpx
+
+    async with httpx.AsyncClient(base_url=args.base_url, timeout=None) as client:
+        return await run_all(client, args)
+
+
+async def run_all(client, args) -> list:
+    bench = Bench(client, args)
+    await bench.setup()
+    results = []
+    for scenario in args.scenarios:
+        sizes = ["tiny"] if scenario in SIZE_INDEPENDENT and "tiny" in args.sizes else args.sizes
+        for size in sizes:
+            result = await bench.run_scenario(scenario, size)
+            results.append(result)
+            print(format_row(result), flush=True)
+    return results
+
+
+def format_row(result: dict, baseline: dict = None) -> str:
+    row = (f"{result['scenario']:<16} {result['size']:<6} {result['requests']:>6} {result['errors']:>4} "
+           f"{result['rps']:>9.1f} {result['p50_ms']:>9.2f} {result['p95_ms']:>9.2f} {result['p99_ms']:>9.2f}")
+    if baseline:
+        row += f"  p50 {change(baseline['p50_ms'], result['p50_ms']):>+7.1f}%  p95 {change(baseline['p95_ms'], result['p95_ms']):>+7.1f}%"
+    return row
+
+
+def change(before: float, after: float) -> float:
+    return (after - before) / before * 100 if before else 0.0
+
+
+def git_revision() -> str:
+    try:
+        return subprocess.run(["git", "rev-parse", "--short", "HEAD"], cwd=BACKEND_DIR, capture_output=True, text=True, check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return "unknown"
+
+
+def compare(results: list, baseline_path: str, threshold: float, min_delta_ms: float) -> bool:
+    baseline = {(row["scenario"], row["size"]): row for row in json.loads(Path(baseline_path).read_text())["results"]}
+    print(f"\nAgainst {baseline_path} (regression threshold {threshold:.0f}% on p50/p95):")
+    regressed = False
+    for result in results:
+        before = baseline.get((result["scenario"], result["size"]))
+        if before is None:
+            continue
+        flagged = any(
+            change(before[key], result[key]) > threshold and result[key] - before[key] > min_delta_ms
+            for key in ("p50_ms", "p95_ms")
+        )
+        regressed = regressed or flagged
+        print(format_row(result, before) + ("  REGRESSION" if flagged else ""))
+    return regressed
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark the resume API")
+    parser.add_argument("--mongo-url", default=os.environ.get("BENCH_MONGO_URL"), help="local mongod; defaults to mongomock-motor")
+    parser.add_argument("--db-name", default="resume_builder_bench", help="dropped at the start of every in-process run")
+    parser.add_argument("--base-url", help="benchmark a running server instead of the in-process app")
+    parser.add_argument("--scenarios", default=",".join(SCENARIOS))
+    parser.add_argument("--sizes", default=",".join(SIZES))
+    parser.add_argument("--requests", type=int, default=200, help="timed requests per scenario and size")
+    parser.add_argument("--warmup", type=int, default=20)
+    parser.add_argument("--concurrency", type=int, default=8)
+    parser.add_argument("--llm-latency-ms", type=float, default=200.0, help="latency of the fake OpenAI client")
+    parser.add_argument("--output", help="write results as JSON")
+    parser.add_argument("--baseline", help="JSON from an earlier run to compare against")
+    parser.add_argument("--threshold", type=float, default=10.0, help="percent slowdown that counts as a regression")
+    parser.add_argument("--min-delta-ms", type=float, default=0.5, help="ignore slowdowns smaller than this, which are noise")
+    args = parser.parse_args()
+    args.scenarios = [name for name in args.scenarios.split(",") if name]
+    args.sizes = [name for name in args.sizes.split(",") if name]
+    unknown = [name for name in args.scenarios if name not in SCENARIOS] + [name for name in args.sizes if name not in SIZES]
+    if unknown:
+        parser.error(f"unknown scenario or size: {', '.join(unknown)}")
+
+    print(f"{'scenario':<16} {'size':<6} {'reqs':>6} {'errs':>4} {'rps':>9} {'p50 ms':>9} {'p95 ms':>9} {'p99 ms':>9}")
+    runner = run_against_server if args.base_url else run_in_process
+    results = asyncio.run(runner(args))
+
+    report = {
+        "revision": git_revision(),
+        "python": platform.python_version(),
+        "machine": platform.machine(),
+        "mongo": "external" if args.base_url else ("mongod" if args.mongo_url else "mongomock"),
+        "settings": {key: getattr(args, key) for key in ("requests", "warmup", "concurrency", "llm_latency_ms")},
+        "results": results,
+    }
+    if args.output:
+        Path(args.output).write_text(json.dumps(report, indent=2))
+    if args.baseline and compare(results, args.baseline, args.threshold, args.min_delta_ms):
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    # The render pool spawns processes that re-import this file, hence the guard
+    main()
@@ -0,0 +1,137 @@
+"""Cold-start report for the backend.
+
+Measures two things in fresh processes:
+
+- import cost of server.py, from ``python -X importtime``, summed per top-level package so the
+  heaviest dependencies stand out;
+- time to first request: from spawning uvicorn to the first 200 from GET /api/, with index
+  builds, the date migration and the in-process job worker switched off.
+
+    python benchmarks/startup_report.py
+    python benchmarks/startup_report.py --import-budget-ms 900 --first-request-budget-ms 2500   # exits 1 when over
+
+MONGO_URL and DB_NAME are passed through from the environment; no Mongo command is issued, so
+any URL will do. Take the median of a few --runs; the first run after a reboot is also paying
+for a cold filesystem cache.
+"""
+import argparse
+import json
+import os
+import socket
+import statistics
+import subprocess
+import sys
+import time
+import urllib.error
+import urllib.request
+from pathlib import Path
+
+BACKEND_DIR = Path(__file__).resolve().parent.parent / "backend"
+
+
+def server_environment(extra: dict = None) -> dict:
+    env = dict(os.environ)
+    env.setdefault("MONGO_URL", "mongodb://127.0.0.1:27017")
+    env.setdefault("DB_NAME", "resume_builder_startup")
+    env.update({
+        "MONGO_ENSURE_INDEXES": "false",
+        "MONGO_MIGRATE_DATES": "false",
+        "JOB_WORKER_IN_PROCESS": "false",
+    })
+    env.update(extra or {})
+    return env
+
+
+def measure_imports(env: dict) -> tuple:
+    """Returns (total ms, {top-level package: self ms}) for one cold ``import server``."""
+    completed = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", "import server"],
+        cwd=BACKEND_DIR, env=env, capture_output=True, text=True, check=True,
+    )
+    total_ms, packages = 0.0, {}
+    for line in completed.stderr.splitlines():
+        # import time: self [us] | cumulative | imported package
+        if not line.startswith("import time:") or "imported package" in line:
+            continue
+        self_us, cumulative_us, name = (part.strip() for part in line[len("import time:"):].split("|"))
+        top = name.split(".")[0]
+        packages[top] = packages.get(top, 0) + int(self_us) / 1000
+        if name == "server":
+            total_ms = int(cumulative_us) / 1000
+    return total_ms, packages
+
+
+def free_port() -> int:
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+def measure_first_request(env: dict, timeout: float) -> float:
+    port = free_port()
+    url = f"http://127.0.0.1:{port}/api/"
+    started = time.perf_counter()
+    process = subprocess.Popen(
+        [sys.executable, "-m", "uvicorn", "server:app", "--port", str(port), "--log-level", "warning"],
+        cwd=BACKEND_DIR, env=env,
+    )
+    try:
+        while time.perf_counter() - started < timeout:
+            if process.poll() is not None:
+                raise RuntimeError(f"uvicorn exited with {process.returncode} before serving")
+            try:
+                with urllib.request.urlopen(url, timeout=1) as response:
+                    if response.status == 200:
+                        return (time.perf_counter() - started) * 1000
+            except (urllib.error.URLError, ConnectionError):
+                time.sleep(0.01)
+        raise RuntimeError(f"no response from {url} within {timeout:.0f}s")
+    finally:
+        process.terminate()
+        process.wait()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Measure backend import time and time to first request")
+    parser.add_argument("--runs", type=int, default=3, help="fresh processes per measurement; the median is reported")
+    parser.add_argument("--top", type=int, default=12, help="packages to list by import cost")
+    parser.add_argument("--prewarm", default="", help="PREWARM_IMPORTS for the measured server, e.g. all")
+    parser.add_argument("--import-budget-ms", type=float, help="fail when importing server takes longer")
+    parser.add_argument("--first-request-budget-ms", type=float, help="fail when the first response takes longer")
+    parser.add_argument("--timeout", type=float, default=60.0, help="seconds to wait for uvicorn to answer")
+    parser.add_argument("--output", help="write the report as JSON")
+    args = parser.parse_args()
+
+    env = server_environment({"PREWARM_IMPORTS": args.prewarm})
+    import_runs = [measure_imports(env) for _ in range(args.runs)]
+    import_ms = statistics.median(total for total, _ in import_runs)
+    packages = {name: statistics.median(run[1].get(name, 0.0) for run in import_runs) for name in import_runs[0][1]}
+    first_request_ms = statistics.median(measure_first_request(env, args.timeout) for _ in range(args.runs))
+
+    print(f"import server        {import_ms:9.1f} ms")
+    print(f"first request        {first_request_ms:9.1f} ms  (process spawn to first 200)")
+    print(f"\nheaviest packages by import self-time (median of {args.runs}):")
+    for name, ms in sorted(packages.items(), key=lambda item: -item[1])[:args.top]:
+        print(f"  {name:<24} {ms:9.1f} ms")
+
+    over = []
+    if args.import_budget_ms is not None and import_ms > args.import_budget_ms:
+        over.append(f"import {import_ms:.0f} ms > {args.import_budget_ms:.0f} ms")
+    if args.first_request_budget_ms is not None and first_request_ms > args.first_request_budget_ms:
+        over.append(f"first request {first_request_ms:.0f} ms > {args.first_request_budget_ms:.0f} ms")
+
+    if args.output:
+        Path(args.output).write_text(json.dumps({
+            "import_ms": round(import_ms, 1),
+            "first_request_ms": round(first_request_ms, 1),
+            "packages_ms": {name: round(ms, 1) for name, ms in sorted(packages.items(), key=lambda item: -item[1])},
+            "prewarm": args.prewarm,
+            "over_budget": over,
+        }, indent=2))
+    if over:
+        print("\nOVER BUDGET: " + "; ".join(over))
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
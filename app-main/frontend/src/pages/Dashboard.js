@@ -1,4 +1,4 @@
-import React, { useState, useEffect, useContext } from 'react';
+import React, { useState, useEffect, useContext, useRef } from 'react';
 import { useNavigate } from 'react-router-dom';
 import axios from 'axios';
 import { API, AuthContext } from '@/App';
@@ -8,15 +8,22 @@ import { Dialog, DialogContent, DialogDescription, DialogHeader, DialogTitle, Di
 import { Input } from '@/components/ui/input';
 import { Label } from '@/components/ui/label';
 import { toast } from 'sonner';
-import { FileText, Plus, LogOut, Trash2, Edit, Download } from 'lucide-react';
+import { FileText, Plus, LogOut, Trash2, Edit, Download, Upload, Search, X } from 'lucide-react';
 
 const Dashboard = () => {
   const navigate = useNavigate();
   const { user, logout } = useContext(AuthContext);
   const [resumes, setResumes] = useState([]);
+  const [nextCursor, setNextCursor] = useState(null);
+  const [loadingMore, setLoadingMore] = useState(false);
   const [loading, setLoading] = useState(true);
   const [createDialogOpen, setCreateDialogOpen] = useState(false);
   const [newResumeTitle, setNewResumeTitle] = useState('');
+  const [importing, setImporting] = useState(false);
+  const [searchQuery, setSearchQuery] = useState('');
+  const [searchResults, setSearchResults] = useState(null);
+  const [searching, setSearching] = useState(false);
+  const importInputRef = useRef(null);
 
   useEffect(() => {
     fetchResumes();
@@ -24,8 +31,9 @@ const Dashboard = () => {
 
   const fetchResumes = async () => {
     try {
-      const response = await axios.get(`${API}/resumes`);
-      setResumes(response.data);
+      const response = await axios.get(`${API}/resumes/summaries`);
+      setResumes(response.data.items);
+      setNextCursor(response.data.next_cursor);
     } catch (error) {
       toast.error('Failed to load resumes');
     } finally {
@@ -33,6 +41,21 @@ const Dashboard = () => {
     }
   };
 
+  const loadMoreResumes = async () => {
+    setLoadingMore(true);
+    try {
+      const response = await axios.get(`${API}/resumes/summaries`, {
+        params: { cursor: nextCursor }
+      });
+      setResumes((current) => [...current, ...response.data.items]);
+      setNextCursor(response.data.next_cursor);
+    } catch (error) {
+      toast.error('Failed to load resumes');
+    } finally {
+      setLoadingMore(false);
+    }
+  };
+
   const createResume = async () => {
     if (!newResumeTitle.trim()) {
       toast.error('Please enter a resume title');
@@ -53,6 +76,66 @@ const Dashboard = () => {
     }
   };
 
+  const waitForImport = async (jobId) => {
+    for (let attempt = 0; attempt < 60; attempt += 1) {
+      const response = await axios.get(`${API}/imports/${jobId}`);
+      if (response.data.status === 'completed' || response.data.status === 'failed') {
+        return response.data;
+      }
+      await new Promise((resolve) => setTimeout(resolve, 1000));
+    }
+    return { status: 'failed', error: 'Import is taking longer than expected' };
+  };
+
+  const importResume = async (event) => {
+    const file = event.target.files[0];
+    event.target.value = '';
+    if (!file) return;
+
+    setImporting(true);
+    try {
+      const formData = new FormData();
+      formData.append('file', file);
+      const response = await axios.post(`${API}/resumes/import`, formData);
+      const job = await waitForImport(response.data.job_id);
+      if (job.status === 'completed') {
+        toast.success('Resume imported!');
+        navigate(`/resume/${job.resume_id}`);
+      } else {
+        toast.error(job.error || 'Failed to import resume');
+      }
+    } catch (error) {
+      toast.error(error.response?.data?.detail || 'Failed to import resume');
+    } finally {
+      setImporting(false);
+    }
+  };
+
+  const searchResumes = async (event) => {
+    event.preventDefault();
+    if (!searchQuery.trim()) {
+      setSearchResults(null);
+      return;
+    }
+
+    setSearching(true);
+    try {
+      const response = await axios.get(`${API}/resumes/search`, {
+        params: { q: searchQuery }
+      });
+      setSearchResults(response.data.results);
+    } catch (error) {
+      toast.error(error.response?.data?.detail || 'Search failed');
+    } finally {
+      setSearching(false);
+    }
+  };
+
+  const clearSearch = () => {
+    setSearchQuery('');
+    setSearchResults(null);
+  };
+
   const deleteResume = async (id) => {
     if (!window.confirm('Are you sure you want to delete this resume?')) return;
 
@@ -125,6 +208,24 @@ const Dashboard = () => {
             <h2 className="text-3xl font-bold text-slate-900 mb-2">My Resumes</h2>
             <p className="text-slate-600">Create and manage your professional resumes</p>
           </div>
+          <div className="flex gap-2">
+          <input
+            ref={importInputRef}
+            type="file"
+            accept=".pdf,.docx"
+            className="hidden"
+            onChange={importResume}
+            data-testid="import-resume-input"
+          />
+          <Button
+            variant="outline"
+            onClick={() => importInputRef.current?.click()}
+            disabled={importing}
+            data-testid="import-resume-btn"
+          >
+            <Upload className="w-4 h-4 mr-2" />
+            {importing ? 'Importing...' : 'Import'}
+          </Button>
           <Dialog open={createDialogOpen} onOpenChange={setCreateDialogOpen}>
             <DialogTrigger asChild>
               <Button className="bg-gradient-to-r from-blue-600 to-purple-600 hover:from-blue-700 hover:to-purple-700" data-testid="create-resume-btn">
@@ -158,9 +259,57 @@ const Dashboard = () => {
               </div>
             </DialogContent>
           </Dialog>
+          </div>
         </div>
 
-        {resumes.length === 0 ? (
+        <form onSubmit={searchResumes} className="flex gap-2 mb-8" data-testid="resume-search-form">
+          <Input
+            placeholder="Search your resumes, e.g. Kafka project"
+            value={searchQuery}
+            onChange={(e) => setSearchQuery(e.target.value)}
+            data-testid="resume-search-input"
+          />
+          <Button type="submit" variant="outline" disabled={searching} data-testid="resume-search-btn">
+            <Search className="w-4 h-4 mr-2" />
+            {searching ? 'Searching...' : 'Search'}
+          </Button>
+          {searchResults && (
+            <Button type="button" variant="ghost" onClick={clearSearch} data-testid="resume-search-clear-btn">
+              <X className="w-4 h-4" />
+            </Button>
+          )}
+        </form>
+
+        {searchResults ? (
+          <div className="space-y-4" data-testid="resume-search-results">
+            {searchResults.length === 0 && (
+              <p className="text-slate-600">No resumes match "{searchQuery}"</p>
+            )}
+            {searchResults.map((result) => (
+              <Card
+                key={result.resume_id}
+                className="cursor-pointer hover:shadow-lg transition-shadow"
+                onClick={() => navigate(`/resume/${result.resume_id}`)}
+                data-testid={`search-result-${result.resume_id}`}
+              >
+                <CardHeader>
+                  <CardTitle className="text-lg">{result.title}</CardTitle>
+                  <CardDescription>
+                    Updated {new Date(result.updated_at).toLocaleDateString()}
+                  </CardDescription>
+                </CardHeader>
+                <CardContent className="space-y-2">
+                  {result.hits.map((hit) => (
+                    <div key={`${hit.section}-${hit.item_id}`} className="text-sm">
+                      <span className="font-medium text-slate-700 capitalize">{hit.section}: </span>
+                      <span className="text-slate-600">{hit.snippet}</span>
+                    </div>
+                  ))}
+                </CardContent>
+              </Card>
+            ))}
+          </div>
+        ) : resumes.length === 0 ? (
           <Card className="text-center py-16" data-testid="empty-state">
             <CardContent>
               <FileText className="w-16 h-16 mx-auto mb-4 text-slate-400" />
@@ -184,6 +333,7 @@ const Dashboard = () => {
                   <CardTitle className="text-lg">{resume.title}</CardTitle>
                   <CardDescription>
                     Updated {new Date(resume.updated_at).toLocaleDateString()}
+                    {resume.score != null && ` · Score ${resume.score}/100`}
                   </CardDescription>
                 </CardHeader>
                 <CardContent>
@@ -218,6 +368,19 @@ const Dashboard = () => {
             ))}
           </div>
         )}
+
+        {!searchResults && nextCursor && (
+          <div className="flex justify-center mt-8">
+            <Button
+              variant="outline"
+              onClick={loadMoreResumes}
+              disabled={loadingMore}
+              data-testid="load-more-resumes-btn"
+            >
+              {loadingMore ? 'Loading...' : 'Load more'}
+            </Button>
+          </div>
+        )}
       </main>
     </div>
   );
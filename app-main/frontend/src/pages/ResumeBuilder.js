@@ -42,9 +42,17 @@ const ResumeBuilder = () => {
   const saveResume = async () => {
     setSaving(true);
     try {
-      await axios.put(`${API}/resumes/${id}`, { data: resume.data });
+      const response = await axios.put(`${API}/resumes/${id}`, {
+        data: resume.data,
+        version: resume.version
+      });
+      setResume((current) => ({ ...current, version: response.data.version }));
       toast.success('Resume saved!');
     } catch (error) {
+      if (error.response?.status === 409) {
+        toast.error('This resume was changed elsewhere. Reload to get the latest version.');
+        return;
+      }
       toast.error('Failed to save resume');
     } finally {
       setSaving(false);
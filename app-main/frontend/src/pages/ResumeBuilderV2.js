@@ -13,12 +13,37 @@ import { Select, SelectContent, SelectItem, SelectTrigger, SelectValue } from '@
 import { toast } from 'sonner';
 import { ArrowLeft, Save, Download, Sparkles, Plus, Trash2, Award, Briefcase, Code, Trophy, Calendar } from 'lucide-react';
 
+const LIST_SECTIONS = ['experiences', 'internships', 'hackathons', 'education', 'projects', 'skills', 'events'];
+// Edits needing more section requests than this are saved with a single PUT
+const MAX_SECTION_REQUESTS = 5;
+
+const parseSseEvent = (raw) => {
+  let event = 'message';
+  let data = '';
+  raw.split('\n').forEach((line) => {
+    if (line.startsWith('event: ')) event = line.slice(7);
+    if (line.startsWith('data: ')) data += line.slice(6);
+  });
+  return { event, data: data ? JSON.parse(data) : {} };
+};
+
+const changedFields = (before, after) => {
+  const changes = {};
+  Object.keys(after).forEach((key) => {
+    if (key !== 'id' && JSON.stringify(before[key]) !== JSON.stringify(after[key])) {
+      changes[key] = after[key];
+    }
+  });
+  return changes;
+};
+
 const ResumeBuilder = () => {
   const { id } = useParams();
   const navigate = useNavigate();
   const [loading, setLoading] = useState(true);
   const [saving, setSaving] = useState(false);
   const [resume, setResume] = useState(null);
+  const [savedData, setSavedData] = useState(null);
   const [activeTab, setActiveTab] = useState('personal');
   const [aiLoading, setAiLoading] = useState(false);
   const [score, setScore] = useState(null);
@@ -31,6 +56,7 @@ const ResumeBuilder = () => {
     try {
       const response = await axios.get(`${API}/resumes/${id}`);
       setResume(response.data);
+      setSavedData(response.data.data);
     } catch (error) {
       toast.error('Failed to load resume');
       navigate('/dashboard');
@@ -39,14 +65,119 @@ const ResumeBuilder = () => {
     }
   };
 
+  // Send only the sections and items that changed since the last save. Each request carries the
+  // version it expects, so a save from a stale tab fails with 409 instead of overwriting newer edits,
+  // and an `apply` step that folds it into the saved copy once the server has accepted it.
+  const buildSectionRequests = (before, after) => {
+    const sectionsUrl = `${API}/resumes/${id}/sections`;
+    const requests = [];
+
+    if (before.summary !== after.summary) {
+      requests.push({
+        send: (version) => axios.patch(`${sectionsUrl}/summary`, { value: after.summary }, { params: { version } }),
+        apply: (saved) => ({ ...saved, summary: after.summary })
+      });
+    }
+
+    const personalChanges = changedFields(before.personal_info, after.personal_info);
+    if (Object.keys(personalChanges).length > 0) {
+      requests.push({
+        send: (version) => axios.patch(`${sectionsUrl}/personal_info`, { value: personalChanges }, { params: { version } }),
+        apply: (saved) => ({ ...saved, personal_info: { ...saved.personal_info, ...personalChanges } })
+      });
+    }
+
+    LIST_SECTIONS.forEach((section) => {
+      const beforeItems = new Map(before[section].map((item) => [item.id, item]));
+      const afterIds = new Set(after[section].map((item) => item.id));
+      const itemUrl = (item) => `${sectionsUrl}/${section}/items/${item.id}`;
+
+      // Item requests keep surviving items in place and append new ones; any other order
+      // can only be saved by replacing the section
+      const itemOrder = [
+        ...before[section].filter((item) => afterIds.has(item.id)),
+        ...after[section].filter((item) => !beforeItems.has(item.id))
+      ];
+      if (itemOrder.some((item, index) => item.id !== after[section][index].id)) {
+        requests.push({
+          send: (version) => axios.patch(`${sectionsUrl}/${section}`, { value: after[section] }, { params: { version } }),
+          apply: (saved) => ({ ...saved, [section]: after[section] })
+        });
+        return;
+      }
+
+      after[section].forEach((item) => {
+        const previous = beforeItems.get(item.id);
+        if (!previous) {
+          requests.push({
+            send: async (version) => {
+              try {
+                return await axios.post(`${sectionsUrl}/${section}/items`, item, { params: { version } });
+              } catch (error) {
+                // An earlier save created it but its response was lost: update it instead
+                if (error.response?.status === 409 && error.response.data?.detail === 'Item already exists') {
+                  const { id: _itemId, ...fields } = item;
+                  return axios.patch(itemUrl(item), fields, { params: { version } });
+                }
+                throw error;
+              }
+            },
+            apply: (saved) => ({ ...saved, [section]: [...saved[section], item] })
+          });
+          return;
+        }
+        const itemChanges = changedFields(previous, item);
+        if (Object.keys(itemChanges).length > 0) {
+          requests.push({
+            send: (version) => axios.patch(itemUrl(item), itemChanges, { params: { version } }),
+            apply: (saved) => ({ ...saved, [section]: saved[section].map((current) => (current.id === item.id ? item : current)) })
+          });
+        }
+      });
+
+      before[section].forEach((item) => {
+        if (!afterIds.has(item.id)) {
+          requests.push({
+            send: (version) => axios.delete(itemUrl(item), { params: { version } }),
+            apply: (saved) => ({ ...saved, [section]: saved[section].filter((current) => current.id !== item.id) })
+          });
+        }
+      });
+    });
+
+    return requests;
+  };
+
   const saveResume = async () => {
     setSaving(true);
+    let version = resume.version;
+    let saved = savedData;
     try {
-      await axios.put(`${API}/resumes/${id}`, { data: resume.data });
+      const data = resume.data;
+      const requests = buildSectionRequests(saved, data);
+      if (requests.length > MAX_SECTION_REQUESTS) {
+        // A large edit goes as one full save rather than a round trip per item
+        const response = await axios.put(`${API}/resumes/${id}`, { data, version });
+        version = response.data.version;
+        saved = response.data.data;
+      } else {
+        for (const request of requests) {
+          const response = await request.send(version);
+          version = response.data.version;
+          saved = request.apply(saved);
+        }
+      }
       toast.success('Resume saved!');
     } catch (error) {
+      if (error.response?.status === 409) {
+        toast.error('This resume was changed elsewhere. Reload to get the latest version.');
+        return;
+      }
       toast.error('Failed to save resume');
     } finally {
+      // Whatever the server accepted stays saved, so a retry only resends what is still missing
+      setSavedData(saved);
+      setResume((current) => ({ ...current, version }));
       setSaving(false);
     }
   };
@@ -265,23 +396,59 @@ const ResumeBuilder = () => {
   const generateSummary = async () => {
     setAiLoading(true);
     try {
-      const response = await axios.post(`${API}/ai/generate-summary`, {
-        prompt: 'Generate summary',
-        context: {
-          experiences: resume.data.experiences,
-          internships: resume.data.internships,
-          hackathons: resume.data.hackathons,
-          skills: resume.data.skills
-        }
+      // Stream the summary so text appears as soon as the model starts producing it
+      const response = await fetch(`${API}/ai/generate-summary/stream`, {
+        method: 'POST',
+        headers: {
+          'Content-Type': 'application/json',
+          Authorization: axios.defaults.headers.common['Authorization']
+        },
+        body: JSON.stringify({
+          prompt: 'Generate summary',
+          context: {
+            experiences: resume.data.experiences,
+            internships: resume.data.internships,
+            hackathons: resume.data.hackathons,
+            skills: resume.data.skills
+          }
+        })
       });
-      updateSummary(response.data.summary);
-      if (response.data.note) {
-        toast.info(response.data.note);
+      if (!response.ok) {
+        const body = await response.json().catch(() => ({}));
+        throw new Error(body.detail || 'Failed to generate summary');
+      }
+
+      const reader = response.body.getReader();
+      const decoder = new TextDecoder();
+      let buffer = '';
+      let summary = '';
+      let result = null;
+      while (true) {
+        const { value, done } = await reader.read();
+        if (done) break;
+        buffer += decoder.decode(value, { stream: true });
+        const events = buffer.split('\n\n');
+        buffer = events.pop();
+        for (const raw of events) {
+          const { event, data } = parseSseEvent(raw);
+          if (event === 'error') throw new Error(data.detail);
+          if (event === 'done') {
+            result = data;
+            continue;
+          }
+          summary += data.delta;
+          const partial = summary;
+          setResume((current) => ({ ...current, data: { ...current.data, summary: partial } }));
+        }
+      }
+
+      if (result?.note) {
+        toast.info(result.note);
       } else {
         toast.success('Summary generated!');
       }
     } catch (error) {
-      toast.error(error.response?.data?.detail || 'Failed to generate summary');
+      toast.error(error.message || 'Failed to generate summary');
     } finally {
       setAiLoading(false);
     }
@@ -0,0 +1,27 @@
+import os
+import sys
+from pathlib import Path
+
+import pytest
+
+from .mongomock_support import find_one_and_update_dropping_id
+
+# server reads its configuration at import time; no Mongo command is issued until a test swaps in mongomock
+os.environ.setdefault("MONGO_URL", "mongodb://127.0.0.1:27017")
+os.environ.setdefault("DB_NAME", "resume_builder_test")
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent / "backend"))
+
+import server  # noqa: E402
+
+
+@pytest.fixture
+def mongo_db(monkeypatch):
+    import mongomock.collection
+    from mongomock_motor import AsyncMongoMockClient
+
+    original = mongomock.collection.Collection.find_one_and_update
+    monkeypatch.setattr(mongomock.collection.Collection, "find_one_and_update", find_one_and_update_dropping_id(original))
+    # tz_aware as in production, so stored datetimes compare against datetime.now(timezone.utc)
+    database = AsyncMongoMockClient(tz_aware=True)["test"]
+    monkeypatch.setattr(server, "db", database)
+    return database
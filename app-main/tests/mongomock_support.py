@@ -0,0 +1,15 @@
+"""mongomock workarounds shared by the test suite and benchmarks/bench_api.py."""
+
+
+def find_one_and_update_dropping_id(original):
+    # mongomock returns None from find_one_and_update when the projection excludes _id, although
+    # the update is applied; project without the exclusion and drop _id from the result instead
+    def find_one_and_update(self, filter, update, projection=None, *args, **kwargs):
+        exclude_id = bool(projection) and projection.get("_id") == 0
+        if exclude_id:
+            projection = {field: value for field, value in projection.items() if field != "_id"} or None
+        document = original(self, filter, update, projection, *args, **kwargs)
+        if document is not None and exclude_id:
+            document.pop("_id", None)
+        return document
+    return find_one_and_update
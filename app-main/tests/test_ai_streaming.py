@@ -0,0 +1,104 @@
+import asyncio
+import json
+from types import SimpleNamespace
+
+import pytest
+
+import server
+
+
+class FakeStream:
+    def __init__(self, deltas):
+        self.chunks = [SimpleNamespace(choices=[SimpleNamespace(delta=SimpleNamespace(content=delta))], usage=None) for delta in deltas]
+        self.chunks.append(SimpleNamespace(choices=[], usage=SimpleNamespace(total_tokens=12)))
+        self.closed = False
+
+    def __aiter__(self):
+        return self._iterate()
+
+    async def _iterate(self):
+        for chunk in self.chunks:
+            yield chunk
+
+    async def close(self):
+        self.closed = True
+
+
+class FakeCompletions:
+    def __init__(self, deltas):
+        self.deltas = deltas
+        self.streams = []
+
+    async def create(self, **kwargs):
+        assert kwargs["stream"] is True
+        self.streams.append(FakeStream(self.deltas))
+        return self.streams[-1]
+
+
+@pytest.fixture
+def completions(mongo_db, monkeypatch):
+    fake = FakeCompletions(["Seasoned ", "backend ", "engineer."])
+    monkeypatch.setattr(server, "openai_client", SimpleNamespace(chat=SimpleNamespace(completions=fake)))
+    monkeypatch.setattr(server, "llm_cache", server.LLMCache(8, 60))
+    monkeypatch.setattr(server, "llm_gateway", server.LLMGateway(4, 4, 100000, 0))
+    return fake
+
+
+def collect(events, limit=None):
+    async def run():
+        received = []
+        async for raw in events:
+            lines = dict(line.split(": ", 1) for line in raw.strip().split("\n"))
+            received.append((lines.get("event"), json.loads(lines["data"])))
+            if limit and len(received) == limit:
+                await events.aclose()
+                break
+        return received
+    return asyncio.run(run())
+
+
+def summary_events(**kwargs):
+    return server.llm_event_stream("prompt", server.SUMMARY_SYSTEM_MESSAGE, "summary", {"summary": "template"}, False, "u1", **kwargs)
+
+
+def test_deltas_then_done_with_the_full_text(completions):
+    assert collect(summary_events()) == [
+        (None, {"delta": "Seasoned "}),
+        (None, {"delta": "backend "}),
+        (None, {"delta": "engineer."}),
+        ("done", {"summary": "Seasoned backend engineer."}),
+    ]
+    assert completions.streams[0].closed
+    # The finished text is cached, so the next stream is a single delta with no upstream call
+    assert collect(summary_events()) == [(None, {"delta": "Seasoned backend engineer."}), ("done", {"summary": "Seasoned backend engineer."})]
+    assert len(completions.streams) == 1
+
+
+def test_disconnecting_closes_the_upstream_stream(completions):
+    assert collect(summary_events(), limit=1) == [(None, {"delta": "Seasoned "})]
+    assert completions.streams[0].closed
+    # A partial answer is never cached
+    assert server.llm_cache.stats()["entries"] == 0
+
+
+def test_rejections_arrive_as_an_error_event(completions, monkeypatch):
+    monkeypatch.setattr(server, "llm_gateway", server.LLMGateway(4, 0, 100000, 0))
+    [(event, data)] = collect(summary_events())
+    assert event == "error"
+    assert data["retry_after"] == 1
+
+
+def test_without_a_client_the_template_is_streamed(monkeypatch):
+    monkeypatch.setattr(server, "openai_client", None)
+    monkeypatch.setattr(server, "OPENAI_API_KEY", None)
+    assert collect(summary_events()) == [(None, {"delta": "template"}), ("done", {"summary": "template"})]
+
+
+def test_stream_endpoint_sends_event_stream_headers(monkeypatch):
+    monkeypatch.setattr(server, "openai_client", None)
+    monkeypatch.setattr(server, "OPENAI_API_KEY", None)
+    owner = server.User(email="owner@example.com", name="Owner")
+    response = asyncio.run(server.stream_generate_summary(server.AIRequest(prompt="", context={}), owner))
+    assert response.media_type == "text/event-stream"
+    assert response.headers["cache-control"] == "no-cache"
+    assert response.headers["x-accel-buffering"] == "no"
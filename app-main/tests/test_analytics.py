@@ -0,0 +1,93 @@
+import asyncio
+
+import pytest
+
+import server
+
+SUMMARY = "Backend engineer who builds data pipelines and the services around them."
+
+
+@pytest.fixture
+def owner(monkeypatch):
+    monkeypatch.setattr(server, "ANALYTICS_ENABLED", True)
+    return server.User(email="owner@example.com", name="Owner")
+
+
+def skill(name):
+    return server.SkillItem(name=name).model_dump()
+
+
+def create_resume(owner, **data):
+    resume = server.Resume(user_id=owner.id, title="CV", data=server.ResumeData(**data))
+    asyncio.run(server.insert_resume(resume))
+    return resume.id
+
+
+def flatten(document, prefix=""):
+    fields = {}
+    for name, value in document.items():
+        if isinstance(value, dict):
+            fields.update(flatten(value, f"{prefix}{name}."))
+        elif value:
+            fields[f"{prefix}{name}"] = value
+    return fields
+
+
+def counters(mongo_db):
+    async def read():
+        totals = await mongo_db.analytics.find_one({"id": "resumes"}, {"_id": 0, "id": 0, "updated_at": 0}) or {}
+        skills = await mongo_db.analytics_skills.find({"count": {"$gt": 0}}, {"_id": 0}).to_list(None)
+        return flatten(totals), {entry["key"]: entry["count"] for entry in skills}
+    return asyncio.run(read())
+
+
+def recount(mongo_db):
+    tally = ({}, {})
+    for doc in asyncio.run(mongo_db.resumes.find({}, {"_id": 0, "data": 1}).to_list(None)):
+        server.merge_analytics_delta(tally, server.analytics_counter_delta(None, server.resume_analytics(doc["data"])))
+    totals, skills = tally
+    return {field: value for field, value in totals.items() if value}, {key: count for key, (_, count) in skills.items() if count > 0}
+
+
+def assert_counters_match_recount(mongo_db):
+    assert counters(mongo_db) == recount(mongo_db)
+
+
+def test_counter_deltas_match_a_full_recount(mongo_db, owner):
+    first = create_resume(owner, summary=SUMMARY, skills=[skill("Python"), skill("python "), skill("Go")])
+    second = create_resume(owner, skills=[skill("Go")])
+    assert_counters_match_recount(mongo_db)
+    assert counters(mongo_db)[1] == {"python": 1, "go": 2}
+
+    full = server.ResumeData(summary="", skills=[server.SkillItem(name="Rust")]).model_dump()
+    asyncio.run(server.apply_resume_update(first, owner.id, None, {"data": full}))
+    assert_counters_match_recount(mongo_db)
+
+    asyncio.run(server.update_resume_section(second, "summary", server.SectionPatch(value=SUMMARY), None, owner))
+    added = asyncio.run(server.add_resume_section_item(second, "skills", {"name": "Rust"}, None, owner))
+    assert_counters_match_recount(mongo_db)
+    asyncio.run(server.update_resume_section_item(second, "skills", added["item"]["id"], {"name": "Kotlin"}, None, owner))
+    asyncio.run(server.delete_resume_section_item(first, "skills", full["skills"][0]["id"], None, owner))
+    assert_counters_match_recount(mongo_db)
+
+    asyncio.run(server.delete_resume(first, owner))
+    assert_counters_match_recount(mongo_db)
+    asyncio.run(server.delete_resume(second, owner))
+    assert counters(mongo_db) == ({}, {})
+
+
+def test_unchanged_contribution_leaves_counters_alone(mongo_db, owner):
+    resume_id = create_resume(owner, skills=[skill("Go")])
+    before = asyncio.run(mongo_db.analytics.find_one({"id": "resumes"}))
+    asyncio.run(server.apply_resume_update(resume_id, owner.id, None, {"title": "Renamed"}))
+    asyncio.run(server.update_resume_section(resume_id, "personal_info", server.SectionPatch(value={"location": "Berlin"}), None, owner))
+    assert asyncio.run(mongo_db.analytics.find_one({"id": "resumes"}))["updated_at"] == before["updated_at"]
+    assert_counters_match_recount(mongo_db)
+
+
+def test_recount_repairs_drifted_counters(mongo_db, owner):
+    create_resume(owner, summary=SUMMARY, skills=[skill("Go")])
+    asyncio.run(mongo_db.analytics.update_one({"id": "resumes"}, {"$inc": {"resumes": 5, "score_sum": 40}}))
+    asyncio.run(mongo_db.analytics_skills.insert_one({"key": "cobol", "name": "COBOL", "count": 3}))
+    asyncio.run(server.rebuild_analytics(recount=True))
+    assert_counters_match_recount(mongo_db)
@@ -0,0 +1,71 @@
+import asyncio
+import io
+import zipfile
+
+import pytest
+from fastapi import HTTPException
+
+import server
+
+
+@pytest.fixture
+def owner(mongo_db, monkeypatch):
+    # Markdown renders in-process, so these tests need neither the render pool nor a disk cache
+    monkeypatch.setattr(server, "render_cache", server.RenderCache(16, 1 << 20))
+    return server.User(email="owner@example.com", name="Owner")
+
+
+def create_resume(owner, title, summary):
+    resume = server.Resume(user_id=owner.id, title=title, data=server.ResumeData(summary=summary))
+    asyncio.run(server.insert_resume(resume))
+    return resume
+
+
+def export(owner, **request):
+    async def collect():
+        response = await server.export_resumes(server.ResumeExportRequest(format="md", **request), owner)
+        return response, b"".join([chunk async for chunk in response.body_iterator])
+    response, body = asyncio.run(collect())
+    assert response.media_type == "application/zip"
+    return zipfile.ZipFile(io.BytesIO(body))
+
+
+def test_export_streams_one_entry_per_resume(owner):
+    first = create_resume(owner, "My CV", "First summary")
+    second = create_resume(owner, "My CV", "Second summary")
+    archive = export(owner)
+    names = archive.namelist()
+    # Whichever colliding title is rendered second gets its resume id appended
+    assert len(names) == 2 and "My_CV.md" in names
+    assert set(names) - {"My_CV.md"} <= {f"My_CV_{first.id[:8]}.md", f"My_CV_{second.id[:8]}.md"}
+    summaries = {archive.read(name).decode() for name in names}
+    assert any("First summary" in text for text in summaries) and any("Second summary" in text for text in summaries)
+
+
+def test_export_only_the_requested_resumes(owner):
+    wanted = create_resume(owner, "Wanted", "Keep")
+    create_resume(owner, "Other", "Skip")
+    archive = export(owner, resume_ids=[wanted.id])
+    assert archive.namelist() == ["Wanted.md"]
+
+
+def test_export_without_resumes_is_404(owner):
+    with pytest.raises(HTTPException) as error:
+        asyncio.run(server.export_resumes(server.ResumeExportRequest(format="md"), owner))
+    assert error.value.status_code == 404
+
+
+def test_bulk_renders_wait_out_a_busy_pool(monkeypatch):
+    monkeypatch.setattr(server, "POOL_RETRY_AFTER_SECONDS", 0)
+    attempts = []
+
+    async def render_resume_export(resume, export_format):
+        attempts.append(export_format)
+        if len(attempts) < 3:
+            raise server.BoundedPool.busy_error()
+        return b"%PDF"
+
+    monkeypatch.setattr(server, "render_resume_export", render_resume_export)
+    resume = server.Resume(user_id="u1", title="CV")
+    assert asyncio.run(server.render_for_export(resume, "pdf")) == (resume, b"%PDF")
+    assert len(attempts) == 3
@@ -0,0 +1,66 @@
+import asyncio
+import json
+from datetime import datetime, timezone
+
+import mongomock.collection
+import pytest
+
+import server
+
+
+@pytest.fixture
+def migration(mongo_db, monkeypatch):
+    monkeypatch.setattr(server, "DATE_MIGRATION_BATCH_SIZE", 2)
+    monkeypatch.setattr(server, "date_migration_status", {"state": "idle", "migrated": {}, "skipped": 0})
+    return server.date_migration_status
+
+
+def test_parse_legacy_date_assumes_utc():
+    assert server.parse_legacy_date("2025-03-01T12:30:00") == datetime(2025, 3, 1, 12, 30, tzinfo=timezone.utc)
+    assert server.parse_legacy_date("2025-03-01T12:30:00+02:00").utcoffset().total_seconds() == 7200
+    with pytest.raises(ValueError):
+        server.parse_legacy_date("last tuesday")
+
+
+def test_string_dates_become_bson_dates(migration, mongo_db):
+    native = datetime(2025, 1, 2, tzinfo=timezone.utc)
+    asyncio.run(mongo_db.resumes.insert_many([
+        {"id": f"r{n}", "created_at": f"2025-01-0{n + 1}T00:00:00", "updated_at": native} for n in range(5)
+    ] + [{"id": "broken", "created_at": "yesterday", "updated_at": "2025-02-01T00:00:00+00:00"}]))
+    asyncio.run(mongo_db.users.insert_one({"id": "u1", "created_at": "2025-01-01T00:00:00"}))
+    asyncio.run(server.migrate_string_dates())
+    assert migration == {"state": "done", "migrated": {"users": 1, "resumes": 6}, "skipped": 1}
+    resumes = {doc["id"]: doc for doc in asyncio.run(mongo_db.resumes.find({}, {"_id": 0}).to_list(None))}
+    assert resumes["r3"]["created_at"] == datetime(2025, 1, 4, tzinfo=timezone.utc)
+    assert resumes["r3"]["updated_at"] == native
+    # The parseable field of a half-broken document is still converted
+    assert resumes["broken"]["created_at"] == "yesterday"
+    assert resumes["broken"]["updated_at"] == datetime(2025, 2, 1, tzinfo=timezone.utc)
+
+
+def test_writes_landing_mid_batch_are_left_alone(migration, mongo_db, monkeypatch):
+    asyncio.run(mongo_db.resumes.insert_one({"id": "r1", "created_at": "2025-01-01T00:00:00", "updated_at": "2025-01-01T00:00:00"}))
+    saved_at = datetime(2026, 5, 5, tzinfo=timezone.utc)
+    original = mongomock.collection.Collection.bulk_write
+
+    def bulk_write_after_a_save(self, requests, **kwargs):
+        # A save between the batch read and its write already stored a native date
+        self.update_one({"id": "r1"}, {"$set": {"updated_at": saved_at}})
+        return original(self, requests, **kwargs)
+
+    monkeypatch.setattr(mongomock.collection.Collection, "bulk_write", bulk_write_after_a_save)
+    asyncio.run(server.migrate_string_dates())
+    doc = asyncio.run(mongo_db.resumes.find_one({"id": "r1"}))
+    assert doc["updated_at"] == saved_at
+    assert doc["created_at"] == "2025-01-01T00:00:00"
+    assert migration["migrated"]["resumes"] == 0
+
+
+def test_dates_serialize_as_iso_strings(mongo_db):
+    owner = server.User(email="owner@example.com", name="Owner")
+    resume = server.Resume(user_id=owner.id, title="CV", created_at=datetime(2025, 1, 1, tzinfo=timezone.utc))
+    asyncio.run(server.insert_resume(resume))
+    stored = asyncio.run(mongo_db.resumes.find_one({"id": resume.id}))
+    assert isinstance(stored["created_at"], datetime)
+    [listed] = json.loads(asyncio.run(server.get_resumes(current_user=owner)).body)
+    assert listed["created_at"] == "2025-01-01T00:00:00Z"
@@ -0,0 +1,74 @@
+import asyncio
+import io
+from types import SimpleNamespace
+from typing import get_args
+
+import docx
+import pytest
+
+import server
+
+
+def resume_data():
+    return server.ResumeData(
+        personal_info=server.PersonalInfo(full_name="Ada <Lovelace>", email="ada@example.com", location="London"),
+        summary="Wrote *the* first program",
+        experiences=[server.ExperienceItem(type="work", title="Analyst", organization="Babbage & Co", description="Notes on the engine",
+                                           start_date="1842", end_date="1843")],
+        skills=[server.SkillItem(name="Mathematics"), server.SkillItem(name="Poetry")],
+    )
+
+
+def test_every_format_has_a_backend():
+    assert set(server.EXPORT_FORMATS) == set(get_args(server.ExportFormat))
+    resume = server.Resume(user_id="u1", title="My CV")
+    assert [server.export_filename(resume, export_format) for export_format in ("pdf", "docx", "html", "md")] == [
+        "My_CV.pdf", "My_CV.docx", "My_CV.html", "My_CV.md"]
+
+
+def test_markdown_escapes_text_and_keeps_entries_together():
+    content = server.generate_markdown(server.lower_resume(resume_data()), "modern").decode()
+    assert content == (
+        "# Ada \\<Lovelace\\>\n\n"
+        "ada@example.com | London\n\n"
+        "## PROFESSIONAL SUMMARY\n\n"
+        "Wrote \\*the\\* first program\n\n"
+        "## EXPERIENCE\n\n"
+        "**Analyst** - Babbage & Co  \n*1842 - 1843*  \nNotes on the engine\n\n"
+        "## SKILLS\n\n"
+        "Mathematics, Poetry\n"
+    )
+
+
+def test_html_escapes_text_and_names_the_template():
+    content = server.generate_html(server.lower_resume(resume_data()), "retired").decode()
+    assert '<body class="template-modern">' in content
+    assert "<h1>Ada &lt;Lovelace&gt;</h1>" in content
+    assert '<p class="body"><strong>Analyst</strong> - Babbage &amp; Co</p>' in content
+    assert '<p class="meta"><em>1842 - 1843</em></p>' in content
+
+
+def test_docx_follows_the_template_section_order():
+    content = server.generate_docx(server.lower_resume(resume_data()), "minimal")
+    paragraphs = docx.Document(io.BytesIO(content)).paragraphs
+    headings = [paragraph.text for paragraph in paragraphs if paragraph.style.name.startswith("Heading")]
+    assert headings == ["PROFESSIONAL SUMMARY", "SKILLS", "EXPERIENCE"]
+    [title] = [paragraph for paragraph in paragraphs if paragraph.text == "Analyst - Babbage & Co"]
+    assert [(run.text, run.bold) for run in title.runs] == [("Analyst", True), (" - Babbage & Co", None)]
+
+
+@pytest.mark.parametrize("export_format", ["html", "md"])
+def test_text_formats_render_in_process_from_one_lowering(export_format, monkeypatch):
+    async def run(*args):
+        raise AssertionError("text formats never use the render pool")
+
+    monkeypatch.setattr(server, "render_pool", SimpleNamespace(run=run))
+    monkeypatch.setattr(server, "render_cache", server.RenderCache(16, 1 << 20))
+    monkeypatch.setattr(server, "export_document_cache", server.ExportDocumentCache(4))
+    resume = server.Resume(user_id="u1", title="CV", data=resume_data())
+    first = asyncio.run(server.render_resume_export(resume, export_format))
+    other = "md" if export_format == "html" else "html"
+    asyncio.run(server.render_resume_export(resume, other))
+    assert b"Mathematics, Poetry" in first
+    # The second format reused the document lowered for the first
+    assert server.export_document_cache.stats() == {"entries": 1, "hits": 1, "misses": 1}
@@ -0,0 +1,54 @@
+import os
+
+import pytest
+
+import server
+
+ETAG = '"abc123"'
+
+
+@pytest.mark.parametrize("if_none_match, matches", [
+    (None, False),
+    ("", False),
+    ('"abc123"', True),
+    ('W/"abc123"', True),
+    ('"other", "abc123"', True),
+    ('"other",W/"abc123"', True),
+    ("*", True),
+    ('"other"', False),
+    ("abc123", False),
+    ('"abc1234"', False),
+])
+def test_etag_matches(if_none_match, matches):
+    assert server.etag_matches(if_none_match, ETAG) is matches
+
+
+def test_render_cache_key_tracks_content_format_and_template():
+    resume = server.Resume(user_id="u1", title="CV", data=server.ResumeData(summary="Engineer"))
+    key = server.render_cache_key(resume, "pdf")
+    assert server.render_cache_key(resume.model_copy(update={"title": "Renamed"}), "pdf") == key
+    assert server.render_cache_key(resume, "docx") != key
+    assert server.render_cache_key(resume.model_copy(update={"template": "classic"}), "pdf") != key
+    edited = resume.model_copy(update={"data": server.ResumeData(summary="Engineer.")})
+    assert server.render_cache_key(edited, "pdf") != key
+
+
+def test_render_cache_disk_tier_evicts_least_recently_used(tmp_path):
+    cache = server.RenderCache(0, 0, str(tmp_path), directory_max_bytes=350)
+    for index, key in enumerate("abc"):
+        cache.put(key, bytes(100))
+        os.utime(tmp_path / f"{key}.render", (index, index))
+    # Reading "a" makes it the most recently used, so "b" goes first
+    assert cache.get("a") == bytes(100)
+    cache.put("d", bytes(100))
+    assert sorted(path.stem for path in tmp_path.glob("*.render")) == ["a", "c", "d"]
+    assert cache.get("b") is None
+    assert cache.stats()["disk_evictions"] == 1
+
+
+def test_render_cache_disk_sweep_counts_other_workers_files(tmp_path):
+    (tmp_path / "other.render").write_bytes(bytes(250))
+    os.utime(tmp_path / "other.render", (0, 0))
+    cache = server.RenderCache(0, 0, str(tmp_path), directory_max_bytes=300)
+    cache.put("mine", bytes(100))
+    assert [path.stem for path in tmp_path.glob("*.render")] == ["mine"]
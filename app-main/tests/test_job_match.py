@@ -0,0 +1,43 @@
+import numpy as np
+
+import server
+
+
+def job_counts(text):
+    counts = {}
+    server.count_match_terms(text, counts, {})
+    return counts
+
+
+def test_ranking_ignores_terms_from_other_cached_resumes():
+    job = job_counts("Senior Python engineer building Kafka pipelines")
+    cache = server.TermVectorCache(10)
+    backend = cache.put("a", 1, job_counts("Python engineer, Kafka streaming pipelines"))
+    designer = cache.put("b", 1, job_counts("Figma illustrator and brand designer"))
+    before, present_before, keywords_before = server.rank_against_job([backend, designer], job)
+
+    for index in range(5):
+        cache.put(f"noise-{index}", 1, job_counts(f"unrelated{index} words{index} elsewhere{index}"))
+    after, present_after, keywords_after = server.rank_against_job([backend, designer], job)
+
+    assert np.allclose(before, after)
+    assert (present_before == present_after).all()
+    assert keywords_before == keywords_after
+    assert after[0] > 0 and after[1] == 0
+
+
+def test_evicted_resumes_release_their_terms():
+    cache = server.TermVectorCache(2)
+    for index in range(10):
+        cache.put(f"r{index}", 1, job_counts(f"term{index}a term{index}b"))
+    assert cache.stats()["entries"] == 2
+    assert cache.stats()["terms"] == 4
+
+
+def test_job_terms_no_resume_uses_still_weigh_on_the_job():
+    job = job_counts("python rust")
+    partial = (np.array(["python"]), np.array([1.0]))
+    full = (np.array(["python", "rust"]), np.array([1.0, 1.0]))
+    scores, present, _ = server.rank_against_job([partial, full], job)
+    assert 0 < scores[0] < scores[1]
+    assert present[0].sum() == 1 and present[1].all()
@@ -0,0 +1,44 @@
+import asyncio
+from datetime import datetime, timedelta, timezone
+
+from bson import Binary
+
+import server
+
+
+def claimed_import(mongo_db):
+    async def enqueue_and_claim():
+        job = await server.enqueue_job("import_resume", "u1", {"filename": "cv.pdf", "extension": ".pdf", "content": Binary(b"%PDF")})
+        return await server.claim_job("worker-1")
+    return asyncio.run(enqueue_and_claim())
+
+
+def stored(mongo_db, job_id):
+    return asyncio.run(mongo_db.jobs.find_one({"id": job_id}, {"_id": 0}))
+
+
+def test_failed_jobs_drop_their_upload_and_expire(mongo_db):
+    job = claimed_import(mongo_db)
+    asyncio.run(server.finish_job(job, "worker-1", {"status": "failed", "error": "Could not read this file"}))
+    finished = stored(mongo_db, job["id"])
+    assert finished["status"] == "failed"
+    assert "content" not in finished["payload"]
+    assert "lease_expires_at" not in finished
+    expires_at = finished["expires_at"].replace(tzinfo=timezone.utc)
+    expected = datetime.now(timezone.utc) + timedelta(seconds=server.JOB_RETENTION_SECONDS)
+    assert abs((expires_at - expected).total_seconds()) < 5
+
+
+def test_retried_jobs_keep_their_upload(mongo_db):
+    job = claimed_import(mongo_db)
+    asyncio.run(server.finish_job(job, "worker-1", {"status": "queued", "error": "timeout", "run_after": datetime.now(timezone.utc)}))
+    queued = stored(mongo_db, job["id"])
+    assert bytes(queued["payload"]["content"]) == b"%PDF"
+    assert "expires_at" not in queued
+
+
+def test_clients_cannot_raise_job_priority(mongo_db):
+    user = server.User(email="u@example.com", name="U")
+    for requested, expected in ((1000, 0), (-3, -3), (-1000, server.JOB_MIN_USER_PRIORITY)):
+        job = asyncio.run(server.create_job(server.JobCreate(type="generate_summary", priority=requested), user))
+        assert job["priority"] == expected
@@ -0,0 +1,109 @@
+import asyncio
+
+import pytest
+
+import server
+
+
+@pytest.fixture
+def background_loops(monkeypatch):
+    """Swap the lifespan's background loops for ones that record whether they ran until stopped."""
+    runs = []
+
+    async def loop(stop_event):
+        run = {"stopped_at_start": stop_event.is_set(), "stopped": False}
+        runs.append(run)
+        await stop_event.wait()
+        run["stopped"] = True
+
+    monkeypatch.setattr(server, "connect_mongo", lambda: None)
+    monkeypatch.setattr(server, "client", None)
+    monkeypatch.setattr(server, "MONGO_ENSURE_INDEXES", False)
+    monkeypatch.setattr(server, "MONGO_MIGRATE_DATES", False)
+    monkeypatch.setattr(server, "JOB_WORKER_IN_PROCESS", True)
+    monkeypatch.setattr(server, "RATE_LIMIT_ENABLED", True)
+    monkeypatch.setattr(server, "run_job_worker", lambda worker_id, concurrency, stop_event: loop(stop_event))
+    monkeypatch.setattr(server.rate_limiter, "run", lambda interval, stop_event: loop(stop_event))
+    return runs
+
+
+def test_background_loops_run_in_every_lifespan(background_loops):
+    async def serve_once():
+        earlier = len(background_loops)
+        async with server.lifespan(server.app):
+            await asyncio.sleep(0)
+            started = background_loops[earlier:]
+            assert len(started) == 2
+            assert not any(run["stopped"] for run in started)
+
+    asyncio.run(serve_once())
+    asyncio.run(serve_once())
+    assert len(background_loops) == 4
+    assert not any(run["stopped_at_start"] for run in background_loops)
+    assert all(run["stopped"] for run in background_loops)
+
+
+def test_date_migration_is_held_and_stopped_on_shutdown(background_loops, monkeypatch):
+    migration = {}
+
+    async def migrate_string_dates():
+        migration["started"] = True
+        try:
+            await asyncio.sleep(60)
+        except asyncio.CancelledError:
+            migration["cancelled"] = True
+            raise
+
+    monkeypatch.setattr(server, "MONGO_MIGRATE_DATES", True)
+    monkeypatch.setattr(server, "migrate_string_dates", migrate_string_dates)
+
+    async def serve_once():
+        async with server.lifespan(server.app):
+            await asyncio.sleep(0)
+
+    asyncio.run(serve_once())
+    assert migration == {"started": True, "cancelled": True}
+
+
+@pytest.fixture
+def report(monkeypatch):
+    fresh = {"module_import_ms": 50.0, "lifespan_ms": None, "first_request_ms": None, "budget_ms": None, "lazy_imports": {}}
+    monkeypatch.setattr(server, "startup_report", fresh)
+    return fresh
+
+
+def test_lazy_modules_import_on_first_use(report):
+    module = server.LazyModule("colorsys")
+    assert report["lazy_imports"] == {}
+    assert module.rgb_to_hsv(1, 0, 0) == (0, 1, 1)
+    assert list(report["lazy_imports"]) == ["colorsys"]
+    assert module.load() is module.load()
+
+
+def test_prewarm_loads_the_named_groups(report, monkeypatch, caplog):
+    monkeypatch.setattr(server, "LAZY_MODULES", {"color": [server.LazyModule("colorsys")], "text": [server.LazyModule("textwrap")]})
+    server.prewarm_imports("color, missing")
+    assert list(report["lazy_imports"]) == ["colorsys"]
+    assert "unknown module group 'missing'" in caplog.text
+    server.prewarm_imports("all")
+    assert set(report["lazy_imports"]) == {"colorsys", "textwrap"}
+
+
+def test_startup_over_budget_is_reported(background_loops, report, monkeypatch, caplog):
+    monkeypatch.setattr(server, "PREWARM_IMPORTS", "color")
+    monkeypatch.setattr(server, "LAZY_MODULES", {"color": [server.LazyModule("colorsys")]})
+    monkeypatch.setattr(server, "STARTUP_BUDGET_MS", 10)
+
+    async def serve_once():
+        async with server.lifespan(server.app):
+            pass
+
+    asyncio.run(serve_once())
+    assert report["lifespan_ms"] is not None
+    assert list(report["lazy_imports"]) == ["colorsys"]
+    assert "over the 10 ms budget" in caplog.text
+    # Within budget nothing is logged
+    caplog.clear()
+    monkeypatch.setattr(server, "STARTUP_BUDGET_MS", 60000)
+    asyncio.run(serve_once())
+    assert "budget" not in caplog.text
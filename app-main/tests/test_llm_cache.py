@@ -0,0 +1,41 @@
+import asyncio
+from datetime import datetime, timedelta, timezone
+
+import server
+
+
+def test_memory_entries_expire(mongo_db, monkeypatch):
+    clock = [1000.0]
+    monkeypatch.setattr(server.time, "monotonic", lambda: clock[0])
+    cache = server.LLMCache(8, 60)
+    asyncio.run(cache.put("k", "completion"))
+    asyncio.run(mongo_db.llm_cache.delete_many({}))
+    clock[0] += 59
+    assert asyncio.run(cache.get("k")) == "completion"
+    clock[0] += 2
+    assert asyncio.run(cache.get("k")) is None
+    assert cache.stats()["entries"] == 0
+    assert (cache.memory_hits, cache.misses) == (1, 1)
+
+
+def test_expired_documents_are_not_served(mongo_db):
+    cache = server.LLMCache(8, 60)
+    stale = datetime.now(timezone.utc) - timedelta(seconds=61)
+    asyncio.run(mongo_db.llm_cache.insert_one({"key": "k", "content": "old", "created_at": stale}))
+    assert asyncio.run(cache.get("k")) is None
+    assert cache.stats()["entries"] == 0
+
+
+def test_documents_stay_in_memory_only_for_their_remaining_lifetime(mongo_db, monkeypatch):
+    clock = [1000.0]
+    monkeypatch.setattr(server.time, "monotonic", lambda: clock[0])
+    cache = server.LLMCache(8, 60)
+    stored = datetime.now(timezone.utc) - timedelta(seconds=50)
+    asyncio.run(mongo_db.llm_cache.insert_one({"key": "k", "content": "completion", "created_at": stored}))
+    assert asyncio.run(cache.get("k")) == "completion"
+    asyncio.run(mongo_db.llm_cache.delete_many({}))
+    clock[0] += 5
+    assert asyncio.run(cache.get("k")) == "completion"
+    clock[0] += 6
+    assert asyncio.run(cache.get("k")) is None
+    assert (cache.memory_hits, cache.mongo_hits, cache.misses) == (1, 1, 1)
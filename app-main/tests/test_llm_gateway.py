@@ -0,0 +1,138 @@
+import asyncio
+import contextlib
+from types import SimpleNamespace
+
+import httpx
+import openai
+import pytest
+
+import server
+
+
+class FakeCompletions:
+    """Stands in for openai_client.chat.completions: each call waits for `release`, then answers."""
+
+    def __init__(self):
+        self.calls = 0
+        self.release = asyncio.Event()
+
+    async def create(self, **kwargs):
+        self.calls += 1
+        answer = f"answer {self.calls}"
+        await self.release.wait()
+        return SimpleNamespace(choices=[SimpleNamespace(message=SimpleNamespace(content=answer))], usage=None)
+
+
+@pytest.fixture
+def completions(mongo_db, monkeypatch):
+    fake = FakeCompletions()
+    monkeypatch.setattr(server, "openai_client", SimpleNamespace(chat=SimpleNamespace(completions=fake)))
+    monkeypatch.setattr(server, "llm_cache", server.LLMCache(8, 60))
+    monkeypatch.setattr(server, "llm_gateway", server.LLMGateway(4, 4, 100000, 0))
+    return fake
+
+
+def test_identical_prompts_share_one_call(completions):
+    async def scenario():
+        calls = [asyncio.ensure_future(server.call_llm("prompt", user_id=f"u{n}")) for n in range(3)]
+        await asyncio.sleep(0.01)
+        completions.release.set()
+        return await asyncio.gather(*calls)
+
+    assert asyncio.run(scenario()) == ["answer 1"] * 3
+    assert completions.calls == 1
+    assert server.llm_gateway.coalesced == 2
+
+
+def test_regenerate_does_not_join_a_call_in_flight(completions):
+    async def scenario():
+        plain = asyncio.ensure_future(server.call_llm("prompt"))
+        await asyncio.sleep(0.01)
+        regenerated = asyncio.ensure_future(server.call_llm("prompt", bypass_cache=True))
+        await asyncio.sleep(0.01)
+        completions.release.set()
+        return await asyncio.gather(plain, regenerated)
+
+    assert asyncio.run(scenario()) == ["answer 1", "answer 2"]
+    assert completions.calls == 2
+    assert server.llm_gateway.coalesced == 0
+
+
+def rejection(gateway, user_id, tokens=10):
+    async def admit():
+        async with gateway.admit(user_id, tokens):
+            pass
+
+    with pytest.raises(server.HTTPException) as error:
+        asyncio.run(admit())
+    assert error.value.status_code == 429
+    return error.value
+
+
+def test_concurrency_caps_apply_globally_and_per_user():
+    gateway = server.LLMGateway(3, 2, 100000, 0)
+
+    async def scenario():
+        async with contextlib.AsyncExitStack() as held:
+            for user_id in ("u1", "u1"):
+                await held.enter_async_context(gateway.admit(user_id, 10))
+            with pytest.raises(server.HTTPException) as per_user:
+                await held.enter_async_context(gateway.admit("u1", 10))
+            await held.enter_async_context(gateway.admit("u2", 10))
+            with pytest.raises(server.HTTPException) as overall:
+                await held.enter_async_context(gateway.admit("u3", 10))
+            assert gateway.stats()["in_flight"] == 3
+            return per_user.value, overall.value
+
+    per_user, overall = asyncio.run(scenario())
+    assert "for this user" in per_user.detail
+    assert overall.detail == "AI service is busy (too many concurrent requests), please retry shortly"
+    assert gateway.rejected == 2
+    # Every slot is given back once the calls finish
+    assert gateway.stats()["in_flight"] == 0 and gateway.stats()["users_in_flight"] == 0
+
+
+def test_token_budget_refills_and_returns_unused_estimates(monkeypatch):
+    clock = [1000.0]
+    monkeypatch.setattr(server.time, "monotonic", lambda: clock[0])
+    gateway = server.LLMGateway(10, 10, 600, 0)
+
+    async def use(estimated, actual):
+        async with gateway.admit(None, estimated) as usage:
+            usage["tokens"] = actual
+
+    asyncio.run(use(500, 100))
+    # 400 of the 500 estimated tokens came back once the real usage was known
+    assert gateway.stats()["tokens_available"] == 500
+    asyncio.run(use(500, 500))
+    error = rejection(gateway, None, 300)
+    # 300 tokens short at 600 per minute is 30 seconds
+    assert error.headers["Retry-After"] == "30"
+    clock[0] += 30
+    asyncio.run(use(300, 300))
+
+
+def status_error(status_code):
+    request = httpx.Request("POST", "https://api.openai.com/v1/chat/completions")
+    return openai.APIStatusError("failed", response=httpx.Response(status_code, request=request), body=None)
+
+
+def test_retries_only_rate_limits_and_server_errors(monkeypatch):
+    monkeypatch.setattr(server, "LLM_RETRY_BASE_DELAY", 0)
+    gateway = server.LLMGateway(10, 10, 100000, 2)
+    failures = [status_error(429), status_error(503)]
+
+    async def flaky():
+        if failures:
+            raise failures.pop(0)
+        return "ok"
+
+    assert asyncio.run(gateway.with_retries(flaky)) == "ok"
+    assert gateway.retries == 2
+
+    async def bad_request():
+        raise status_error(400)
+
+    with pytest.raises(openai.APIStatusError):
+        asyncio.run(gateway.with_retries(bad_request))
+    assert gateway.retries == 2
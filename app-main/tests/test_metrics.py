@@ -0,0 +1,74 @@
+import asyncio
+from types import SimpleNamespace
+
+import pytest
+from fastapi.testclient import TestClient
+from prometheus_client import REGISTRY
+
+import server
+
+
+def sample(name, **labels):
+    return REGISTRY.get_sample_value(name, labels) or 0
+
+
+def test_requests_are_timed_by_route_template():
+    labels = {"method": "GET", "route": "/api/resumes/{resume_id}", "status": "403"}
+    before = sample("http_request_duration_seconds_count", **labels)
+    client = TestClient(server.app)
+    # No credentials, so the request stops at authentication before touching Mongo
+    for resume_id in ("first", "second"):
+        assert client.get(f"/api/resumes/{resume_id}").status_code == 403
+    assert sample("http_request_duration_seconds_count", **labels) == before + 2
+    assert sample("http_request_duration_seconds_count", method="GET", route="/api/resumes/first", status="403") == 0
+    assert sample("http_requests_in_flight") == 0
+
+
+def test_metrics_endpoint_exposes_the_registry():
+    response = TestClient(server.app).get("/metrics")
+    assert response.status_code == 200
+    assert response.headers["content-type"].startswith("text/plain")
+    for name in ("http_request_duration_seconds", "mongo_command_duration_seconds", "pdf_render_duration_seconds", "llm_tokens_total"):
+        assert f"# TYPE {name}" in response.text
+
+
+def test_mongo_command_events_feed_the_histograms():
+    listener = server.MongoCommandMetrics()
+    count = sample("mongo_command_duration_seconds_count", command="distinct")
+    total = sample("mongo_command_duration_seconds_sum", command="distinct")
+    failures = sample("mongo_command_failures_total", command="distinct")
+    listener.succeeded(SimpleNamespace(command_name="distinct", duration_micros=2500))
+    listener.failed(SimpleNamespace(command_name="distinct", duration_micros=500))
+    assert sample("mongo_command_duration_seconds_count", command="distinct") == count + 2
+    assert sample("mongo_command_duration_seconds_sum", command="distinct") == pytest.approx(total + 0.003)
+    assert sample("mongo_command_failures_total", command="distinct") == failures + 1
+
+
+def test_pdf_renders_are_observed_on_cache_misses_only(monkeypatch):
+    async def run(backend, *args):
+        return backend(*args)
+
+    monkeypatch.setattr(server, "render_pool", SimpleNamespace(run=run))
+    monkeypatch.setattr(server, "render_cache", server.RenderCache(16, 1 << 20))
+    before = sample("pdf_render_duration_seconds_count", template="classic")
+    sizes = sample("pdf_render_size_bytes_count", template="classic")
+    resume = server.Resume(user_id="u1", title="CV", template="classic", data=server.ResumeData(summary="Backend engineer"))
+    for _ in range(2):
+        asyncio.run(server.render_resume_export(resume, "pdf"))
+    assert sample("pdf_render_duration_seconds_count", template="classic") == before + 1
+    assert sample("pdf_render_size_bytes_count", template="classic") == sizes + 1
+
+
+def test_completion_tokens_are_counted(mongo_db, monkeypatch):
+    async def create(**kwargs):
+        return SimpleNamespace(choices=[SimpleNamespace(message=SimpleNamespace(content="answer"))], usage=SimpleNamespace(total_tokens=42))
+
+    monkeypatch.setattr(server, "openai_client", SimpleNamespace(chat=SimpleNamespace(completions=SimpleNamespace(create=create))))
+    monkeypatch.setattr(server, "llm_cache", server.LLMCache(8, 60))
+    monkeypatch.setattr(server, "llm_gateway", server.LLMGateway(4, 4, 100000, 0))
+    before = sample("llm_tokens_total", mode="complete")
+    assert asyncio.run(server.call_llm("prompt")) == "answer"
+    assert sample("llm_tokens_total", mode="complete") == before + 42
+    # A cached answer reports no usage
+    asyncio.run(server.call_llm("prompt"))
+    assert sample("llm_tokens_total", mode="complete") == before + 42
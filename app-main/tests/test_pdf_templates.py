@@ -0,0 +1,67 @@
+import pytest
+from fastapi import HTTPException
+
+import server
+
+
+@pytest.fixture
+def templates(monkeypatch):
+    # Registering a template mutates module state, so each test gets its own copy
+    monkeypatch.setattr(server, "EXPORT_TEMPLATES", dict(server.EXPORT_TEMPLATES))
+    monkeypatch.setattr(server, "PDF_TEMPLATES", {})
+    return server.EXPORT_TEMPLATES
+
+
+def document():
+    return server.lower_resume(server.ResumeData(
+        personal_info=server.PersonalInfo(full_name="Ada Lovelace", email="ada@example.com"),
+        summary="Analytical engine programmer",
+        experiences=[server.ExperienceItem(type="work", title="Analyst", organization="Babbage & Co", description="Wrote the first program",
+                                           start_date="1842", end_date="1843")],
+        skills=[server.SkillItem(name="Mathematics")],
+    ))
+
+
+def test_unknown_templates_fall_back_to_the_default(templates):
+    assert server.pdf_template_name("classic") == "classic"
+    assert server.pdf_template_name("retired") == server.DEFAULT_PDF_TEMPLATE
+    assert server.pdf_template_name(None) == server.DEFAULT_PDF_TEMPLATE
+    assert server.template_section_order("retired") == list(server.SECTION_TITLES)
+
+
+def test_pdf_templates_are_built_once_per_process(templates):
+    built = []
+
+    def build(name, section_order):
+        built.append(name)
+        return server.PdfTemplate(name, {}, section_order)
+
+    server.register_template("plain", "Plain", ["skills"], build)
+    first = server.get_pdf_template("plain")
+    assert server.get_pdf_template("plain") is first
+    assert built == ["plain"]
+    # Registering under the same name again drops the copy built for the old definition
+    server.register_template("plain", "Plain", ["summary"], build)
+    assert server.get_pdf_template("plain").section_order == ["summary"]
+    assert built == ["plain", "plain"]
+
+
+def test_unknown_template_names_are_rejected(templates):
+    server.validate_template_name(None)
+    server.validate_template_name("minimal")
+    with pytest.raises(HTTPException) as error:
+        server.validate_template_name("retired")
+    assert error.value.status_code == 422
+
+
+def test_templates_order_sections_differently(templates):
+    titles = {name: [title for title, _ in document().ordered_sections(server.template_section_order(name))] for name in templates}
+    assert titles["modern"] == titles["classic"] == ["PROFESSIONAL SUMMARY", "EXPERIENCE", "SKILLS"]
+    assert titles["minimal"] == ["PROFESSIONAL SUMMARY", "SKILLS", "EXPERIENCE"]
+
+
+@pytest.mark.parametrize("name", ["modern", "classic", "minimal"])
+def test_generate_pdf_is_deterministic(templates, name):
+    content = server.generate_pdf(document(), name)
+    assert content.startswith(b"%PDF")
+    assert server.generate_pdf(document(), name) == content
@@ -0,0 +1,76 @@
+import asyncio
+import multiprocessing
+import os
+import threading
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+
+import pytest
+from fastapi import HTTPException
+
+import server
+
+
+@pytest.fixture
+def pool():
+    pool = server.BoundedPool("test", lambda workers: ThreadPoolExecutor(max_workers=workers), 1, 2)
+    yield pool
+    pool.shutdown()
+
+
+async def settled(pool):
+    for _ in range(100):
+        if not pool.pending:
+            return
+        await asyncio.sleep(0.01)
+
+
+def test_cancelled_callers_keep_running_jobs_pending(pool):
+    release = threading.Event()
+
+    async def scenario():
+        task = asyncio.create_task(pool.run(release.wait, 5))
+        await asyncio.sleep(0.05)
+        task.cancel()
+        await asyncio.gather(task, return_exceptions=True)
+        # The job still occupies the worker, so it still counts against max_pending
+        assert pool.pending == 1
+        release.set()
+        await settled(pool)
+
+    asyncio.run(scenario())
+    assert (pool.pending, pool.completed) == (0, 1)
+
+
+def test_rejects_once_full_and_recovers(pool):
+    release = threading.Event()
+
+    async def scenario():
+        jobs = [asyncio.create_task(pool.run(release.wait, 5)) for _ in range(2)]
+        await asyncio.sleep(0.05)
+        with pytest.raises(HTTPException) as error:
+            await pool.run(sum, [1, 2])
+        assert error.value.status_code == 503
+        release.set()
+        await asyncio.gather(*jobs)
+        await settled(pool)
+        assert await pool.run(sum, [1, 2]) == 3
+
+    asyncio.run(scenario())
+    assert (pool.pending, pool.completed, pool.rejected) == (0, 3, 1)
+
+
+def test_broken_process_pool_is_replaced():
+    pool = server.BoundedPool("test", lambda workers: ProcessPoolExecutor(max_workers=workers, mp_context=multiprocessing.get_context("spawn")), 1, 2)
+
+    async def scenario():
+        # A worker dying outright (as on OOM or a segfault) breaks the whole executor
+        with pytest.raises(HTTPException) as error:
+            await pool.run(os._exit, 1)
+        assert error.value.status_code == 503
+        return await pool.run(sum, [1, 2])
+
+    try:
+        assert asyncio.run(scenario()) == 3
+    finally:
+        pool.shutdown()
+    assert pool.broken == 1
@@ -0,0 +1,95 @@
+import asyncio
+
+import pytest
+
+import server
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    now = [1000.0]
+    monkeypatch.setattr(server.time, "monotonic", lambda: now[0])
+    return now
+
+
+def test_acquire_spends_until_the_bucket_is_empty(clock):
+    limiter = server.RateLimiter(capacity=10, refill_per_second=2, max_keys=100)
+    assert limiter.acquire("ip:a", 4)[:2] == (True, 6)
+    assert limiter.acquire("ip:a", 6)[:2] == (True, 0)
+    allowed, tokens, retry_after = limiter.acquire("ip:a", 3)
+    assert (allowed, tokens, retry_after) == (False, 0, 1.5)
+    # Other keys have their own bucket
+    assert limiter.acquire("ip:b", 10)[0]
+
+
+def test_acquire_refills_with_time_up_to_capacity(clock):
+    limiter = server.RateLimiter(capacity=10, refill_per_second=2, max_keys=100)
+    limiter.acquire("ip:a", 10)
+    clock[0] += 1.5
+    assert limiter.acquire("ip:a", 3)[:2] == (True, 0)
+    clock[0] += 3600
+    assert limiter.acquire("ip:a", 0)[1] == 10
+    assert limiter.seconds_until_full(4) == 3
+
+
+def test_acquire_evicts_the_least_recently_used_key(clock):
+    limiter = server.RateLimiter(capacity=10, refill_per_second=1, max_keys=2)
+    limiter.acquire("ip:a", 10)
+    limiter.acquire("ip:b", 1)
+    limiter.acquire("ip:a", 0)
+    limiter.acquire("ip:c", 1)
+    assert list(limiter._buckets) == ["ip:a", "ip:c"]
+
+
+def scope(path="/api/resumes", client=("10.0.0.1", 5000), **headers):
+    return {
+        "type": "http",
+        "path": path,
+        "client": client,
+        "headers": [(name.replace("_", "-").encode(), value.encode()) for name, value in headers.items()],
+    }
+
+
+def test_rate_limit_key_uses_the_hop_our_proxy_appended(monkeypatch):
+    monkeypatch.setattr(server, "RATE_LIMIT_TRUSTED_PROXIES", 1)
+    assert server.rate_limit_key(scope(x_forwarded_for="spoofed, 203.0.113.7")) == "ip:203.0.113.7"
+    monkeypatch.setattr(server, "RATE_LIMIT_TRUSTED_PROXIES", 2)
+    assert server.rate_limit_key(scope(x_forwarded_for="spoofed, 203.0.113.7, 10.1.1.1")) == "ip:203.0.113.7"
+    # Fewer hops than proxies: the header did not come through them, so use the peer
+    assert server.rate_limit_key(scope(x_forwarded_for="203.0.113.7")) == "ip:10.0.0.1"
+    monkeypatch.setattr(server, "RATE_LIMIT_TRUSTED_PROXIES", 0)
+    assert server.rate_limit_key(scope(x_forwarded_for="203.0.113.7")) == "ip:10.0.0.1"
+
+
+def test_rate_limit_key_prefers_the_token_subject():
+    token = server.create_access_token({"sub": "user-1"})
+    assert server.rate_limit_key(scope(authorization=f"Bearer {token}")) == "user:user-1"
+    assert server.rate_limit_key(scope(authorization="Bearer not-a-token")) == "ip:10.0.0.1"
+
+
+def test_rate_limit_costs():
+    assert server.rate_limit_cost("/api/auth/login") == 10
+    assert server.rate_limit_cost("/api/resumes/abc/download") == 3
+    assert server.rate_limit_cost("/api/resumes/abc") == 1
+
+
+def test_only_exact_exempt_paths_skip_the_limiter(clock, monkeypatch):
+    monkeypatch.setattr(server, "rate_limiter", server.RateLimiter(capacity=2, refill_per_second=1, max_keys=100))
+
+    async def app(scope, receive, send):
+        await send({"type": "http.response.start", "status": 200, "headers": []})
+
+    async def status_of(path):
+        sent = []
+
+        async def send(message):
+            sent.append(message)
+
+        await server.RateLimitMiddleware(app)({**scope(path), "method": "GET"}, None, send)
+        return sent[0]["status"]
+
+    async def statuses(path, count):
+        return [await status_of(path) for _ in range(count)]
+
+    assert asyncio.run(statuses("/api/status", 5)) == [200] * 5
+    assert asyncio.run(statuses("/api/status/query-plans", 3)) == [200, 200, 429]
@@ -0,0 +1,111 @@
+import asyncio
+import random
+from datetime import datetime, timedelta, timezone
+
+import pytest
+from fastapi import HTTPException
+
+import server
+
+
+def item(item_id, **fields):
+    return {"id": item_id, "name": item_id, "proficiency": 3, **fields}
+
+
+def test_section_delta_records_add_change_remove():
+    before = [item("a"), item("b"), item("c")]
+    after = [item("a", proficiency=5), item("c"), item("d")]
+    delta = server.section_delta(before, after)
+    assert delta == {"add": [item("d")], "change": {"a": {"proficiency": 5}}, "remove": ["b"]}
+    assert server.apply_resume_delta({"skills": before}, {"skills": delta})["skills"] == after
+
+
+def test_section_delta_records_reordering():
+    before = [item("a"), item("b"), item("c")]
+    after = [item("c"), item("a"), item("b")]
+    delta = server.section_delta(before, after)
+    assert delta == {"order": ["c", "a", "b"]}
+    assert server.apply_resume_delta({"skills": before}, {"skills": delta})["skills"] == after
+
+
+def test_section_delta_replaces_sections_without_unique_ids():
+    after = [item("a"), item("a", proficiency=1)]
+    assert server.section_delta([item("a")], after) == {"replace": after}
+
+
+def test_resume_data_delta_round_trips_random_edits():
+    rng = random.Random(7)
+    data = server.ResumeData().model_dump()
+    for step in range(200):
+        edited = {**data, "skills": list(data["skills"]), "personal_info": dict(data["personal_info"])}
+        operation = rng.choice(["add", "remove", "change", "shuffle", "summary", "contact"])
+        if operation == "add" or not edited["skills"]:
+            edited["skills"].insert(rng.randint(0, len(edited["skills"])), item(f"s{step}"))
+        elif operation == "remove":
+            edited["skills"].pop(rng.randrange(len(edited["skills"])))
+        elif operation == "change":
+            index = rng.randrange(len(edited["skills"]))
+            edited["skills"][index] = {**edited["skills"][index], "proficiency": rng.randint(1, 5)}
+        elif operation == "shuffle":
+            rng.shuffle(edited["skills"])
+        elif operation == "summary":
+            edited["summary"] = f"Summary {step}"
+        else:
+            edited["personal_info"]["phone"] = str(step)
+        delta = server.resume_data_delta(data, edited)
+        assert server.apply_resume_delta(data, delta) == edited
+        data = edited
+
+
+def record_versions(count, created_at=None):
+    """Record versions 0..count of one resume, each adding a skill; returns every version's data."""
+    states = {}
+    data = server.ResumeData().model_dump()
+    for version in range(count + 1):
+        if version:
+            edited = {**data, "skills": data["skills"] + [item(f"s{version}")]}
+            delta = server.resume_data_delta(data, edited)
+            data = edited
+        else:
+            delta = None
+        states[version] = data
+        asyncio.run(server.record_resume_version("r1", "u1", version, 0, delta, data))
+    if created_at is not None:
+        asyncio.run(server.db.resume_versions.update_many({}, {"$set": {"created_at": created_at}}))
+    return states
+
+
+def test_load_resume_version_rebuilds_every_version(mongo_db, monkeypatch):
+    monkeypatch.setattr(server, "RESUME_HISTORY_SNAPSHOT_INTERVAL", 4)
+    states = record_versions(10)
+    snapshots = asyncio.run(mongo_db.resume_versions.count_documents({"snapshot": True}))
+    assert snapshots == 3  # versions 0, 4 and 8
+    for version, data in states.items():
+        assert asyncio.run(server.load_resume_version("r1", "u1", version)) == data
+
+
+def test_load_resume_version_refuses_to_skip_missing_deltas(mongo_db, monkeypatch):
+    monkeypatch.setattr(server, "RESUME_HISTORY_SNAPSHOT_INTERVAL", 4)
+    states = record_versions(6)
+    asyncio.run(mongo_db.resume_versions.delete_one({"version": 2}))
+    assert asyncio.run(server.load_resume_version("r1", "u1", 1)) == states[1]
+    with pytest.raises(HTTPException) as error:
+        asyncio.run(server.load_resume_version("r1", "u1", 3))
+    assert error.value.status_code == 404
+    assert asyncio.run(server.load_resume_version("r1", "u1", 5)) == states[5]
+
+
+def test_expired_history_is_pruned_a_whole_chain_at_a_time(mongo_db, monkeypatch):
+    monkeypatch.setattr(server, "RESUME_HISTORY_SNAPSHOT_INTERVAL", 4)
+    states = record_versions(6, created_at=datetime.now(timezone.utc) - timedelta(days=server.RESUME_HISTORY_TTL_DAYS + 1))
+    # A resume edited long after its last snapshot: the recent edits must still rebuild
+    data = states[6]
+    for version in range(7, 10):
+        edited = {**data, "skills": data["skills"] + [item(f"s{version}")]}
+        asyncio.run(server.record_resume_version("r1", "u1", version, 0, server.resume_data_delta(data, edited), edited))
+        data = states[version] = edited
+    remaining = sorted(entry["version"] for entry in asyncio.run(mongo_db.resume_versions.find({}, {"version": 1}).to_list(None)))
+    # Version 8's snapshot pruned everything before the expired snapshot at 4, which 5..7 still need
+    assert remaining == [4, 5, 6, 7, 8, 9]
+    for version in remaining:
+        assert asyncio.run(server.load_resume_version("r1", "u1", version)) == states[version]
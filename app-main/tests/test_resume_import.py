@@ -0,0 +1,102 @@
+import asyncio
+import io
+
+import pytest
+from bson import ObjectId
+from fastapi import HTTPException
+from gridfs.errors import NoFile
+
+import server
+
+
+class MemoryUpload:
+    def __init__(self, files, filename, metadata):
+        self._id = ObjectId()
+        self.files = files
+        self.chunks = []
+        self.writes = 0
+
+    async def write(self, chunk):
+        self.chunks.append(chunk)
+        self.writes += 1
+
+    async def close(self):
+        self.files[self._id] = b"".join(self.chunks)
+
+    async def abort(self):
+        self.chunks = []
+
+
+class MemoryDownload:
+    def __init__(self, content):
+        self.content = content
+
+    async def read(self):
+        return self.content
+
+
+class MemoryBucket:
+    """The slice of AsyncIOMotorGridFSBucket the import path uses; mongomock has no GridFS."""
+
+    def __init__(self):
+        self.files = {}
+        self.uploads = []
+
+    def open_upload_stream(self, filename, metadata=None):
+        upload = MemoryUpload(self.files, filename, metadata)
+        self.uploads.append(upload)
+        return upload
+
+    async def open_download_stream(self, file_id):
+        if file_id not in self.files:
+            raise NoFile(file_id)
+        return MemoryDownload(self.files[file_id])
+
+    async def delete(self, file_id):
+        if self.files.pop(file_id, None) is None:
+            raise NoFile(file_id)
+
+
+class UploadFile:
+    def __init__(self, content, filename="cv.pdf"):
+        self.filename = filename
+        self.stream = io.BytesIO(content)
+
+    async def read(self, size):
+        return self.stream.read(size)
+
+
+@pytest.fixture
+def bucket(monkeypatch):
+    bucket = MemoryBucket()
+    monkeypatch.setattr(server, "import_upload_bucket", lambda: bucket)
+    return bucket
+
+
+def test_uploads_stream_into_gridfs_in_chunks(bucket):
+    content = b"x" * (200 * 1024)
+    upload_id = asyncio.run(server.store_upload(UploadFile(content), "u1"))
+    assert bucket.files[upload_id] == content
+    assert bucket.uploads[0].writes == 4
+
+
+def test_oversized_uploads_are_aborted(bucket, monkeypatch):
+    monkeypatch.setattr(server, "IMPORT_MAX_BYTES", 100 * 1024)
+    with pytest.raises(HTTPException) as error:
+        asyncio.run(server.store_upload(UploadFile(b"x" * (200 * 1024)), "u1"))
+    assert error.value.status_code == 413
+    assert bucket.files == {}
+
+
+def test_import_jobs_reference_the_upload_and_delete_it_when_finished(mongo_db, bucket):
+    user = server.User(email="u@example.com", name="U")
+    queued = asyncio.run(server.import_resume(UploadFile(b"%PDF-1.4"), user))
+    job = asyncio.run(server.claim_job("worker-1"))
+    assert job["id"] == queued["job_id"]
+    assert "content" not in job["payload"]
+    assert asyncio.run(server.read_upload(job["payload"]["upload_id"])) == b"%PDF-1.4"
+
+    asyncio.run(server.finish_job(job, "worker-1", {"status": "failed", "error": "Could not read this file"}))
+    assert bucket.files == {}
+    with pytest.raises(server.PermanentJobError):
+        asyncio.run(server.read_upload(job["payload"]["upload_id"]))
@@ -0,0 +1,55 @@
+import asyncio
+import json
+from datetime import datetime, timedelta, timezone
+
+import pytest
+from fastapi import HTTPException
+
+import server
+
+
+@pytest.fixture
+def owner():
+    return server.User(email="owner@example.com", name="Owner")
+
+
+def create_resumes(owner, count, **data):
+    start = datetime(2026, 1, 1, tzinfo=timezone.utc)
+    for index in range(count):
+        resume = server.Resume(user_id=owner.id, title=f"CV {index}", updated_at=start + timedelta(days=index), data=server.ResumeData(**data))
+        asyncio.run(server.insert_resume(resume))
+
+
+def page(owner, **params):
+    params = {"limit": 20, "cursor": None, "sort": "updated_at", "min_score": None, **params}
+    return json.loads(asyncio.run(server.get_resume_summaries(current_user=owner, **params)).body)
+
+
+def test_pages_walk_every_resume_newest_first(mongo_db, owner):
+    create_resumes(owner, 5)
+    create_resumes(server.User(email="other@example.com", name="Other"), 2)
+    titles, cursor = [], None
+    while True:
+        result = page(owner, limit=2, cursor=cursor)
+        assert len(result["items"]) <= 2
+        titles.extend(item["title"] for item in result["items"])
+        cursor = result["next_cursor"]
+        if cursor is None:
+            break
+    assert titles == [f"CV {index}" for index in reversed(range(5))]
+
+
+def test_summaries_carry_section_counts_not_section_data(mongo_db, owner):
+    create_resumes(owner, 1, skills=[server.SkillItem(name="Go"), server.SkillItem(name="Rust")], summary="Backend engineer")
+    [item] = page(owner)["items"]
+    assert item["section_counts"] == {section: 2 if section == "skills" else 0 for section in server.RESUME_SECTIONS}
+    assert "data" not in item and "summary" not in item
+
+
+def test_min_score_filters_and_bad_cursors_are_rejected(mongo_db, owner):
+    create_resumes(owner, 1, summary="x" * 60)
+    create_resumes(owner, 1)
+    assert [item["score"] for item in page(owner, sort="score", min_score=10)["items"]] == [15]
+    with pytest.raises(HTTPException) as error:
+        page(owner, cursor="not-a-cursor")
+    assert error.value.status_code == 400
@@ -0,0 +1,82 @@
+import asyncio
+import gc
+
+import pytest
+from fastapi import HTTPException
+
+import server
+
+
+@pytest.fixture
+def owner():
+    return server.User(email="owner@example.com", name="Owner")
+
+
+def create_resume(owner):
+    resume = server.Resume(user_id=owner.id, title="CV")
+    asyncio.run(server.insert_resume(resume))
+    return resume.id
+
+
+async def settle(*coroutines):
+    return await asyncio.gather(*coroutines, return_exceptions=True)
+
+
+def statuses(results):
+    return sorted(200 if not isinstance(result, HTTPException) else result.status_code for result in results)
+
+
+def test_stale_puts_are_not_coalesced(mongo_db, owner, monkeypatch):
+    monkeypatch.setattr(server, "RESUME_SAVE_COALESCE_MS", 50)
+    monkeypatch.setattr(server, "save_coalescer", server.ResumeSaveCoalescer(0.05))
+    resume_id = create_resume(owner)
+    saves = [server.ResumeUpdate(title=f"Tab {tab}", version=0) for tab in (1, 2)]
+    results = asyncio.run(settle(*(server.update_resume(resume_id, save, owner) for save in saves)))
+    assert statuses(results) == [200, 409]
+
+
+def test_unconditional_puts_are_coalesced(mongo_db, owner, monkeypatch):
+    monkeypatch.setattr(server, "RESUME_SAVE_COALESCE_MS", 50)
+    coalescer = server.ResumeSaveCoalescer(0.05)
+    monkeypatch.setattr(server, "save_coalescer", coalescer)
+    resume_id = create_resume(owner)
+    saves = [server.ResumeUpdate(title=f"Save {n}") for n in range(3)]
+    results = asyncio.run(settle(*(server.update_resume(resume_id, save, owner) for save in saves)))
+    assert statuses(results) == [200, 200, 200]
+    assert (coalescer.saves, coalescer.writes) == (3, 1)
+
+
+def test_section_writes_check_the_expected_version(mongo_db, owner):
+    resume_id = create_resume(owner)
+    patch = server.SectionPatch(value="First tab")
+    result = asyncio.run(server.update_resume_section(resume_id, "summary", patch, 0, owner))
+    assert result["version"] == 1
+    with pytest.raises(HTTPException) as error:
+        asyncio.run(server.update_resume_section(resume_id, "summary", server.SectionPatch(value="Second tab"), 0, owner))
+    assert error.value.status_code == 409
+    with pytest.raises(HTTPException) as error:
+        asyncio.run(server.delete_resume_section_item(resume_id, "skills", "missing", 1, owner))
+    assert error.value.status_code == 404
+
+
+def test_flush_tasks_are_held_until_done(mongo_db, owner, monkeypatch):
+    coalescer = server.ResumeSaveCoalescer(0.01)
+    resume_id = create_resume(owner)
+    apply_resume_update = server.apply_resume_update
+
+    async def slow_update(*args):
+        await asyncio.sleep(0.05)
+        return await apply_resume_update(*args)
+
+    monkeypatch.setattr(server, "apply_resume_update", slow_update)
+
+    async def scenario():
+        save = asyncio.ensure_future(coalescer.submit(resume_id, owner.id, {"title": "Renamed"}))
+        await asyncio.sleep(0.02)
+        assert len(coalescer._flushes) == 1
+        gc.collect()
+        resume = await save
+        assert not coalescer._flushes
+        return resume
+
+    assert asyncio.run(scenario()).title == "Renamed"
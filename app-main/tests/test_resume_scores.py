@@ -0,0 +1,92 @@
+import asyncio
+import json
+
+import pytest
+
+import server
+
+CONTACT = {"full_name": "Ada", "email": "ada@example.com", "phone": "555"}
+MAX_POINTS = {"personal_info": 15, "summary": 15, "experience": 25, "education": 15, "skills": 15, "achievements": 15}
+
+
+def items(count, **fields):
+    return [dict(fields, id=str(index)) for index in range(count)]
+
+
+@pytest.mark.parametrize("component, data, points", [
+    ("personal_info", {}, 0),
+    ("personal_info", {"personal_info": dict(CONTACT, phone="")}, 0),
+    ("personal_info", {"personal_info": CONTACT}, 15),
+    ("summary", {"summary": "x" * 50}, 0),
+    ("summary", {"summary": "x" * 51}, 15),
+    ("experience", {}, 0),
+    ("experience", {"internships": items(1)}, 15),
+    ("experience", {"experiences": items(1), "internships": items(1)}, 25),
+    ("education", {"education": []}, 0),
+    ("education", {"education": items(1)}, 15),
+    ("skills", {"skills": items(4)}, 10),
+    ("skills", {"skills": items(5)}, 15),
+    ("achievements", {"events": None}, 0),
+    ("achievements", {"projects": items(1)}, 10),
+    ("achievements", {"hackathons": items(1), "projects": items(1), "events": items(1)}, 15),
+])
+def test_score_component_points(component, data, points):
+    scored, suggestions = server.score_component(component, data)
+    assert scored == points
+    # Anything short of full marks comes with a suggestion
+    assert bool(suggestions) == (points < MAX_POINTS[component])
+
+
+def full_data():
+    return {
+        "personal_info": CONTACT,
+        "summary": "x" * 60,
+        "experiences": items(2),
+        "education": items(1),
+        "skills": items(5),
+        "projects": items(3),
+    }
+
+
+def test_score_resume_data_sums_components():
+    scored = server.score_resume_data(full_data())
+    assert scored["score"] == 100 == sum(scored["score_breakdown"].values())
+    assert all(not suggestions for suggestions in scored["score_suggestions"].values())
+    empty = server.score_resume_data({})
+    assert empty["score"] == 0
+    assert list(empty["score_breakdown"]) == list(server.SCORE_COMPONENT_SECTIONS)
+
+
+def test_section_writes_keep_the_stored_score_current(mongo_db):
+    owner = server.User(email="owner@example.com", name="Owner")
+    resume = server.Resume(user_id=owner.id, title="CV")
+    asyncio.run(server.insert_resume(resume))
+    asyncio.run(server.update_resume_section(resume.id, "summary", server.SectionPatch(value="x" * 60), None, owner))
+    asyncio.run(server.add_resume_section_item(resume.id, "skills", {"name": "Go"}, None, owner))
+    asyncio.run(server.add_resume_section_item(resume.id, "projects", {"title": "CLI", "description": "A tool"}, None, owner))
+    stored = asyncio.run(mongo_db.resumes.find_one({"id": resume.id}, {"_id": 0}))
+    expected = server.score_resume_data(stored["data"])
+    assert stored["score"] == expected["score"] == 35
+    assert stored["score_breakdown"] == expected["score_breakdown"]
+    assert "score_dirty" not in stored
+
+
+def test_score_pages_reach_resumes_without_a_stored_score(mongo_db):
+    owner = server.User(email="owner@example.com", name="Owner")
+    for score in (80, 40, None, None):
+        resume = server.Resume(user_id=owner.id, title=f"CV {score}")
+        asyncio.run(server.insert_resume(resume))
+        # Resumes written before scores were stored have none
+        change = {"$set": {"score": score}} if score is not None else {"$unset": {"score": ""}}
+        asyncio.run(mongo_db.resumes.update_one({"id": resume.id}, change))
+
+    titles, cursor = [], None
+    while True:
+        response = asyncio.run(server.get_resume_summaries(limit=1, cursor=cursor, sort="score", min_score=None, current_user=owner))
+        page = json.loads(response.body)
+        titles.extend(item["title"] for item in page["items"])
+        cursor = page["next_cursor"]
+        if cursor is None:
+            break
+    assert titles[:2] == ["CV 80", "CV 40"]
+    assert sorted(titles[2:]) == ["CV None", "CV None"]
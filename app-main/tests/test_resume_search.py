@@ -0,0 +1,87 @@
+import asyncio
+import json
+from datetime import datetime, timezone
+from types import SimpleNamespace
+
+import pytest
+from fastapi import HTTPException
+
+import server
+
+
+def test_search_terms_map_stems_to_typed_words():
+    terms = server.search_terms("Building C++ pipelines and -Java for the Node.js team")
+    assert terms == {"build": "building", "c++": "c++", "pipeline": "pipelines", "node.js": "node.js", "team": "team"}
+    assert server.search_terms("the and -python") == {}
+
+
+def test_search_snippet_centres_on_the_first_match():
+    text = "x" * 200 + " led the Kafka migration " + "y" * 200
+    snippet = server.search_snippet(text, {"kafka"}, width=60)
+    assert "Kafka" in snippet
+    assert snippet.startswith("...") and snippet.endswith("...")
+    assert server.search_snippet("short text", {"missing"}) == "short text"
+
+
+def test_search_weights_cover_every_indexed_field():
+    assert server.SEARCH_WEIGHTS["title"] > server.SEARCH_WEIGHTS["data.skills.name"] > server.SEARCH_WEIGHTS["data.summary"]
+    assert server.SEARCH_WEIGHTS["data.experiences.title"] == 4
+    assert server.SEARCH_WEIGHTS["data.experiences.description"] == 1
+    indexed = {f"data.{section}.{field}" for section, fields in server.SEARCH_ITEM_FIELDS.items() for field in fields}
+    assert indexed <= server.SEARCH_WEIGHTS.keys()
+
+
+def test_find_search_hits_ranks_items_by_matched_terms_then_weight():
+    doc = {
+        "title": "Backend CV",
+        "data": {
+            "summary": "Python engineer",
+            "experiences": [{"id": "e1", "title": "Engineer", "organization": "Acme", "description": "Python and Kafka", "skills": []}],
+            "skills": [{"id": "s1", "name": "Python"}],
+        },
+    }
+    hits = server.find_search_hits(doc, server.search_terms("python kafka"))
+    assert [(hit.section, hit.item_id) for hit in hits] == [("experiences", "e1"), ("skills", "s1"), ("summary", None)]
+    assert hits[0].matched_terms == ["python", "kafka"]
+
+
+class FakeCursor:
+    def __init__(self, docs):
+        self.docs = docs
+
+    def sort(self, spec):
+        self.sort_spec = spec
+        return self
+
+    def limit(self, limit):
+        self.limit_value = limit
+        return self
+
+    async def to_list(self, length):
+        return self.docs[:self.limit_value]
+
+
+def test_search_resumes_scopes_the_text_query_and_attaches_hits(monkeypatch):
+    owner = server.User(email="owner@example.com", name="Owner")
+    docs = [{"id": "r1", "title": "Backend", "updated_at": datetime.now(timezone.utc), "relevance": 1.23456, "data": {"summary": "Kafka"}}]
+    queries = []
+
+    def find(query, projection):
+        queries.append((query, projection))
+        return FakeCursor(docs)
+
+    # mongomock has no $text, so the query is checked here and hit extraction is stubbed
+    monkeypatch.setattr(server, "db", SimpleNamespace(resumes=SimpleNamespace(find=find)))
+    hit = server.SearchHit(section="summary", item_id=None, matched_terms=["kafka"], snippet="Kafka")
+    monkeypatch.setattr(server, "find_search_hits", lambda doc, terms: [hit] if "kafka" in terms else [])
+
+    response = asyncio.run(server.search_resumes(q="kafka", limit=5, current_user=owner))
+    assert queries == [({"user_id": owner.id, "$text": {"$search": "kafka"}}, server.SEARCH_PROJECTION)]
+    body = json.loads(response.body)
+    assert body["query"] == "kafka"
+    assert [(result["resume_id"], result["relevance"]) for result in body["results"]] == [("r1", 1.235)]
+    assert body["results"][0]["hits"][0]["matched_terms"] == ["kafka"]
+
+    with pytest.raises(HTTPException) as error:
+        asyncio.run(server.search_resumes(q="the and", limit=5, current_user=owner))
+    assert error.value.status_code == 422
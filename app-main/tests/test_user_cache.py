@@ -0,0 +1,66 @@
+import asyncio
+
+import pytest
+from fastapi import HTTPException
+from fastapi.security import HTTPAuthorizationCredentials
+
+import server
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    now = [1000.0]
+    monkeypatch.setattr(server.time, "monotonic", lambda: now[0])
+    return now
+
+
+@pytest.fixture
+def stored_user(mongo_db, monkeypatch):
+    monkeypatch.setattr(server, "user_cache", server.UserCache(8, 60))
+    user = server.User(email="owner@example.com", name="Owner")
+    asyncio.run(mongo_db.users.insert_one({**user.model_dump(), "password_hash": "x"}))
+    return user
+
+
+def authenticate(user):
+    token = server.create_access_token(server.user_token_claims(user))
+    return asyncio.run(server.get_current_user(HTTPAuthorizationCredentials(scheme="Bearer", credentials=token)))
+
+
+def test_cached_users_skip_the_lookup_until_they_expire(stored_user, mongo_db, clock):
+    assert authenticate(stored_user).id == stored_user.id
+    asyncio.run(mongo_db.users.update_one({"id": stored_user.id}, {"$set": {"name": "Renamed"}}))
+    # Within the TTL the cached user is served, after it the lookup runs again
+    assert authenticate(stored_user).name == "Owner"
+    clock[0] += 61
+    assert authenticate(stored_user).name == "Renamed"
+    assert (server.user_cache.hits, server.user_cache.misses) == (1, 2)
+
+
+def test_deleted_users_are_rejected_once_their_entry_expires(stored_user, mongo_db, clock):
+    authenticate(stored_user)
+    asyncio.run(mongo_db.users.delete_one({"id": stored_user.id}))
+    clock[0] += 61
+    with pytest.raises(HTTPException) as error:
+        authenticate(stored_user)
+    assert error.value.status_code == 401
+
+
+def test_least_recently_used_users_are_evicted(clock):
+    cache = server.UserCache(2, 60)
+    users = [server.User(email=f"u{n}@example.com", name=f"U{n}") for n in range(3)]
+    cache.put(users[0])
+    cache.put(users[1])
+    cache.get(users[0].id)
+    cache.put(users[2])
+    assert cache.get(users[1].id) is None
+    assert cache.get(users[0].id) == users[0] and cache.get(users[2].id) == users[2]
+
+
+def test_embedded_claims_need_no_lookup(mongo_db, monkeypatch):
+    monkeypatch.setattr(server, "JWT_EMBED_USER", True)
+    monkeypatch.setattr(server, "user_cache", server.UserCache(8, 60))
+    user = server.User(email="owner@example.com", name="Owner")
+    # Not stored at all: the token alone identifies the user
+    assert authenticate(user) == user
+    assert server.user_cache.stats()["misses"] == 0